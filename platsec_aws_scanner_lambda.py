@@ -1,6 +1,8 @@
-from src.aws_scanner_argument_parser import AwsScannerArgumentParser
-from src.aws_scanner_main import AwsScannerMain
+from src.aws_scanner_lambda import handle
+from src.aws_scanner_warm_state import AwsScannerWarmState
+
+WARM_STATE = AwsScannerWarmState()
 
 
 def handler(event, context):
-    AwsScannerMain(AwsScannerArgumentParser().parse_lambda_args(event))
+    return handle(event, context, WARM_STATE)
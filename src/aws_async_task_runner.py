@@ -0,0 +1,71 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from src.aws_scanner_config import AwsScannerConfig as Config
+from src.aws_task_runner import AwsTaskRunner, task_client_type
+from src.data.aws_scanner_exceptions import AwsScannerException
+from src.data.aws_task_report import AwsTaskReport
+from src.tasks.aws_task import AwsTask
+
+AsyncTask = asyncio.Task[Optional[AwsTaskReport]]
+
+
+class AwsAsyncTaskRunner(AwsTaskRunner):
+    def _stream_tasks(self, tasks: Iterable[AwsTask]) -> Iterator[AwsTaskReport]:
+        config = Config()
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=config.tasks_executors())
+        limits = _Limits(config.tasks_account_concurrency(), config.tasks_service_concurrency())
+        pending: Set[AsyncTask] = set()
+        try:
+            pending = {loop.create_task(self._run_async_task(task, executor, limits)) for task in tasks}
+            while pending:
+                done, pending = loop.run_until_complete(self._wait_first(pending))
+                yield from filter(None, [future.result() for future in done])
+        finally:
+            for future in pending:
+                future.cancel()
+            loop.run_until_complete(self._wait_all(pending))
+            executor.shutdown(wait=True)
+            loop.close()
+
+    @staticmethod
+    async def _wait_first(pending: Set[AsyncTask]) -> Tuple[Set[AsyncTask], Set[AsyncTask]]:
+        return await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+    @staticmethod
+    async def _wait_all(pending: Set[AsyncTask]) -> None:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run_async_task(
+        self, task: AwsTask, executor: ThreadPoolExecutor, limits: "_Limits"
+    ) -> Optional[AwsTaskReport]:
+        async with limits.account(task), limits.service(task):
+            if self._scheduling_stopped():
+                return None
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, self._run_task, task)
+            except AwsScannerException as ex:
+                self._logger.error(f"{task} failed with: '{type(ex).__name__}: {ex}'")
+        return None
+
+
+class _Limits:
+    def __init__(self, account_concurrency: int, service_concurrency: int):
+        self._account_concurrency = account_concurrency
+        self._service_concurrency = service_concurrency
+        self._accounts: Dict[str, asyncio.Semaphore] = {}
+        self._services: Dict[Any, asyncio.Semaphore] = {}
+
+    def account(self, task: AwsTask) -> asyncio.Semaphore:
+        if task.account.identifier not in self._accounts:
+            self._accounts[task.account.identifier] = asyncio.Semaphore(self._account_concurrency)
+        return self._accounts[task.account.identifier]
+
+    def service(self, task: AwsTask) -> asyncio.Semaphore:
+        client_type = task_client_type(type(task))
+        if client_type not in self._services:
+            self._services[client_type] = asyncio.Semaphore(self._service_concurrency)
+        return self._services[client_type]
@@ -1,18 +1,102 @@
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
-from typing import Any, Dict, Optional, Sequence
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from time import monotonic
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from src.data.aws_task_report import AwsTaskReport
 from src.aws_task_runner import AwsTaskRunner
 from src.aws_scanner_config import AwsScannerConfig as Config
+from src.clients.aws_athena_catalog import athena_catalog
+from src.clients.aws_athena_scheduler import AwsAthenaScheduler
+from src.data.aws_athena_pipeline import AwsAthenaPipeline
 from src.data.aws_scanner_exceptions import AwsScannerException
+from src.tasks.aws_athena_task import AwsAthenaTask
 from src.tasks.aws_task import AwsTask
 
+IN_FLIGHT_TASKS_PER_EXECUTOR = 2
+
 
 class AwsParallelTaskRunner(AwsTaskRunner):
-    def _run_tasks(self, tasks: Sequence[AwsTask]) -> Sequence[AwsTaskReport]:
-        with ThreadPoolExecutor(max_workers=Config().tasks_executors()) as executor:
-            futures = {executor.submit(self._run_task, task): task for task in tasks}
-        return list(filter(None, [self._get_result(future, futures) for future in as_completed(futures)]))
+    def _stream_tasks(self, tasks: Iterable[AwsTask]) -> Iterator[AwsTaskReport]:
+        config = Config()
+        executors = config.tasks_executors()
+        threaded_limit = executors * IN_FLIGHT_TASKS_PER_EXECUTOR
+        pipelined_limit = config.athena_pipelined_tasks()
+        pending = iter(tasks)
+        waiting: List[Tuple[AwsTask, Optional[AwsAthenaPipeline]]] = []
+        in_flight: Dict[Future[AwsTaskReport], AwsTask] = {}
+        pipelined: Set[Future[AwsTaskReport]] = set()
+
+        def has_room(pipelining: bool) -> bool:
+            if pipelining:
+                return len(pipelined) < pipelined_limit
+            return len(in_flight) - len(pipelined) < threaded_limit
+
+        with ThreadPoolExecutor(max_workers=executors) as executor, ExitStack() as stack:
+            scheduler = self._lazy_scheduler(stack, executor)
+            while True:
+                for task, pipeline in self._startable(pending, waiting, has_room, pipelined_limit > 0, threaded_limit):
+                    if pipeline:
+                        future = self._submit_pipelined(task, pipeline, scheduler)
+                        pipelined.add(future)
+                    else:
+                        future = executor.submit(self._run_task, task)
+                    in_flight[future] = task
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                reports = [self._get_result(future, in_flight) for future in done]
+                for future in done:
+                    del in_flight[future]
+                    pipelined.discard(future)
+                yield from filter(None, reports)
+
+    def _lazy_scheduler(self, stack: ExitStack, executor: Executor) -> Callable[[], AwsAthenaScheduler]:
+        scheduler: Optional[AwsAthenaScheduler] = None
+
+        def get() -> AwsAthenaScheduler:
+            nonlocal scheduler
+            if scheduler is None:
+                scheduler = stack.enter_context(self._client_factory.get_athena_scheduler(executor))
+            return scheduler
+
+        return get
+
+    def _startable(
+        self,
+        pending: Iterator[AwsTask],
+        waiting: List[Tuple[AwsTask, Optional[AwsAthenaPipeline]]],
+        has_room: Callable[[bool], bool],
+        pipelining: bool,
+        lookahead: int,
+    ) -> Iterator[Tuple[AwsTask, Optional[AwsAthenaPipeline]]]:
+        for item in list(waiting):
+            if has_room(item[1] is not None):
+                waiting.remove(item)
+                yield item
+        while len(waiting) < lookahead and (has_room(True) or has_room(False)):
+            task = next(pending, None)
+            if task is None:
+                return
+            item = (task, self._pipeline(task) if pipelining else None)
+            if has_room(item[1] is not None):
+                yield item
+            else:
+                waiting.append(item)
+
+    def _pipeline(self, task: AwsTask) -> Optional[AwsAthenaPipeline]:
+        with athena_catalog(self._athena_catalog):
+            return task.pipeline() if isinstance(task, AwsAthenaTask) else None
+
+    def _submit_pipelined(
+        self, task: AwsTask, pipeline: AwsAthenaPipeline, scheduler: Callable[[], AwsAthenaScheduler]
+    ) -> Future[AwsTaskReport]:
+        start = monotonic()
+        future = scheduler().submit(pipeline, self._task_deadline(start), self._athena_catalog)
+        if self._durations:
+            durations = self._durations
+            future.add_done_callback(lambda _: durations.record(task, monotonic() - start))
+        return future
 
     def _get_result(
         self, future: Future[AwsTaskReport], all_futures: Dict[Future[AwsTaskReport], Any]
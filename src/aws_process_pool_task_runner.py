@@ -0,0 +1,55 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from typing import Iterable, Iterator, List, Optional
+
+from src.aws_parallel_task_runner import AwsParallelTaskRunner
+from src.aws_scanner_logging import configure_logging
+from src.aws_scanner_payload import from_payload, to_payload
+from src.aws_scanner_shards import shard_by_account
+from src.aws_task_checkpoints import AwsTaskCheckpoints
+from src.aws_task_runner import AwsTaskRunner
+from src.clients.aws_client_factory import AwsClientFactory
+from src.data.aws_task_report import AwsTaskReport
+from src.tasks.aws_task import AwsTask
+
+
+def run_shard(payload: bytes) -> bytes:
+    factory, tasks = from_payload(payload)
+    return to_payload(AwsParallelTaskRunner(factory).run(tasks))
+
+
+class AwsProcessPoolTaskRunner(AwsTaskRunner):
+    def __init__(
+        self,
+        client_factory: AwsClientFactory,
+        processes: int,
+        log_level: str,
+        checkpoints: Optional[AwsTaskCheckpoints] = None,
+    ) -> None:
+        super().__init__(client_factory, checkpoints=checkpoints)
+        self._processes = processes
+        self._log_level = log_level
+
+    def _stream_tasks(self, tasks: Iterable[AwsTask]) -> Iterator[AwsTaskReport]:
+        shards = self._shard(tasks)
+        self._logger.info(f"running {sum(map(len, shards))} tasks in {len(shards)} processes")
+        with self._executor(len(shards)) as executor:
+            futures = {executor.submit(run_shard, to_payload((self._client_factory, shard))): shard for shard in shards}
+            for future in as_completed(futures):
+                try:
+                    yield from from_payload(future.result())
+                except Exception as ex:
+                    self._logger.error(
+                        f"shard of {len(futures[future])} tasks failed with: '{type(ex).__name__}: {ex}'"
+                    )
+
+    def _shard(self, tasks: Iterable[AwsTask]) -> List[List[AwsTask]]:
+        return shard_by_account(tasks, self._processes)
+
+    def _executor(self, workers: int) -> Executor:
+        return ProcessPoolExecutor(
+            max_workers=max(workers, 1),
+            mp_context=get_context("spawn"),
+            initializer=configure_logging,
+            initargs=(self._log_level,),
+        )
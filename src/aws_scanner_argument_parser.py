@@ -28,6 +28,11 @@ class AwsScannerArguments:
     with_subscription_filter: bool
     parent: str
     skip_tags: bool
+    processes: int = 1
+    resume: Optional[str] = None
+    plan: int = 0
+    shard: Optional[str] = None
+    merged_task: Optional[str] = None
 
     @property
     def partition(self) -> AwsAthenaDataPartition:
@@ -56,6 +61,7 @@ class AwsScannerCommands:
     audit_route53 = "list_public_zones"
     enable_route53_logging = "enable_route53_logging"
     audit_route53_query_logs = "audit_route53_query_logs"
+    merge = "merge"
 
 
 class AwsScannerArgumentParser:
@@ -69,6 +75,16 @@ class AwsScannerArgumentParser:
         parser.add_argument("-a", "--accounts", type=str, help="comma-separated list of target accounts")
         parser.add_argument("-di", "--disable_account_lookup", type=bool, help="disable account lookup")
         parser.add_argument("-p", "--parent", type=str, help="organization unit parent")
+        parser.add_argument(
+            "-pr",
+            "--processes",
+            type=int,
+            default=1,
+            help="number of processes that target accounts are sharded across",
+        )
+        parser.add_argument("-rs", "--resume", type=str, help="id of a checkpointed run to resume")
+        parser.add_argument("-pl", "--plan", type=int, help="number of shards to split target accounts into")
+        parser.add_argument("-sh", "--shard", type=str, help="id of the sharded run that this shard belongs to")
 
     @staticmethod
     def _add_enforce_arg(parser: ArgumentParser, cmd_help: str) -> None:
@@ -152,6 +168,7 @@ class AwsScannerArgumentParser:
         self._add_audit_ec2_instances_command(subparsers)
         self._add_audit_route53_command(subparsers)
         self._add_audit_route53_query_logs(subparsers)
+        self._add_merge_command(subparsers)
         return parser
 
     def _add_drop_command(self, subparsers: Any) -> None:
@@ -290,6 +307,14 @@ class AwsScannerArgumentParser:
         self._add_with_subscription_filter_arg(audit_parser)
         self._add_skip_tags_arg(audit_parser)
 
+    def _add_merge_command(self, subparsers: Any) -> None:
+        desc = "merge the reports of all shards of a sharded run"
+        merge_parser = subparsers.add_parser(AwsScannerCommands.merge, help=desc, description=desc)
+        self._add_auth_args(merge_parser)
+        merge_parser.add_argument("-sh", "--shard", type=str, required=True, help="id of the sharded run")
+        merge_parser.add_argument("-mt", "--merged_task", type=str, required=True, help="task that the shards ran")
+        self._add_verbosity_arg(merge_parser)
+
     def _add_create_flow_logs_table_command(self, subparsers: Any) -> None:
         desc = "create Athena table for flow logs querying"
         create_parser = subparsers.add_parser(AwsScannerCommands.create_flow_logs_table, help=desc, description=desc)
@@ -337,4 +362,9 @@ class AwsScannerArgumentParser:
             parent=args.get("parent") or Config().organization_parent(),
             day=int(args["day"]) if args.get("day") else None,
             skip_tags=bool(args.get("skip_tags")),
+            processes=int(args.get("processes") or 1),
+            resume=args.get("resume"),
+            plan=int(args.get("plan") or 0),
+            shard=args.get("shard"),
+            merged_task=args.get("merged_task"),
         )
@@ -4,9 +4,14 @@ import os
 import sys
 
 from configparser import ConfigParser
+from functools import lru_cache
 from json import JSONDecodeError, loads
 from logging import getLogger
-from typing import Any, Dict, List, Optional
+from tempfile import gettempdir
+from threading import Lock
+from time import monotonic
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from src.clients.aws_s3_client import AwsS3Client
 from src.data.aws_iam_types import PasswordPolicy
@@ -14,9 +19,13 @@ from src.data.aws_organizations_types import Account
 
 
 CONFIG_FILE = "aws_scanner_config.ini"
+CONFIG_REVALIDATION_SECONDS = 60
+TASK_DURATIONS_FILE = "aws_scanner_task_durations.json"
 
+ConfigSnapshot = Mapping[str, Mapping[str, str]]
 
-@dataclass
+
+@dataclass(frozen=True)
 class LogGroupConfig:
     logs_group_name: str
     logs_log_group_subscription_filter_name: str
@@ -27,9 +36,43 @@ class LogGroupConfig:
 
 
 class AwsScannerConfig:
+    _snapshot: Optional[ConfigSnapshot] = None
+    _snapshot_etag: Optional[str] = None
+    _snapshot_validated_at = 0.0
+    _snapshot_lock = Lock()
+
     def __init__(self) -> None:
         self._logger = getLogger(self.__class__.__name__)
-        self._config = self._load_config()
+        self._config = self._get_snapshot()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return AwsScannerConfig, ()
+
+    @classmethod
+    def reload(cls) -> None:
+        with cls._snapshot_lock:
+            cls._snapshot, cls._snapshot_etag = None, None
+        cls._clear_derived_config()
+
+    @classmethod
+    def revalidate(cls) -> None:
+        bucket = cls.config_bucket()
+        with cls._snapshot_lock:
+            if not bucket or cls._snapshot is None:
+                return
+            if monotonic() - cls._snapshot_validated_at < cls.config_revalidation_seconds():
+                return
+            getLogger(cls.__name__).debug(f"revalidating config with etag {cls._snapshot_etag}")
+            s3_object = AwsS3Client(boto3.client("s3")).get_object_if_none_match(
+                bucket, CONFIG_FILE, cls._snapshot_etag
+            )
+            cls._snapshot_validated_at = monotonic()
+            if not s3_object:
+                return
+            getLogger(cls.__name__).info(f"config has changed (etag {s3_object.etag})")
+            cls._snapshot = cls._to_snapshot(cls._to_config_parser(s3_object.content))
+            cls._snapshot_etag = s3_object.etag
+        cls._clear_derived_config()
 
     def athena_account(self) -> Account:
         return Account(self._get_config("athena", "account"), "athena")
@@ -52,8 +95,23 @@ class AwsScannerConfig:
     def athena_query_results_polling_delay_seconds(self) -> int:
         return self._get_int_config("athena", "query_results_polling_delay_seconds")
 
-    def athena_query_throttling_seconds(self) -> int:
-        return self._get_int_config("athena", "query_throttling_seconds")
+    def athena_query_results_polling_max_delay_seconds(self) -> int:
+        return self._get_int_config("athena", "query_results_polling_max_delay_seconds", "10")
+
+    def athena_query_rate_per_second(self) -> int:
+        return self._get_int_config("athena", "query_rate_per_second", "20")
+
+    def athena_query_burst(self) -> int:
+        return self._get_int_config("athena", "query_burst", "80")
+
+    def athena_max_running_queries(self) -> int:
+        return self._get_int_config("athena", "max_running_queries", "20")
+
+    def athena_pipelined_tasks(self) -> int:
+        return self._get_int_config("athena", "pipelined_tasks", "100")
+
+    def athena_shared_tables(self) -> bool:
+        return self._get_bool_config("athena", "shared_tables", "true")
 
     def cloudtrail_account(self) -> Account:
         return Account(self._get_config("cloudtrail", "account"), "cloudtrail")
@@ -80,6 +138,19 @@ class AwsScannerConfig:
     def config_bucket() -> Optional[str]:
         return os.environ.get("AWS_SCANNER_CONFIG_BUCKET")
 
+    @staticmethod
+    def config_revalidation_seconds() -> int:
+        return int(os.environ.get("AWS_SCANNER_CONFIG_REVALIDATION_SECONDS", CONFIG_REVALIDATION_SECONDS))
+
+    def concurrency_limits(self) -> Dict[str, int]:
+        limits = {
+            service: self._get_int_config("concurrency", service) for service in self._config.get("concurrency", {})
+        }
+        for service, limit in limits.items():
+            if limit < 1:
+                sys.exit(f"invalid config: section 'concurrency', key '{service}', error: limit must be at least 1")
+        return limits
+
     def cost_explorer_role(self) -> str:
         return self._get_config("cost_explorer", "role")
 
@@ -105,14 +176,13 @@ class AwsScannerConfig:
         return self._get_config("iam", "audit_role")
 
     def iam_password_policy(self) -> PasswordPolicy:
-        return PasswordPolicy(
+        return self._to_password_policy(
             minimum_password_length=self.iam_password_policy_minimum_password_length(),
             require_symbols=self.iam_password_policy_require_symbols(),
             require_numbers=self.iam_password_policy_require_numbers(),
             require_uppercase_chars=self.iam_password_policy_require_uppercase_chars(),
             require_lowercase_chars=self.iam_password_policy_require_lowercase_chars(),
             allow_users_to_change_password=self.iam_password_policy_allow_users_to_change_password(),
-            expire_passwords=self.iam_password_policy_max_password_age() > 0,
             max_password_age=self.iam_password_policy_max_password_age(),
             password_reuse_prevention=self.iam_password_policy_password_reuse_prevention(),
             hard_expiry=self.iam_password_policy_hard_expiry(),
@@ -152,31 +222,31 @@ class AwsScannerConfig:
         return self._get_config("route53resolver", "role")
 
     def logs_vpc_flow_log_group_config(self) -> LogGroupConfig:
-        return LogGroupConfig(
+        return self._to_log_group_config(
             logs_group_name=self._get_config("logs", "vpc_log_group_name"),
             logs_log_group_subscription_filter_name=f"{self._get_config('logs', 'vpc_log_group_name')}_sub_filter",
             logs_log_group_pattern=self._get_config("logs", "vpc_log_group_pattern"),
-            logs_group_retention_policy_days=int(self._get_config("logs", "vpc_log_group_retention_policy_days")),
+            logs_group_retention_policy_days=self._get_int_config("logs", "vpc_log_group_retention_policy_days"),
             logs_log_group_destination=self._get_config("logs", "vpc_log_group_destination"),
             log_group_resource_policy_name=self.logs_log_group_resource_policy_name(),
         )
 
     def logs_vpc_dns_log_group_config(self) -> LogGroupConfig:
-        return LogGroupConfig(
+        return self._to_log_group_config(
             logs_group_name=self._get_config("logs", "vpc_dns_log_group_name"),
             logs_log_group_subscription_filter_name=f"{self._get_config('logs', 'vpc_dns_log_group_name')}_sub_filter",
             logs_log_group_pattern=self._get_config("logs", "vpc_dns_log_group_pattern"),
-            logs_group_retention_policy_days=int(self._get_config("logs", "vpc_dns_log_group_retention_policy_days")),
+            logs_group_retention_policy_days=self._get_int_config("logs", "vpc_dns_log_group_retention_policy_days"),
             logs_log_group_destination=self._get_config("logs", "vpc_dns_log_group_destination"),
             log_group_resource_policy_name=self.logs_log_group_resource_policy_name(),
         )
 
     def logs_route53_query_log_group_config(self) -> LogGroupConfig:
-        return LogGroupConfig(
+        return self._to_log_group_config(
             logs_group_name=self._get_config("logs", "route53_log_group_name"),
             logs_log_group_subscription_filter_name=f"{self._get_config('logs', 'route53_log_group_name')}_sub_filter",
             logs_log_group_pattern=self._get_config("logs", "route53_log_group_pattern"),
-            logs_group_retention_policy_days=int(self._get_config("logs", "route53_log_group_retention_policy_days")),
+            logs_group_retention_policy_days=self._get_int_config("logs", "route53_log_group_retention_policy_days"),
             logs_log_group_destination=self._get_config("logs", "route53_log_group_destination"),
             log_group_resource_policy_name=self.logs_log_group_resource_policy_name(),
         )
@@ -214,6 +284,9 @@ class AwsScannerConfig:
     def organization_include_root_accounts(self) -> bool:
         return self._get_bool_config("organization", "include_root_accounts")
 
+    def organization_accounts_ttl_seconds(self) -> int:
+        return self._get_int_config("organization", "accounts_ttl_seconds", "300")
+
     def organization_parent(self) -> str:
         return self._get_config("organization", "parent")
 
@@ -225,6 +298,9 @@ class AwsScannerConfig:
     def reports_account(self) -> Account:
         return Account(self._get_config("reports", "account"), "reports")
 
+    def reports_checkpoints(self) -> str:
+        return self._get_config("reports", "checkpoints", "")
+
     def reports_format(self) -> str:
         format = self._get_config("reports", "format").lower()
         supported = ["json", "csv"]
@@ -248,6 +324,35 @@ class AwsScannerConfig:
     def tasks_executors(self) -> int:
         return self._get_int_config("tasks", "executors")
 
+    def tasks_continuation_margin_seconds(self) -> int:
+        return self._get_int_config("tasks", "continuation_margin_seconds", "120")
+
+    def tasks_durations_file(self) -> str:
+        return self._get_config("tasks", "durations_file", os.path.join(gettempdir(), TASK_DURATIONS_FILE))
+
+    def tasks_sub_task_size(self) -> int:
+        return self._get_int_config("tasks", "sub_task_size", "25")
+
+    def tasks_sub_task_executors(self) -> int:
+        return self._get_int_config("tasks", "sub_task_executors", "4")
+
+    def tasks_timeout_seconds(self) -> int:
+        return self._get_int_config("tasks", "timeout_seconds", "0")
+
+    def tasks_run_timeout_seconds(self) -> int:
+        return self._get_int_config("tasks", "run_timeout_seconds", "0")
+
+    def tasks_runner(self) -> str:
+        runner = self._get_config("tasks", "runner", "threads")
+        supported = ["threads", "async"]
+        return runner if runner in supported else sys.exit(self._unsupported("tasks", "runner", supported))
+
+    def tasks_account_concurrency(self) -> int:
+        return self._get_int_config("tasks", "account_concurrency", "4")
+
+    def tasks_service_concurrency(self) -> int:
+        return self._get_int_config("tasks", "service_concurrency", str(self.tasks_executors()))
+
     def user_account(self) -> Account:
         return Account(self._get_config("user", "account"), "user")
 
@@ -260,22 +365,28 @@ class AwsScannerConfig:
     def resolver_dns_query_log_config_name(self) -> str:
         return self._get_config("route53resolver", "dns_query_log_config_name")
 
-    def _get_config(self, section: str, key: str) -> str:
+    def is_current(self) -> bool:
+        return self._config is AwsScannerConfig._snapshot
+
+    def _get_config(self, section: str, key: str, default: Optional[str] = None) -> str:
         try:
             return os.environ.get(f"AWS_SCANNER_{section.upper()}_{key.upper()}") or self._config[section][key]
         except KeyError:
+            if default is not None:
+                return default
             sys.exit(f"missing config: section '{section}', key '{key}'")
 
-    def _get_int_config(self, section: str, key: str) -> int:
+    def _get_int_config(self, section: str, key: str, default: Optional[str] = None) -> int:
         try:
-            return int(self._get_config(section, key))
+            return int(self._get_config(section, key, default))
         except ValueError as err:
             sys.exit(f"invalid config type: section '{section}', key '{key}', error: {err}")
 
-    def _get_bool_config(self, section: str, key: str) -> bool:
-        return str(self._get_config(section, key)) == "true"
+    def _get_bool_config(self, section: str, key: str, default: Optional[str] = None) -> bool:
+        return str(self._get_config(section, key, default)) == "true"
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def _to_json(json_str: str, section: str, key: str) -> Dict[str, Any]:
         try:
             return dict(loads(json_str))
@@ -285,6 +396,33 @@ class AwsScannerConfig:
     def _get_json_config(self, section: str, key: str) -> Dict[str, Any]:
         return self._to_json(self._get_config(section, key), section, key)
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _to_password_policy(max_password_age: int, **policy: Any) -> PasswordPolicy:
+        return PasswordPolicy(expire_passwords=max_password_age > 0, max_password_age=max_password_age, **policy)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _to_log_group_config(**log_group_config: Any) -> LogGroupConfig:
+        return LogGroupConfig(**log_group_config)
+
+    @classmethod
+    def _clear_derived_config(cls) -> None:
+        cls._to_json.cache_clear()
+        cls._to_password_policy.cache_clear()
+        cls._to_log_group_config.cache_clear()
+
+    def _get_snapshot(self) -> ConfigSnapshot:
+        with AwsScannerConfig._snapshot_lock:
+            if AwsScannerConfig._snapshot is None:
+                AwsScannerConfig._snapshot = self._to_snapshot(self._load_config())
+                AwsScannerConfig._snapshot_validated_at = monotonic()
+            return AwsScannerConfig._snapshot
+
+    @staticmethod
+    def _to_snapshot(config: ConfigParser) -> ConfigSnapshot:
+        return MappingProxyType({section: MappingProxyType(dict(config[section])) for section in config.sections()})
+
     def _load_config(self) -> ConfigParser:
         return self._load_config_from_s3() if self.config_bucket() else self._load_config_from_file()
 
@@ -296,8 +434,14 @@ class AwsScannerConfig:
         return config
 
     def _load_config_from_s3(self) -> ConfigParser:
+        s3_object = AwsS3Client(boto3.client("s3")).get_object_if_none_match(str(self.config_bucket()), CONFIG_FILE)
+        AwsScannerConfig._snapshot_etag = s3_object.etag if s3_object else None
+        return self._to_config_parser(s3_object.content if s3_object else "")
+
+    @staticmethod
+    def _to_config_parser(content: str) -> ConfigParser:
         config = ConfigParser()
-        config.read_string(AwsS3Client(boto3.client("s3")).get_object(str(self.config_bucket()), CONFIG_FILE))
+        config.read_string(content)
         return config
 
     @staticmethod
@@ -0,0 +1,31 @@
+import json
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from time import monotonic
+from typing import Any, Dict, Optional
+
+from src.aws_scanner_argument_parser import AwsScannerArgumentParser
+from src.aws_scanner_config import AwsScannerConfig
+from src.aws_scanner_main import AwsScannerMain
+from src.aws_scanner_warm_state import AwsScannerWarmState
+
+CONTINUATION_TOKEN = "continuation_token"
+SHARDS = "shards"
+
+
+def handle(event: Dict[str, Any], context: Any, warm_state: AwsScannerWarmState) -> Optional[Dict[str, Any]]:
+    AwsScannerConfig.revalidate()
+    event = from_continuation_token(event[CONTINUATION_TOKEN]) if CONTINUATION_TOKEN in event else event
+    finish_by = monotonic() + context.get_remaining_time_in_millis() / 1000
+    main = AwsScannerMain(AwsScannerArgumentParser().parse_lambda_args(event), warm_state, finish_by)
+    if main.shards is not None:
+        return {SHARDS: main.shards}
+    return {CONTINUATION_TOKEN: to_continuation_token(event, main.unfinished_run)} if main.unfinished_run else None
+
+
+def to_continuation_token(event: Dict[str, Any], run_id: str) -> str:
+    return urlsafe_b64encode(json.dumps(dict(event, resume=run_id)).encode("utf-8")).decode("ascii")
+
+
+def from_continuation_token(token: str) -> Dict[str, Any]:
+    return dict(json.loads(urlsafe_b64decode(token.encode("ascii"))))
@@ -0,0 +1,13 @@
+import logging
+
+
+def configure_logging(log_level: str) -> None:
+    logging.basicConfig(
+        level=log_level,
+        datefmt="%Y-%m-%dT%H:%M:%S",
+        format="%(asctime)s %(levelname)s %(module)s %(message)s",
+    )
+    logging.getLogger().setLevel(log_level)
+    logging.getLogger("botocore").setLevel(logging.ERROR)
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+    logging.getLogger("requests").setLevel(logging.ERROR)
@@ -1,36 +1,141 @@
+import json
 import logging
 
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+from src.aws_async_task_runner import AwsAsyncTaskRunner
 from src.aws_parallel_task_runner import AwsParallelTaskRunner
+from src.aws_process_pool_task_runner import AwsProcessPoolTaskRunner
+from src.aws_scanner_config import AwsScannerConfig as Config
+from src.aws_scanner_logging import configure_logging
 from src.aws_scanner_output import AwsScannerOutput
+from src.aws_scanner_shards import plan_shards, shard_by_account
+from src.aws_scanner_warm_state import AwsScannerWarmState
 from src.aws_task_builder import AwsTaskBuilder
+from src.aws_task_checkpoints import (
+    AwsTaskCheckpoints,
+    CheckpointStore,
+    LocalCheckpointStore,
+    S3CheckpointStore,
+    new_run_id,
+)
+from src.aws_task_durations import AwsTaskDurations
+from src.aws_task_runner import AwsTaskRunner
 from src.clients.aws_client_factory import AwsClientFactory
 from src.aws_scanner_argument_parser import AwsScannerArguments
+from src.aws_scanner_argument_parser import AwsScannerCommands as Cmd
 from src.data.aws_scanner_exceptions import AwsScannerException
+from src.tasks.aws_task import AwsTask
 
 
 class AwsScannerMain:
-    def __init__(self, args: AwsScannerArguments) -> None:
-        self._main(args)
+    def __init__(
+        self,
+        args: AwsScannerArguments,
+        warm_state: Optional[AwsScannerWarmState] = None,
+        finish_by: Optional[float] = None,
+    ) -> None:
+        self.unfinished_run: Optional[str] = None
+        self.shards: Optional[List[Dict[str, str]]] = None
+        self._main(args, warm_state, finish_by)
 
-    def _main(self, args: AwsScannerArguments) -> None:
+    def _main(
+        self, args: AwsScannerArguments, warm_state: Optional[AwsScannerWarmState], finish_by: Optional[float]
+    ) -> None:
         logger = self._configure_logging(args)
         try:
-            factory = AwsClientFactory(mfa=args.mfa_token, username=args.username)
-            tasks = AwsTaskBuilder(factory, args).build_tasks()
-            reports = AwsParallelTaskRunner(factory).run(tasks)
-            AwsScannerOutput(factory).write(args.task, reports)
+            factory = (
+                warm_state.factory(mfa=args.mfa_token, username=args.username)
+                if warm_state
+                else AwsClientFactory(mfa=args.mfa_token, username=args.username)
+            )
+            if args.task == Cmd.merge:
+                self._merge(factory, args)
+            elif args.plan:
+                self._plan(factory, args, AwsTaskBuilder(factory, args, warm_state).build_tasks())
+            else:
+                self._run(factory, args, AwsTaskBuilder(factory, args, warm_state).build_tasks(), finish_by)
+            logger.info(f"{factory.credentials_cache}")
+            unused_clients = factory.unused_clients()
+            logger.info(f"{sum(unused_clients.values())} clients were never used")
+            logger.debug(f"clients that were never used: {unused_clients}")
         except AwsScannerException as ex:
             logger.error(f"{type(ex).__name__}: {ex}")
             raise SystemExit(1)
 
+    def _run(
+        self,
+        factory: AwsClientFactory,
+        args: AwsScannerArguments,
+        tasks: Sequence[AwsTask],
+        finish_by: Optional[float],
+    ) -> None:
+        logger = logging.getLogger(self.__class__.__name__)
+        checkpoints = self._checkpoints(factory, args)
+        runner = self._task_runner(factory, args, checkpoints)
+        if finish_by and checkpoints:
+            runner.finish_by(finish_by)
+        elif finish_by:
+            logger.warning("reports checkpoints are not configured, this run cannot be continued if it runs late")
+        reports = runner.stream(tasks)
+        if args.shard:
+            deque(reports, maxlen=0)
+        else:
+            AwsScannerOutput(factory).write(args.task, reports)
+        if checkpoints and (runner.unscheduled or runner.interrupted):
+            logger.warning(
+                f"{runner.unscheduled} tasks were not started in time and {runner.interrupted} were interrupted, "
+                f"{checkpoints} can be resumed"
+            )
+            self.unfinished_run = checkpoints.run_id
+
+    def _plan(self, factory: AwsClientFactory, args: AwsScannerArguments, tasks: Sequence[AwsTask]) -> None:
+        checkpoints = self._checkpoints(factory, args)
+        shards = shard_by_account(tasks, args.plan)
+        if checkpoints:
+            checkpoints.save_plan(shards)
+            self.shards = plan_shards(shards, checkpoints.run_id)
+            print(json.dumps(self.shards))
+
+    def _merge(self, factory: AwsClientFactory, args: AwsScannerArguments) -> None:
+        checkpoints = self._checkpoints(factory, args)
+        AwsScannerOutput(factory).write(str(args.merged_task), checkpoints.merged_reports() if checkpoints else [])
+
+    @staticmethod
+    def _task_runner(
+        factory: AwsClientFactory, args: AwsScannerArguments, checkpoints: Optional[AwsTaskCheckpoints] = None
+    ) -> AwsTaskRunner:
+        if args.processes > 1:
+            return AwsProcessPoolTaskRunner(
+                factory, processes=args.processes, log_level=args.log_level, checkpoints=checkpoints
+            )
+        durations = AwsTaskDurations(Config().tasks_durations_file())
+        if Config().tasks_runner() == "async":
+            return AwsAsyncTaskRunner(factory, durations, checkpoints)
+        return AwsParallelTaskRunner(factory, durations, checkpoints)
+
+    def _checkpoints(self, factory: AwsClientFactory, args: AwsScannerArguments) -> Optional[AwsTaskCheckpoints]:
+        location = Config().reports_checkpoints()
+        if not location:
+            if args.resume or args.shard or args.plan:
+                raise AwsScannerException(
+                    "resuming, planning or sharding a run requires reports checkpoints to be configured"
+                )
+            return None
+        run_id = args.resume or args.shard or new_run_id()
+        checkpoints = AwsTaskCheckpoints(self._checkpoint_store(factory, location), run_id)
+        logging.getLogger(self.__class__.__name__).info(f"{checkpoints} (resume with --resume {checkpoints.run_id})")
+        return checkpoints
+
+    @staticmethod
+    def _checkpoint_store(factory: AwsClientFactory, location: str) -> CheckpointStore:
+        if not location.startswith("s3://"):
+            return LocalCheckpointStore(location)
+        bucket, _, prefix = location.replace("s3://", "", 1).partition("/")
+        s3 = factory.get_s3_client(Config().reports_account(), Config().reports_role())
+        return S3CheckpointStore(s3, bucket, prefix)
+
     def _configure_logging(self, args: AwsScannerArguments) -> logging.Logger:
-        logging.basicConfig(
-            level=args.log_level,
-            datefmt="%Y-%m-%dT%H:%M:%S",
-            format="%(asctime)s %(levelname)s %(module)s %(message)s",
-        )
-        logging.getLogger().setLevel(args.log_level)
-        logging.getLogger("botocore").setLevel(logging.ERROR)
-        logging.getLogger("urllib3").setLevel(logging.ERROR)
-        logging.getLogger("requests").setLevel(logging.ERROR)
+        configure_logging(args.log_level)
         return logging.getLogger(self.__class__.__name__)
@@ -1,10 +1,10 @@
-from typing import Sequence
+from typing import Iterable, Iterator
 
 from src.aws_scanner_config import AwsScannerConfig as Config
 from src.clients.aws_client_factory import AwsClientFactory
 from src.data.aws_task_report import AwsTaskReport
-from src.csv_serializer import to_csv
-from src.json_serializer import to_json
+from src.csv_serializer import to_csv_chunks
+from src.json_serializer import to_json_chunks
 
 
 class AwsScannerOutput:
@@ -12,14 +12,20 @@ class AwsScannerOutput:
         self._config = Config()
         self._factory = factory
 
-    def write(self, task: str, reports: Sequence[AwsTaskReport]) -> None:
-        output = to_csv(reports) if self._config.reports_format() == "csv" else to_json(reports)
+    def write(self, task: str, reports: Iterable[AwsTaskReport]) -> None:
+        output = to_csv_chunks(reports) if self._config.reports_format() == "csv" else to_json_chunks(reports)
         if self._config.reports_output().lower() == "s3":
             self._write_to_s3(f"{task}.{self._config.reports_format()}", output)
         else:
-            print(output)
+            self._write_to_stdout(output)
 
-    def _write_to_s3(self, task: str, report: str) -> None:
-        self._factory.get_s3_client(self._config.reports_account(), self._config.reports_role()).put_object(
-            bucket=self._config.reports_bucket(), object_name=task, object_content=report
+    @staticmethod
+    def _write_to_stdout(output: Iterator[str]) -> None:
+        for chunk in output:
+            print(chunk, end="", flush=True)
+        print()
+
+    def _write_to_s3(self, task: str, output: Iterator[str]) -> None:
+        self._factory.get_s3_client(self._config.reports_account(), self._config.reports_role()).put_object_stream(
+            bucket=self._config.reports_bucket(), object_name=task, chunks=output
         )
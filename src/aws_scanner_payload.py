@@ -0,0 +1,12 @@
+import pickle
+import zlib
+
+from typing import Any
+
+
+def to_payload(obj: Any) -> bytes:
+    return zlib.compress(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def from_payload(payload: bytes) -> Any:
+    return pickle.loads(zlib.decompress(payload))
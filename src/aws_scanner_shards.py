@@ -0,0 +1,21 @@
+from typing import Dict, Iterable, List, Sequence
+
+from src.tasks.aws_task import AwsTask
+
+
+def shard_by_account(tasks: Iterable[AwsTask], shards: int) -> List[List[AwsTask]]:
+    by_account: Dict[str, List[AwsTask]] = {}
+    for task in tasks:
+        by_account.setdefault(task.account.identifier, []).append(task)
+    sharded: List[List[AwsTask]] = [[] for _ in range(min(shards, len(by_account)))]
+    for account_tasks in sorted(by_account.values(), key=len, reverse=True):
+        min(sharded, key=len).extend(account_tasks)
+    return sharded
+
+
+def plan_shards(shards: Sequence[Sequence[AwsTask]], run_id: str) -> List[Dict[str, str]]:
+    return [{"accounts": shard_accounts(shard), "shard": run_id} for shard in shards]
+
+
+def shard_accounts(shard: Iterable[AwsTask]) -> str:
+    return ",".join(dict.fromkeys(task.account.identifier for task in shard))
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+from logging import getLogger
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Generic, Hashable, Optional, Sequence, TypeVar
+
+from src.aws_scanner_config import AwsScannerConfig as Config
+from src.clients.aws_client_factory import AwsClientFactory
+from src.clients.aws_credentials_cache import credentials_lifetime_seconds
+from src.data.aws_organizations_types import Account
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class WarmEntry(Generic[T]):
+    value: T
+    key: Hashable
+    config: Config
+    expires_at: float
+
+    def is_valid_for(self, key: Hashable) -> bool:
+        return self.key == key and self.config.is_current() and self.expires_at > monotonic()
+
+
+class AwsScannerWarmState:
+    def __init__(self) -> None:
+        self._logger = getLogger(self.__class__.__name__)
+        self._lock = Lock()
+        self._factory: Optional[WarmEntry[AwsClientFactory]] = None
+        self._accounts: Dict[Hashable, WarmEntry[Sequence[Account]]] = {}
+
+    def factory(self, mfa: str, username: str) -> AwsClientFactory:
+        with self._lock:
+            if self._factory and self._factory.is_valid_for((mfa, username)):
+                self._logger.info("reusing warm client factory")
+                self._factory.value.forget_lazy_clients()
+                return self._factory.value
+            config = Config()
+            self._factory = WarmEntry(
+                value=AwsClientFactory(mfa=mfa, username=username),
+                key=(mfa, username),
+                config=config,
+                expires_at=monotonic() + credentials_lifetime_seconds(config.session_duration_seconds()),
+            )
+            self._accounts = {}
+            return self._factory.value
+
+    def target_accounts(self, key: Hashable, provider: Callable[[], Sequence[Account]]) -> Sequence[Account]:
+        with self._lock:
+            entry = self._accounts.get(key)
+            if entry and entry.is_valid_for(key):
+                self._logger.info(f"reusing {len(entry.value)} warm target accounts")
+                return entry.value
+            config = Config()
+            accounts = provider()
+            self._accounts[key] = WarmEntry(
+                value=accounts,
+                key=key,
+                config=config,
+                expires_at=monotonic() + config.organization_accounts_ttl_seconds(),
+            )
+            return accounts
@@ -0,0 +1,46 @@
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from threading import local
+from typing import Callable, Iterator, List, Optional, Sequence, TypeVar
+
+from src.clients.aws_deadline import current_deadline, deadline
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_sub_tasks = local()
+
+
+@contextmanager
+def sub_task_executor(executor: Optional[Executor], chunk_size: int) -> Iterator[None]:
+    previous = getattr(_sub_tasks, "executor", None), getattr(_sub_tasks, "chunk_size", 0)
+    _sub_tasks.executor, _sub_tasks.chunk_size = executor, chunk_size
+    try:
+        yield
+    finally:
+        _sub_tasks.executor, _sub_tasks.chunk_size = previous
+
+
+def map_in_chunks(fn: Callable[[T], R], items: Sequence[T], results: Optional[List[R]] = None) -> List[R]:
+    results = [] if results is None else results
+    executor: Optional[Executor] = getattr(_sub_tasks, "executor", None)
+    chunk_size: int = getattr(_sub_tasks, "chunk_size", 0)
+    if not executor or chunk_size < 1 or len(items) <= chunk_size:
+        for item in items:
+            results.append(fn(item))
+        return results
+    at = current_deadline()
+    starts = range(0, len(items), chunk_size)
+    futures = [executor.submit(_run_chunk, fn, items[slice(start, start + chunk_size)], at) for start in starts]
+    try:
+        for future in futures:
+            results.extend(future.result())
+        return results
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _run_chunk(fn: Callable[[T], R], chunk: Sequence[T], at: Optional[float]) -> List[R]:
+    with deadline(at):
+        return [fn(item) for item in chunk]
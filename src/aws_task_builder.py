@@ -4,6 +4,7 @@ from datetime import date
 
 from src.aws_scanner_argument_parser import AwsScannerArguments
 from src.aws_scanner_argument_parser import AwsScannerCommands as Cmd
+from src.aws_scanner_warm_state import AwsScannerWarmState
 from src.clients.aws_client_factory import AwsClientFactory
 from src.clients.aws_organizations_client import AwsOrganizationsClient
 from src.data.aws_organizations_types import Account
@@ -33,10 +34,14 @@ from src.tasks.aws_task import AwsTask
 class AwsTaskBuilder:
     _args: AwsScannerArguments
     _orgs: Optional[AwsOrganizationsClient]
+    _warm_state: Optional[AwsScannerWarmState]
 
-    def __init__(self, factory: AwsClientFactory, args: AwsScannerArguments):
+    def __init__(
+        self, factory: AwsClientFactory, args: AwsScannerArguments, warm_state: Optional[AwsScannerWarmState] = None
+    ):
         self._logger = getLogger(self.__class__.__name__)
         self._args = args
+        self._warm_state = warm_state
         self._orgs = None if args.disable_account_lookup else factory.get_organizations_client()
 
     def build_tasks(self) -> Sequence[AwsTask]:
@@ -108,7 +113,7 @@ class AwsTaskBuilder:
     ) -> Sequence[AwsTask]:
         self._logger.info(f"creating {task.__name__} tasks with {kwargs}")
         return [
-            task(account=account, service=service, **kwargs)
+            task(account=account, service=service, services=services, **kwargs)
             for account in self._get_target_accounts()
             for service in services
         ]
@@ -122,8 +127,16 @@ class AwsTaskBuilder:
             if not self._args.accounts:
                 raise SystemExit("account lookup is disabled and no target accounts were provided")
             return [Account(acc, acc) for acc in self._args.accounts]
+        if not self._warm_state:
+            return self._lookup_target_accounts(self._orgs)
+        orgs = self._orgs
+        return self._warm_state.target_accounts(
+            (tuple(self._args.accounts or []), self._args.parent), lambda: self._lookup_target_accounts(orgs)
+        )
+
+    def _lookup_target_accounts(self, orgs: AwsOrganizationsClient) -> Sequence[Account]:
         return (
-            self._orgs.find_account_by_ids(self._args.accounts)
+            orgs.find_account_by_ids(self._args.accounts)
             if self._args.accounts
-            else self._orgs.get_target_accounts(self._args.parent)
+            else orgs.get_target_accounts(self._args.parent)
         )
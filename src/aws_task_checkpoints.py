@@ -0,0 +1,170 @@
+import json
+import os
+
+from functools import lru_cache
+from importlib import import_module
+from inspect import getmembers, isclass
+from logging import getLogger
+from pkgutil import iter_modules
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type
+from uuid import uuid4
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from src import data
+from src.aws_scanner_shards import shard_accounts
+from src.clients.aws_s3_client import AwsS3Client
+from src.data.aws_scanner_exceptions import IncompleteShardedRunException
+from src.data.aws_task_report import AwsTaskReport
+from src.json_serializer import from_typed_json, to_typed_json, type_name
+from src.tasks.aws_task import AwsTask
+
+
+PLAN_KEY = "plan"
+
+
+def new_run_id() -> str:
+    return uuid4().hex
+
+
+@lru_cache(maxsize=None)
+def report_types() -> Dict[str, Type[Any]]:
+    modules = [import_module(f"{data.__name__}.{module.name}") for module in iter_modules(data.__path__)]
+    return {
+        type_name(cls): cls
+        for module in modules
+        for _, cls in getmembers(module, isclass)
+        if cls.__module__ == module.__name__ and not issubclass(cls, BaseException)
+    }
+
+
+class CheckpointStore:
+    def keys(self, run_id: str) -> Set[str]:
+        raise NotImplementedError("this is an abstract class")
+
+    def get(self, run_id: str, key: str) -> str:
+        raise NotImplementedError("this is an abstract class")
+
+    def put(self, run_id: str, key: str, content: str) -> None:
+        raise NotImplementedError("this is an abstract class")
+
+
+class LocalCheckpointStore(CheckpointStore):
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def keys(self, run_id: str) -> Set[str]:
+        run_dir = os.path.join(self._directory, run_id)
+        return {key for key in os.listdir(run_dir) if not key.endswith(".tmp")} if os.path.isdir(run_dir) else set()
+
+    def get(self, run_id: str, key: str) -> str:
+        with open(os.path.join(self._directory, run_id, key)) as checkpoint:
+            return checkpoint.read()
+
+    def put(self, run_id: str, key: str, content: str) -> None:
+        path = os.path.join(self._directory, run_id, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as checkpoint:
+            checkpoint.write(content)
+        os.replace(f"{path}.tmp", path)
+
+    def __str__(self) -> str:
+        return self._directory
+
+
+class S3CheckpointStore(CheckpointStore):
+    def __init__(self, s3: AwsS3Client, bucket: str, prefix: str):
+        self._s3 = s3
+        self._bucket = bucket
+        self._prefix = prefix.strip("/")
+
+    def keys(self, run_id: str) -> Set[str]:
+        return {
+            key.rsplit("/", 1)[-1] for key in self._s3.list_object_keys(self._bucket, self._object_name(run_id, ""))
+        }
+
+    def get(self, run_id: str, key: str) -> str:
+        return self._s3.get_object(self._bucket, self._object_name(run_id, key))
+
+    def put(self, run_id: str, key: str, content: str) -> None:
+        self._s3.put_object(self._bucket, self._object_name(run_id, key), content)
+
+    def _object_name(self, run_id: str, key: str) -> str:
+        return "/".join(filter(None, [self._prefix, run_id])) + f"/{key}"
+
+    def __str__(self) -> str:
+        return f"s3://{self._bucket}/{self._prefix}"
+
+
+class AwsTaskCheckpoints:
+    def __init__(self, store: CheckpointStore, run_id: str):
+        self._logger = getLogger(self.__class__.__name__)
+        self._store = store
+        self._run_id = run_id
+
+    @property
+    def run_id(self) -> str:
+        return self._run_id
+
+    def restore(self, tasks: Iterable[AwsTask]) -> Tuple[List[AwsTaskReport], List[AwsTask]]:
+        checkpointed = self._store.keys(self._run_id)
+        restored, pending = [], []
+        for task in tasks:
+            report = self._load(task.report_key) if task.report_key in checkpointed else None
+            if report:
+                restored.append(report)
+            else:
+                pending.append(task)
+        self._logger.info(f"restored {len(restored)} task reports of run '{self._run_id}', {len(pending)} tasks left")
+        return restored, pending
+
+    def save_plan(self, shards: Sequence[Sequence[AwsTask]]) -> None:
+        plan = [{"accounts": shard_accounts(shard), "tasks": {t.report_key: str(t) for t in shard}} for shard in shards]
+        self._store.put(self._run_id, PLAN_KEY, json.dumps(plan))
+
+    def merged_reports(self) -> List[AwsTaskReport]:
+        plan = self._load_plan()
+        checkpointed = self._store.keys(self._run_id)
+        reports: Dict[str, Optional[AwsTaskReport]] = {
+            key: self._load(key) if key in checkpointed else None for shard in plan for key in shard["tasks"]
+        }
+        missing = [
+            f"shard {index + 1} (accounts {shard['accounts']}): {', '.join(tasks)}"
+            for index, shard in enumerate(plan)
+            for tasks in [[task for key, task in shard["tasks"].items() if not reports[key]]]
+            if tasks
+        ]
+        if missing:
+            raise IncompleteShardedRunException(f"run '{self._run_id}' has no report for {'; '.join(missing)}")
+        self._logger.info(f"loaded {len(reports)} task reports of run '{self._run_id}'")
+        return sorted(
+            filter(None, reports.values()), key=lambda report: (report.account.identifier, report.description)
+        )
+
+    def _load_plan(self) -> List[Dict[str, Any]]:
+        try:
+            return list(json.loads(self._store.get(self._run_id, PLAN_KEY)))
+        except (OSError, ValueError, TypeError, BotoCoreError, ClientError) as ex:
+            raise IncompleteShardedRunException(f"run '{self._run_id}' has no readable shard plan: {ex}") from ex
+
+    def save(self, report: AwsTaskReport) -> None:
+        if report.incomplete:
+            return
+        try:
+            self._store.put(self._run_id, report.key, to_typed_json(report, report_types()))
+        except (OSError, TypeError, BotoCoreError, ClientError) as ex:
+            self._logger.warning(f"unable to checkpoint report of '{report.description}' for {report.account}: {ex}")
+
+    def _load(self, key: str) -> Optional[AwsTaskReport]:
+        try:
+            report = from_typed_json(self._store.get(self._run_id, key), report_types())
+        except (OSError, ValueError, KeyError, TypeError, BotoCoreError, ClientError) as ex:
+            self._logger.warning(f"ignoring unreadable checkpoint '{key}' of run '{self._run_id}': {ex}")
+            return None
+        if not isinstance(report, AwsTaskReport):
+            self._logger.warning(f"ignoring checkpoint '{key}' of run '{self._run_id}' that is not a task report")
+            return None
+        return report
+
+    def __str__(self) -> str:
+        return f"checkpoints of run '{self._run_id}' in {self._store}"
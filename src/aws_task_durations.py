@@ -0,0 +1,58 @@
+import json
+import os
+
+from logging import getLogger
+from statistics import median
+from threading import Lock
+from typing import Dict, List, Optional, Sequence
+
+from src.tasks.aws_task import AwsTask
+
+
+class AwsTaskDurations:
+    def __init__(self, path: str):
+        self._logger = getLogger(self.__class__.__name__)
+        self._path = path
+        self._lock = Lock()
+        self._durations = self._load()
+
+    def expected(self, task: AwsTask) -> Optional[float]:
+        return self._durations.get(type(task).__name__, {}).get(self._key(task))
+
+    def record(self, task: AwsTask, seconds: float) -> None:
+        with self._lock:
+            self._durations.setdefault(type(task).__name__, {})[self._key(task)] = round(seconds, 3)
+
+    def order(self, tasks: Sequence[AwsTask]) -> List[AwsTask]:
+        defaults = {
+            task_type: median(durations.values()) for task_type, durations in self._durations.items() if durations
+        }
+        return sorted(tasks, key=lambda task: -(self._expected_or(task, defaults.get(type(task).__name__, 0.0))))
+
+    def save(self) -> None:
+        with self._lock:
+            content = json.dumps(self._durations, sort_keys=True)
+        try:
+            with open(f"{self._path}.tmp", "w") as file:
+                file.write(content)
+            os.replace(f"{self._path}.tmp", self._path)
+        except OSError as err:
+            self._logger.warning(f"unable to save task durations to '{self._path}': {err}")
+
+    @staticmethod
+    def _key(task: AwsTask) -> str:
+        return f"{task.account.identifier}:{task.description}"
+
+    def _expected_or(self, task: AwsTask, default: float) -> float:
+        expected = self.expected(task)
+        return default if expected is None else expected
+
+    def _load(self) -> Dict[str, Dict[str, float]]:
+        try:
+            with open(self._path) as file:
+                return {str(k): {str(a): float(d) for a, d in v.items()} for k, v in json.load(file).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as err:
+            self._logger.warning(f"ignoring unreadable task durations in '{self._path}': {err}")
+            return {}
@@ -1,10 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from inspect import signature
 from logging import getLogger
-from typing import Any, Callable, Dict, Sequence, Type
+from time import monotonic
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Type
 
-from src.data.aws_scanner_exceptions import UnsupportedClientException
+from src.data.aws_scanner_exceptions import TaskDeadlineException, UnsupportedClientException
 from src.data.aws_task_report import AwsTaskReport
+from src.aws_task_checkpoints import AwsTaskCheckpoints
+from src.aws_task_durations import AwsTaskDurations
+from src.aws_scanner_config import AwsScannerConfig as Config
 from src.clients.aws_client_factory import AwsClientFactory
+from src.aws_sub_tasks import sub_task_executor
+from src.clients.aws_athena_catalog import AwsAthenaCatalog, athena_catalog
+from src.clients.aws_deadline import deadline
 from src.tasks.aws_task import AwsTask
 
 from src.clients.aws_athena_client import AwsAthenaClient
@@ -24,41 +33,168 @@ from src.clients.composite.aws_s3_kms_client import AwsS3KmsClient
 from src.clients.composite.aws_route53_client import AwsRoute53Client
 
 
+ClientProvider = Callable[[AwsClientFactory, AwsTask], Any]
+
+CLIENT_PROVIDERS: Dict[Any, ClientProvider] = {
+    AwsAthenaClient: lambda factory, task: factory.get_athena_client(),
+    AwsCentralLoggingClient: lambda factory, task: factory.get_central_logging_client(),
+    AwsCloudtrailClient: lambda factory, task: factory.get_cloudtrail_client(task.account),
+    AwsCostExplorerClient: lambda factory, task: factory.get_cost_explorer_client(task.account),
+    AwsEC2Client: lambda factory, task: factory.get_ec2_client(task.account),
+    AwsIamClient: lambda factory, task: factory.get_iam_client(task.account),
+    AwsIamAuditClient: lambda factory, task: factory.get_iam_client_for_audit(task.account),
+    AwsOrganizationsClient: lambda factory, task: factory.get_organizations_client(),
+    AwsSSMClient: lambda factory, task: factory.get_ssm_client(task.account),
+    AwsS3Client: lambda factory, task: factory.get_s3_client(task.account),
+    AwsHostedZonesClient: lambda factory, task: factory.get_hosted_zones_client(task.account),
+    AwsS3KmsClient: lambda factory, task: factory.get_s3_kms_client(task.account),
+    AwsVpcClient: lambda factory, task: factory.get_vpc_client(task.account),
+    AwsVpcPeeringClient: lambda factory, task: factory.get_vpc_peering_client(task.account),
+    AwsRoute53Client: lambda factory, task: factory.get_route53_client(task.account),
+}
+
+
+def register_client_provider(client_type: Type[Any], provider: ClientProvider) -> None:
+    CLIENT_PROVIDERS[client_type] = provider
+
+
+TASK_CLIENT_TYPES: Dict[Type[AwsTask], Optional[Any]] = {}
+
+
+def task_client_type(task_type: Type[AwsTask]) -> Optional[Any]:
+    if task_type not in TASK_CLIENT_TYPES:
+        client_param = signature(task_type._run_task).parameters.get("client")
+        TASK_CLIENT_TYPES[task_type] = client_param.annotation if client_param else None
+    return TASK_CLIENT_TYPES[task_type]
+
+
 class AwsTaskRunner:
-    def __init__(self, client_factory: AwsClientFactory) -> None:
+    def __init__(
+        self,
+        client_factory: AwsClientFactory,
+        durations: Optional[AwsTaskDurations] = None,
+        checkpoints: Optional[AwsTaskCheckpoints] = None,
+    ) -> None:
         self._logger = getLogger(self.__class__.__name__)
         self._client_factory = client_factory
+        self._durations = durations
+        self._checkpoints = checkpoints
+        self._task_timeout: Optional[int] = None
+        self._run_deadline: Optional[float] = None
+        self._sub_task_executor: Optional[ThreadPoolExecutor] = None
+        self._sub_task_size = 0
+        self._athena_catalog: Optional[AwsAthenaCatalog] = None
+        self._finish_by: Optional[float] = None
+        self._scheduling_deadline: Optional[float] = None
+        self._continuation_deadline: Optional[float] = None
+        self._unscheduled = 0
+        self._interrupted = 0
+
+    @property
+    def unscheduled(self) -> int:
+        return self._unscheduled
+
+    @property
+    def interrupted(self) -> int:
+        return self._interrupted
+
+    def finish_by(self, at: Optional[float]) -> None:
+        self._finish_by = at
 
     def run(self, tasks: Sequence[AwsTask]) -> Sequence[AwsTaskReport]:
-        return self._run_tasks(tasks)
+        return list(self.stream(tasks))
+
+    def stream(self, tasks: Iterable[AwsTask]) -> Iterator[AwsTaskReport]:
+        with self._running():
+            restored, pending = self._checkpoints.restore(tasks) if self._checkpoints else ([], tasks)
+            yield from restored
+            for report in self._stream_tasks(self._scheduled(self._order(pending))):
+                self._count_interrupted(report)
+                if self._checkpoints:
+                    self._checkpoints.save(report)
+                yield report
+        self._save_durations()
+
+    @contextmanager
+    def _running(self) -> Iterator[None]:
+        config = Config()
+        run_timeout = config.tasks_run_timeout_seconds()
+        self._task_timeout = config.tasks_timeout_seconds() or None
+        self._run_deadline = monotonic() + run_timeout if run_timeout else None
+        if self._finish_by is not None:
+            margin = config.tasks_continuation_margin_seconds()
+            self._scheduling_deadline = self._finish_by - margin
+            self._continuation_deadline = self._finish_by - margin / 2
+            self._run_deadline = min(filter(None, [self._run_deadline, self._continuation_deadline]))
+        self._unscheduled = 0
+        self._interrupted = 0
+        self._sub_task_size = config.tasks_sub_task_size()
+        sub_task_executors = config.tasks_sub_task_executors()
+        self._sub_task_executor = ThreadPoolExecutor(max_workers=sub_task_executors) if sub_task_executors else None
+        self._athena_catalog = AwsAthenaCatalog() if config.athena_shared_tables() else None
+        try:
+            yield
+        finally:
+            if self._sub_task_executor:
+                self._sub_task_executor.shutdown(wait=True, cancel_futures=True)
+                self._sub_task_executor = None
+            self._drop_athena_catalog()
+
+    def _drop_athena_catalog(self) -> None:
+        if self._athena_catalog:
+            self._athena_catalog.drop_all(lambda: self._client_factory.get_athena_client())
+            self._athena_catalog = None
+
+    def _scheduled(self, tasks: Iterable[AwsTask]) -> Iterator[AwsTask]:
+        for task in tasks:
+            if not self._scheduling_stopped():
+                yield task
+
+    def _scheduling_stopped(self) -> bool:
+        stopped = self._scheduling_deadline is not None and monotonic() >= self._scheduling_deadline
+        if stopped:
+            self._unscheduled += 1
+        return stopped
+
+    def _count_interrupted(self, report: AwsTaskReport) -> None:
+        deadline_passed = self._continuation_deadline is not None and monotonic() >= self._continuation_deadline
+        if report.incomplete and deadline_passed:
+            self._interrupted += 1
+
+    def _task_deadline(self, start: float) -> Optional[float]:
+        deadlines = [start + self._task_timeout if self._task_timeout else None, self._run_deadline]
+        return min(filter(None, deadlines), default=None)
 
     def _run_tasks(self, tasks: Sequence[AwsTask]) -> Sequence[AwsTaskReport]:
         raise NotImplementedError("this is an abstract class")
 
+    def _stream_tasks(self, tasks: Iterable[AwsTask]) -> Iterator[AwsTaskReport]:
+        return iter(self._run_tasks(list(tasks)))
+
+    def _order(self, tasks: Iterable[AwsTask]) -> Iterable[AwsTask]:
+        return self._durations.order(list(tasks)) if self._durations else tasks
+
+    def _save_durations(self) -> None:
+        if self._durations:
+            self._durations.save()
+
     def _run_task(self, task: AwsTask) -> AwsTaskReport:
-        client_param = signature(task._run_task).parameters.get("client")
-
-        task_client_mapping: Dict[Type[Any], Callable[[], AwsTaskReport]] = {
-            AwsAthenaClient: lambda: task.run(self._client_factory.get_athena_client()),
-            AwsCentralLoggingClient: lambda: task.run(self._client_factory.get_central_logging_client()),
-            AwsCloudtrailClient: lambda: task.run(self._client_factory.get_cloudtrail_client(task.account)),
-            AwsCostExplorerClient: lambda: task.run(self._client_factory.get_cost_explorer_client(task.account)),
-            AwsEC2Client: lambda: task.run(self._client_factory.get_ec2_client(task.account)),
-            AwsIamClient: lambda: task.run(self._client_factory.get_iam_client(task.account)),
-            AwsIamAuditClient: lambda: task.run(self._client_factory.get_iam_client_for_audit(task.account)),
-            AwsOrganizationsClient: lambda: task.run(self._client_factory.get_organizations_client()),
-            AwsSSMClient: lambda: task.run(self._client_factory.get_ssm_client(task.account)),
-            AwsS3Client: lambda: task.run(self._client_factory.get_s3_client(task.account)),
-            AwsHostedZonesClient: lambda: task.run(self._client_factory.get_hosted_zones_client(task.account)),
-            AwsS3KmsClient: lambda: task.run(self._client_factory.get_s3_kms_client(task.account)),
-            AwsVpcClient: lambda: task.run(self._client_factory.get_vpc_client(task.account)),
-            AwsVpcPeeringClient: lambda: task.run(self._client_factory.get_vpc_peering_client(task.account)),
-            AwsRoute53Client: lambda: task.run(self._client_factory.get_route53_client(task.account)),
-        }
-
-        if not client_param:
-            raise UnsupportedClientException(f"{task} requires a client argument")
-        if client_param.annotation not in task_client_mapping:
-            raise UnsupportedClientException(f"client type {client_param.annotation} is not supported")
+        start = monotonic()
+        try:
+            with deadline(self._task_deadline(start)), sub_task_executor(self._sub_task_executor, self._sub_task_size):
+                with athena_catalog(self._athena_catalog):
+                    return self._dispatch(task)
+        except TaskDeadlineException as ex:
+            return task.incomplete(ex)
+        finally:
+            if self._durations:
+                self._durations.record(task, monotonic() - start)
 
-        return task_client_mapping[client_param.annotation]()
+    def _dispatch(self, task: AwsTask) -> AwsTaskReport:
+        client_type = task_client_type(type(task))
+        if client_type is None:
+            raise UnsupportedClientException(f"{task} requires a client argument")
+        provider = CLIENT_PROVIDERS.get(client_type)
+        if not provider:
+            raise UnsupportedClientException(f"client type {client_type} is not supported")
+        return task.run(provider(self._client_factory, task))
@@ -1,14 +1,14 @@
 from logging import getLogger
 from string import Template
-from time import sleep
-from typing import Any, Dict, List, Type
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Type
 
 from botocore.client import BaseClient
 from botocore.exceptions import BotoCoreError, ClientError
 
 from src.data import aws_scanner_exceptions as exceptions
 from src.clients import aws_athena_system_queries as queries
-from src.clients.aws_athena_query_states import COMPLETED_STATES, SUCCESS_STATES
+from src.clients.aws_athena_result_set import AthenaColumns, decode_columns, extend_columns
 from src.aws_scanner_config import AwsScannerConfig as Config
 
 
@@ -41,22 +41,35 @@ class AwsAthenaAsyncClient:
             raise_on_failure=exceptions.DropTableException,
         )
 
-    def has_query_completed(self, query_id: str) -> bool:
-        return self._is_query_state_in(query_id, COMPLETED_STATES)
+    def get_query_results(self, query_id: str) -> List[Any]:
+        return list(self._get_result_rows(query_id))
 
-    def has_query_succeeded(self, query_id: str) -> bool:
-        return self._is_query_state_in(query_id, SUCCESS_STATES)
+    def get_query_columns(self, query_id: str) -> AthenaColumns:
+        columns: AthenaColumns = {}
+        for page in self.iter_query_columns(query_id):
+            extend_columns(columns, page)
+        return columns
 
-    def get_query_results(self, query_id: str) -> List[Any]:
-        self._logger.debug(f"fetching results for query {query_id}")
-        try:
-            query_result_response = self._boto_athena.get_query_results(QueryExecutionId=query_id)
-            return list(query_result_response["ResultSet"]["Rows"][1:])
-        except (BotoCoreError, ClientError) as error:
-            raise exceptions.GetQueryResultsException(f"query {query_id} results unknown: {error}") from None
+    def iter_query_columns(self, query_id: str) -> Iterator[AthenaColumns]:
+        for page, response in enumerate(self._get_result_pages(query_id)):
+            yield decode_columns(response["ResultSet"], skip_rows=0 if page else 1)
 
-    def get_query_error(self, query_id: str) -> str:
-        return str(self._get_query_execution(query_id)["QueryExecution"]["Status"]["StateChangeReason"])
+    def _get_result_rows(self, query_id: str) -> Iterator[Dict[str, Any]]:
+        for page, response in enumerate(self._get_result_pages(query_id)):
+            yield from islice(response["ResultSet"]["Rows"], 0 if page else 1, None)
+
+    def _get_result_pages(self, query_id: str) -> Iterator[Dict[str, Any]]:
+        self._logger.debug(f"fetching results for query {query_id}")
+        request = {"QueryExecutionId": query_id}
+        while True:
+            try:
+                response = self._boto_athena.get_query_results(**request)
+            except (BotoCoreError, ClientError) as error:
+                raise exceptions.GetQueryResultsException(f"query {query_id} results unknown: {error}") from None
+            yield response
+            if not response.get("NextToken"):
+                return
+            request["NextToken"] = response["NextToken"]
 
     def run_query(
         self,
@@ -64,7 +77,6 @@ class AwsAthenaAsyncClient:
         database: str = "",
         raise_on_failure: Type[Exception] = exceptions.RunQueryException,
     ) -> str:
-        sleep(self._config.athena_query_throttling_seconds())
         self._logger.debug(f"running query {query}")
         try:
             query_execution_response = self._boto_athena.start_query_execution(
@@ -92,15 +104,5 @@ class AwsAthenaAsyncClient:
         except (BotoCoreError, ClientError) as error:
             raise exceptions.ListTablesException(error) from None
 
-    def _is_query_state_in(self, query_id: str, expected_states: List[str]) -> bool:
-        return self._get_query_execution(query_id)["QueryExecution"]["Status"]["State"] in expected_states
-
     def _build_exec_context(self, database: str) -> Dict[str, str]:
         return {"Catalog": self._catalog, "Database": database} if database else {"Catalog": self._catalog}
-
-    def _get_query_execution(self, query_id: str) -> Dict[Any, Any]:
-        self._logger.debug(f"polling execution state for query {query_id}")
-        try:
-            return dict(self._boto_athena.get_query_execution(QueryExecutionId=query_id))
-        except (BotoCoreError, ClientError) as error:
-            raise exceptions.UnknownQueryStateException(f"query {query_id} state unknown: {error}") from None
@@ -0,0 +1,136 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
+from logging import getLogger
+from threading import Lock, local
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.clients.aws_athena_client import AwsAthenaClient
+from src.clients.aws_athena_result_set import AthenaColumns
+from src.data.aws_athena_pipeline import AwsAthenaResource, AwsAthenaStatement
+from src.data.aws_scanner_exceptions import AwsScannerException, TaskDeadlineException
+
+CatalogKey = Union[AwsAthenaResource, AwsAthenaStatement]
+
+_catalog = local()
+
+
+@contextmanager
+def athena_catalog(catalog: Optional["AwsAthenaCatalog"]) -> Iterator[None]:
+    previous = current_athena_catalog()
+    _catalog.current = catalog
+    try:
+        yield
+    finally:
+        _catalog.current = previous
+
+
+def current_athena_catalog() -> Optional["AwsAthenaCatalog"]:
+    return getattr(_catalog, "current", None)
+
+
+class AwsAthenaCatalog:
+    def __init__(self) -> None:
+        self._logger = getLogger(self.__class__.__name__)
+        self._lock = Lock()
+        self._databases: Dict[str, str] = {}
+        self._entries: Dict[CatalogKey, Future[Optional[AthenaColumns]]] = {}
+        self._unread: Dict[AwsAthenaStatement, int] = {}
+        self._drops: List[AwsAthenaStatement] = []
+
+    def database(self, account_id: str, name: str) -> str:
+        with self._lock:
+            return self._databases.setdefault(account_id, name)
+
+    def claim(self, key: CatalogKey) -> Tuple[Future[Optional[AthenaColumns]], bool]:
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key], False
+            future = self._entries[key] = Future()
+            return future, True
+
+    def created(self, resource: AwsAthenaResource) -> None:
+        with self._lock:
+            self._drops.extend(resource.drop)
+            future = self._entries[resource]
+        future.set_result({})
+
+    def queried(self, statement: AwsAthenaStatement, columns: AthenaColumns, readers: int = 1) -> None:
+        with self._lock:
+            future = self._entries[statement]
+            self._unread[statement] = readers
+        future.set_result(columns)
+        self.read(statement, future)
+
+    def read(self, statement: AwsAthenaStatement, future: Future[Optional[AthenaColumns]]) -> None:
+        with self._lock:
+            if self._entries.get(statement) is not future:
+                return
+            self._unread[statement] -= 1
+            if self._unread[statement] < 1:
+                del self._unread[statement], self._entries[statement]
+
+    def failed(self, key: CatalogKey, error: Exception) -> None:
+        with self._lock:
+            future = self._entries.pop(key)
+        future.set_exception(error)
+
+    def release(self, key: CatalogKey) -> None:
+        with self._lock:
+            future = self._entries.pop(key)
+        future.set_result(None)
+
+    def create(self, resource: AwsAthenaResource, execute: Callable[[AwsAthenaStatement], Any]) -> None:
+        if self._wait_or_claim(resource)[0] is None:
+            self._run(resource, lambda: execute(resource.create))
+            self.created(resource)
+
+    def query(
+        self,
+        statement: AwsAthenaStatement,
+        execute: Callable[[AwsAthenaStatement], AthenaColumns],
+        readers: int = 1,
+    ) -> AthenaColumns:
+        columns, future = self._wait_or_claim(statement)
+        if columns is None:
+            columns = self._run(statement, lambda: execute(statement))
+            self.queried(statement, columns, readers)
+        else:
+            self.read(statement, future)
+        return columns
+
+    def _wait_or_claim(self, key: CatalogKey) -> Tuple[Optional[AthenaColumns], Future[Optional[AthenaColumns]]]:
+        future, owner = self.claim(key)
+        while not owner:
+            result = future.result()
+            if result is not None:
+                return result, future
+            future, owner = self.claim(key)
+        return None, future
+
+    def _run(self, key: CatalogKey, run: Callable[[], Any]) -> Any:
+        try:
+            return run()
+        except TaskDeadlineException:
+            self.release(key)
+            raise
+        except Exception as ex:
+            self.failed(key, ex)
+            raise
+
+    def drop_statements(self) -> List[AwsAthenaStatement]:
+        with self._lock:
+            drops, self._drops = self._drops, []
+        return drops[::-1]
+
+    def drop_all(self, athena: Callable[[], AwsAthenaClient]) -> None:
+        drops = self.drop_statements()
+        if not drops:
+            return
+        client = athena()
+        for statement in drops:
+            try:
+                client.run_query(
+                    database=statement.database, query=statement.query, raise_on_failure=statement.raise_on_failure
+                )
+            except AwsScannerException as ex:
+                self._logger.error(f"failed to drop shared Athena resource: '{type(ex).__name__}: {ex}'")
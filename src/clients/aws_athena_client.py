@@ -1,38 +1,59 @@
-from time import sleep
-from typing import Any, List, Optional, Type
+from typing import Any, Dict, Iterator, List, Optional, Type
 
 from botocore.client import BaseClient
 
 from src.aws_scanner_config import AwsScannerConfig as Config
 from src.data import aws_scanner_exceptions as exceptions
 from src.clients.aws_athena_async_client import AwsAthenaAsyncClient
+from src.clients.aws_athena_query_limiter import AwsAthenaQueryLimiter
+from src.clients.aws_athena_query_states import SUCCESS_STATES
+from src.clients.aws_athena_query_waiter import AwsAthenaQueryWaiter
+from src.clients.aws_athena_result_set import AthenaColumns
+
+
+def athena_query_limiter(config: Config) -> AwsAthenaQueryLimiter:
+    return AwsAthenaQueryLimiter(
+        rate_per_second=config.athena_query_rate_per_second(),
+        burst=config.athena_query_burst(),
+        max_running=config.athena_max_running_queries(),
+    )
 
 
 class AwsAthenaClient:
-    def __init__(self, boto_athena: BaseClient):
+    def __init__(
+        self,
+        boto_athena: BaseClient,
+        waiter: Optional[AwsAthenaQueryWaiter] = None,
+        limiter: Optional[AwsAthenaQueryLimiter] = None,
+    ):
         self._config = Config()
         self._athena_async = AwsAthenaAsyncClient(boto_athena)
+        self._waiter = waiter or AwsAthenaQueryWaiter(lambda: boto_athena)
+        self._limiter = limiter or athena_query_limiter(self._config)
 
     def create_database(self, database_name: str) -> None:
-        self._wait_for_success(
-            query_id=self._athena_async.create_database(database_name=database_name),
-            timeout_seconds=self._config.athena_query_timeout_seconds(),
-            raise_on_failure=exceptions.CreateDatabaseException,
-        )
+        with self._limiter.running():
+            self._wait_for_success(
+                query_id=self._athena_async.create_database(database_name=database_name),
+                timeout_seconds=self._config.athena_query_timeout_seconds(),
+                raise_on_failure=exceptions.CreateDatabaseException,
+            )
 
     def drop_database(self, database_name: str) -> None:
-        self._wait_for_success(
-            query_id=self._athena_async.drop_database(database_name=database_name),
-            timeout_seconds=self._config.athena_query_timeout_seconds(),
-            raise_on_failure=exceptions.DropDatabaseException,
-        )
+        with self._limiter.running():
+            self._wait_for_success(
+                query_id=self._athena_async.drop_database(database_name=database_name),
+                timeout_seconds=self._config.athena_query_timeout_seconds(),
+                raise_on_failure=exceptions.DropDatabaseException,
+            )
 
     def drop_table(self, database: str, table: str) -> None:
-        self._wait_for_success(
-            query_id=self._athena_async.drop_table(database=database, table=table),
-            timeout_seconds=self._config.athena_query_timeout_seconds(),
-            raise_on_failure=exceptions.DropTableException,
-        )
+        with self._limiter.running():
+            self._wait_for_success(
+                query_id=self._athena_async.drop_table(database=database, table=table),
+                timeout_seconds=self._config.athena_query_timeout_seconds(),
+                raise_on_failure=exceptions.DropTableException,
+            )
 
     def list_databases(self) -> List[str]:
         return self._athena_async.list_databases()
@@ -41,21 +62,45 @@ class AwsAthenaClient:
         return self._athena_async.list_tables(database)
 
     def run_query(self, database: str, query: str, raise_on_failure: Optional[Type[Exception]] = None) -> List[Any]:
-        return self._wait_for_success(
-            query_id=self._athena_async.run_query(query=query, database=database),
-            timeout_seconds=self._config.athena_query_timeout_seconds(),
-            raise_on_failure=raise_on_failure or exceptions.RunQueryException,
-        )
-
-    def _wait_for_completion(self, query_id: str, timeout_seconds: int) -> None:
-        for _ in range(timeout_seconds):
-            if self._athena_async.has_query_completed(query_id):
-                return
-            sleep(self._config.athena_query_results_polling_delay_seconds())
-        raise exceptions.TimeoutException(f"query execution id: {query_id}")
+        with self._limiter.running():
+            return self._wait_for_success(
+                query_id=self._athena_async.run_query(query=query, database=database),
+                timeout_seconds=self._config.athena_query_timeout_seconds(),
+                raise_on_failure=raise_on_failure or exceptions.RunQueryException,
+            )
+
+    def query_columns(
+        self, database: str, query: str, raise_on_failure: Optional[Type[Exception]] = None
+    ) -> AthenaColumns:
+        with self._limiter.running():
+            query_id = self._athena_async.run_query(query=query, database=database)
+            self._wait_for_query(
+                query_id=query_id,
+                timeout_seconds=self._config.athena_query_timeout_seconds(),
+                raise_on_failure=raise_on_failure or exceptions.RunQueryException,
+            )
+            return self._athena_async.get_query_columns(query_id)
+
+    def query_column_pages(
+        self, database: str, query: str, raise_on_failure: Optional[Type[Exception]] = None
+    ) -> Iterator[AthenaColumns]:
+        with self._limiter.running():
+            query_id = self._athena_async.run_query(query=query, database=database)
+            self._wait_for_query(
+                query_id=query_id,
+                timeout_seconds=self._config.athena_query_timeout_seconds(),
+                raise_on_failure=raise_on_failure or exceptions.RunQueryException,
+            )
+        yield from self._athena_async.iter_query_columns(query_id)
+
+    def _wait_for_completion(self, query_id: str, timeout_seconds: int) -> Dict[str, Any]:
+        return self._waiter.wait(query_id, timeout_seconds)
 
     def _wait_for_success(self, query_id: str, timeout_seconds: int, raise_on_failure: Type[Exception]) -> List[Any]:
-        self._wait_for_completion(query_id, timeout_seconds)
-        if self._athena_async.has_query_succeeded(query_id):
-            return self._athena_async.get_query_results(query_id)
-        raise raise_on_failure(self._athena_async.get_query_error(query_id))
+        self._wait_for_query(query_id, timeout_seconds, raise_on_failure)
+        return self._athena_async.get_query_results(query_id)
+
+    def _wait_for_query(self, query_id: str, timeout_seconds: int, raise_on_failure: Type[Exception]) -> None:
+        status = self._wait_for_completion(query_id, timeout_seconds)["Status"]
+        if status["State"] not in SUCCESS_STATES:
+            raise raise_on_failure(str(status["StateChangeReason"]))
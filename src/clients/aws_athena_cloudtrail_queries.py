@@ -30,10 +30,16 @@ CREATE_TABLE = (
     "STORED AS INPUTFORMAT 'com.amazon.emr.cloudtrail.CloudTrailInputFormat' "
     "OUTPUTFORMAT 'org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat' "
     "LOCATION 's3://$cloudtrail_logs_bucket/AWSLogs/$account/CloudTrail/' "
-    "TBLPROPERTIES ('classification'='cloudtrail')"
-)
-
-ADD_PARTITION_YEAR_MONTH = (
-    "ALTER TABLE `$account` ADD PARTITION (region='$region', year='$year', month='$month') LOCATION "
-    "'s3://$cloudtrail_logs_bucket/AWSLogs/$account/CloudTrail/$region/$year/$month'"
+    "TBLPROPERTIES ("
+    "'classification'='cloudtrail',"
+    "'projection.enabled'='true',"
+    "'projection.region.type'='enum',"
+    "'projection.region.values'='$regions',"
+    "'projection.year.type'='integer',"
+    "'projection.year.range'='$years',"
+    "'projection.month.type'='integer',"
+    "'projection.month.range'='1,12',"
+    "'projection.month.digits'='2',"
+    "'storage.location.template'="
+    "'s3://$cloudtrail_logs_bucket/AWSLogs/$account/CloudTrail/$${region}/$${year}/$${month}')"
 )
@@ -17,7 +17,14 @@ CREATE_FL_TABLE_YEAR_MONTH = (
     "PARTITIONED BY (`year` string, `month` string) "
     "ROW FORMAT DELIMITED "
     "FIELDS TERMINATED BY ' ' "
-    "LOCATION 's3://$flow_logs_bucket/'"
+    "LOCATION 's3://$flow_logs_bucket/' "
+    "TBLPROPERTIES ("
+    "'projection.enabled'='true',"
+    "'projection.year.type'='enum',"
+    "'projection.year.values'='$year',"
+    "'projection.month.type'='enum',"
+    "'projection.month.values'='$month',"
+    "'storage.location.template'='s3://$flow_logs_bucket/$${year}/$${month}')"
 )
 
 CREATE_FL_TABLE_YEAR_MONTH_DAY = (
@@ -39,17 +46,11 @@ CREATE_FL_TABLE_YEAR_MONTH_DAY = (
     "PARTITIONED BY (`date` date) "
     "ROW FORMAT DELIMITED "
     "FIELDS TERMINATED BY ' ' "
-    "LOCATION 's3://$flow_logs_bucket/'"
-)
-
-ADD_PARTITION_YEAR_MONTH = (
-    "ALTER TABLE `$table_name` "
-    "ADD PARTITION (year='$year', month='$month') "
-    "LOCATION 's3://$flow_logs_bucket/$year/$month'"
-)
-
-ADD_PARTITION_YEAR_MONTH_DAY = (
-    "ALTER TABLE `$table_name` "
-    "ADD PARTITION (date='$year-$month-$day') "
-    "LOCATION 's3://$flow_logs_bucket/$year/$month/$day'"
+    "LOCATION 's3://$flow_logs_bucket/' "
+    "TBLPROPERTIES ("
+    "'projection.enabled'='true',"
+    "'projection.date.type'='date',"
+    "'projection.date.format'='yyyy/MM/dd',"
+    "'projection.date.range'='$year/$month/$day,$year/$month/$day',"
+    "'storage.location.template'='s3://$flow_logs_bucket/$${date}')"
 )
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from logging import getLogger
+from threading import BoundedSemaphore, Lock
+from time import monotonic, sleep
+from typing import Iterator, Optional
+
+
+class AwsAthenaQueryLimiter:
+    def __init__(self, rate_per_second: int, burst: int, max_running: int):
+        self._logger = getLogger(self.__class__.__name__)
+        self._rate = rate_per_second
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._updated_at = monotonic()
+        self._lock = Lock()
+        self._running: Optional[BoundedSemaphore] = BoundedSemaphore(max_running) if max_running > 0 else None
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self) -> None:
+        if self._running:
+            self._running.acquire()
+        while wait_seconds := self._take_token():
+            self._logger.debug(f"waiting {wait_seconds:.3f}s before starting a query")
+            sleep(wait_seconds)
+
+    def try_acquire(self) -> bool:
+        if self._running and not self._running.acquire(blocking=False):
+            return False
+        if self._take_token():
+            self.release()
+            return False
+        return True
+
+    def release(self) -> None:
+        if self._running:
+            self._running.release()
+
+    def _take_token(self) -> float:
+        if self._rate <= 0:
+            return 0.0
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self._burst, self._tokens + max(0.0, now - self._updated_at) * self._rate)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+from logging import getLogger
+from threading import Condition
+from time import monotonic
+from typing import Any, Callable, Dict, List
+
+from botocore.client import BaseClient
+from botocore.exceptions import BotoCoreError, ClientError
+
+from src.aws_scanner_config import AwsScannerConfig as Config
+from src.clients.aws_athena_query_states import COMPLETED_STATES
+from src.clients.aws_deadline import check_deadline
+from src.data import aws_scanner_exceptions as exceptions
+
+BATCH_SIZE = 50
+
+
+def get_query_executions(boto_athena: BaseClient, query_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    executions: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(query_ids), BATCH_SIZE):
+        executions.update(_batch_get_query_execution(boto_athena, query_ids[slice(start, start + BATCH_SIZE)]))
+    return executions
+
+
+def _batch_get_query_execution(boto_athena: BaseClient, query_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    logger = getLogger(AwsAthenaQueryWaiter.__name__)
+    logger.debug(f"polling execution state for queries {query_ids}")
+    try:
+        response = boto_athena.batch_get_query_execution(QueryExecutionIds=query_ids)
+    except (BotoCoreError, ClientError) as error:
+        raise exceptions.UnknownQueryStateException(f"queries {query_ids} state unknown: {error}") from None
+    for unprocessed in response.get("UnprocessedQueryExecutionIds", []):
+        logger.debug(f"query {unprocessed['QueryExecutionId']} state unknown: {unprocessed}")
+    return {execution["QueryExecutionId"]: execution for execution in response["QueryExecutions"]}
+
+
+@dataclass
+class PendingQuery:
+    delay: float
+    poll_at: float
+
+    def back_off(self, now: float, max_delay: float) -> None:
+        self.poll_at = now + self.delay
+        self.delay = min(self.delay * 2, max_delay)
+
+
+class AwsAthenaQueryWaiter:
+    def __init__(self, athena: Callable[[], BaseClient]):
+        self._logger = getLogger(self.__class__.__name__)
+        self._athena = athena
+        self._config = Config()
+        self._condition = Condition()
+        self._pending: Dict[str, PendingQuery] = {}
+        self._completed: Dict[str, Dict[str, Any]] = {}
+        self._polling = False
+        self._polls = 0
+
+    @property
+    def polls(self) -> int:
+        return self._polls
+
+    def wait(self, query_id: str, timeout_seconds: int) -> Dict[str, Any]:
+        give_up_at = monotonic() + timeout_seconds
+        delay = self._config.athena_query_results_polling_delay_seconds()
+        with self._condition:
+            self._pending[query_id] = PendingQuery(delay, monotonic() + delay)
+        try:
+            return self._wait(query_id, give_up_at)
+        finally:
+            with self._condition:
+                self._pending.pop(query_id, None)
+                self._completed.pop(query_id, None)
+
+    def _wait(self, query_id: str, give_up_at: float) -> Dict[str, Any]:
+        while True:
+            check_deadline()
+            with self._condition:
+                if query_id in self._completed:
+                    return self._completed.pop(query_id)
+                now = monotonic()
+                if now >= give_up_at:
+                    raise exceptions.TimeoutException(f"query execution id: {query_id}")
+                due = self._claim_due(now)
+                if not due:
+                    self._condition.wait(max(0.0, min([give_up_at, *self._poll_times()]) - now))
+                    continue
+            self._poll(due)
+
+    def _claim_due(self, now: float) -> List[str]:
+        if self._polling:
+            return []
+        due = [query_id for query_id, pending in self._pending.items() if pending.poll_at <= now]
+        self._polling = bool(due)
+        return due
+
+    def _poll_times(self) -> List[float]:
+        return [] if self._polling else [pending.poll_at for pending in self._pending.values()]
+
+    def _poll(self, query_ids: List[str]) -> None:
+        executions: Dict[str, Dict[str, Any]] = {}
+        try:
+            executions = get_query_executions(self._athena(), query_ids)
+        finally:
+            with self._condition:
+                self._polling = False
+                self._polls += 1
+                self._record(query_ids, executions)
+                self._condition.notify_all()
+
+    def _record(self, query_ids: List[str], executions: Dict[str, Dict[str, Any]]) -> None:
+        now = monotonic()
+        for query_id in query_ids:
+            execution = executions.get(query_id)
+            pending = self._pending.get(query_id)
+            if execution and execution["Status"]["State"] in COMPLETED_STATES:
+                self._completed[query_id] = execution
+            elif pending:
+                pending.back_off(now, self._config.athena_query_results_polling_max_delay_seconds())
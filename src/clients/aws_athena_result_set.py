@@ -0,0 +1,42 @@
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+AthenaColumns = Dict[str, List[Any]]
+
+INTEGER_TYPES = {"tinyint", "smallint", "integer", "int", "bigint"}
+FLOAT_TYPES = {"float", "real", "double"}
+
+
+def decode_columns(result_set: Dict[str, Any], skip_rows: int = 0) -> AthenaColumns:
+    column_info = result_set["ResultSetMetadata"]["ColumnInfo"]
+    columns: AthenaColumns = {column["Name"]: [] for column in column_info}
+    cells = zip(*(row["Data"] for row in islice(result_set["Rows"], skip_rows, None)))
+    for column, values in zip(column_info, cells):
+        decode = _decoder(column["Type"])
+        columns[column["Name"]] = [decode(cell["VarCharValue"]) if "VarCharValue" in cell else None for cell in values]
+    return columns
+
+
+def extend_columns(columns: AthenaColumns, page: AthenaColumns) -> AthenaColumns:
+    for name, values in page.items():
+        columns.setdefault(name, []).extend(values)
+    return columns
+
+
+def to_records(columns: AthenaColumns) -> List[Dict[str, Any]]:
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def iter_records(pages: Iterable[AthenaColumns]) -> Iterator[Dict[str, Any]]:
+    for columns in pages:
+        yield from to_records(columns)
+
+
+def _decoder(column_type: str) -> Callable[[str], Any]:
+    if column_type in INTEGER_TYPES:
+        return int
+    if column_type in FLOAT_TYPES:
+        return float
+    if column_type == "boolean":
+        return lambda value: value == "true"
+    return str
@@ -0,0 +1,370 @@
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from logging import getLogger
+from string import Template
+from threading import Condition, Thread
+from time import monotonic
+from types import TracebackType
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple, Type
+
+from botocore.client import BaseClient
+
+from src.aws_scanner_config import AwsScannerConfig as Config
+from src.clients import aws_athena_system_queries as queries
+from src.clients.aws_athena_async_client import AwsAthenaAsyncClient
+from src.clients.aws_athena_catalog import AwsAthenaCatalog, CatalogKey
+from src.clients.aws_athena_query_limiter import AwsAthenaQueryLimiter
+from src.clients.aws_athena_query_states import COMPLETED_STATES, SUCCESS_STATES
+from src.clients.aws_athena_query_waiter import PendingQuery, get_query_executions
+from src.clients.aws_athena_result_set import AthenaColumns
+from src.data import aws_scanner_exceptions as exceptions
+from src.data.aws_athena_pipeline import AwsAthenaPipeline, AwsAthenaResource, AwsAthenaStatement
+from src.data.aws_task_report import AwsTaskReport
+
+
+def create_database_statement(database: str) -> AwsAthenaStatement:
+    return AwsAthenaStatement(
+        query=Template(queries.CREATE_DATABASE).substitute(database_name=database),
+        raise_on_failure=exceptions.CreateDatabaseException,
+    )
+
+
+def drop_database_statement(database: str) -> AwsAthenaStatement:
+    return AwsAthenaStatement(
+        query=Template(queries.DROP_DATABASE).substitute(database_name=database),
+        raise_on_failure=exceptions.DropDatabaseException,
+    )
+
+
+def drop_table_statement(database: str, table: str) -> AwsAthenaStatement:
+    return AwsAthenaStatement(
+        query=Template(queries.DROP_TABLE).substitute(table=table),
+        database=database,
+        raise_on_failure=exceptions.DropTableException,
+    )
+
+
+class AwsAthenaJob:
+    def __init__(
+        self, pipeline: AwsAthenaPipeline, deadline_at: Optional[float], catalog: Optional[AwsAthenaCatalog] = None
+    ):
+        self.future: Future[AwsTaskReport] = Future()
+        self.waiting_on: Optional[Future[Optional[AthenaColumns]]] = None
+        self._pipeline = pipeline
+        self._deadline_at = deadline_at
+        self._catalog = catalog or AwsAthenaCatalog()
+        self._private = catalog is None
+        self._claims: Deque[CatalogKey] = deque([*pipeline.resources, pipeline.query])
+        self._owned: Optional[CatalogKey] = None
+        self._statements: Deque[AwsAthenaStatement] = deque()
+        self._tearing_down = False
+        self._report: Optional[AwsTaskReport] = None
+        self._error: Optional[Exception] = None
+
+    @property
+    def done(self) -> bool:
+        return self._tearing_down and not self._statements
+
+    @property
+    def statement(self) -> AwsAthenaStatement:
+        return self._statements[0]
+
+    @property
+    def awaits_results(self) -> bool:
+        return not self._tearing_down and self._statements[0] is self._pipeline.query
+
+    def next_statement(self) -> Optional[AwsAthenaStatement]:
+        if not self._tearing_down and self._past_deadline():
+            self._report = self._pipeline.incomplete(exceptions.TaskDeadlineException("deadline exceeded"))
+            self._tear_down()
+        if self.waiting_on and self.waiting_on.done():
+            waited, self.waiting_on = self.waiting_on, None
+            self._claimed(waited)
+        while not self._statements and not self._tearing_down and not self.waiting_on:
+            self._claim_next()
+        return self._statements[0] if self._statements else None
+
+    def succeeded(self, columns: AthenaColumns) -> None:
+        self._statements.popleft()
+        if self._owned is self._pipeline.query:
+            self._catalog.queried(self._pipeline.query, columns, self._pipeline.readers)
+        elif isinstance(self._owned, AwsAthenaResource):
+            self._catalog.created(self._owned)
+        if self._owned:
+            self._owned = None
+            self._acquired(columns)
+
+    def failed(self, error: Exception) -> None:
+        self._error = self._error or error
+        if self._owned:
+            self._catalog.failed(self._owned, error)
+            self._owned = None
+        if self._tearing_down:
+            self._statements.popleft()
+        else:
+            self._tear_down()
+
+    def resolve(self) -> None:
+        if self._report and not self._error:
+            self.future.set_result(self._report)
+        else:
+            self.future.set_exception(self._error)
+
+    def abort(self, error: Exception) -> None:
+        if self._owned:
+            self._catalog.release(self._owned)
+        self.future.set_exception(error)
+
+    def _claim_next(self) -> None:
+        key = self._claims[0]
+        future, owner = self._catalog.claim(key)
+        if owner:
+            self._owned = key
+            self._statements.append(key.create if isinstance(key, AwsAthenaResource) else key)
+        elif not future.done():
+            self.waiting_on = future
+        else:
+            self._claimed(future)
+
+    def _claimed(self, future: Future[Optional[AthenaColumns]]) -> None:
+        error = future.exception()
+        if isinstance(error, Exception):
+            self.failed(error)
+        elif future.result() is not None:
+            if self._claims[0] is self._pipeline.query:
+                self._catalog.read(self._pipeline.query, future)
+            self._acquired(future.result() or {})
+
+    def _acquired(self, columns: AthenaColumns) -> None:
+        if self._claims.popleft() is not self._pipeline.query:
+            return
+        try:
+            self._report = self._pipeline.report(columns)
+        except Exception as ex:
+            self._error = ex
+        self._tear_down()
+
+    def _tear_down(self) -> None:
+        if self._owned:
+            self._catalog.release(self._owned)
+            self._owned = None
+        self._claims.clear()
+        self._tearing_down = True
+        self._statements = deque(self._catalog.drop_statements() if self._private else ())
+
+    def _past_deadline(self) -> bool:
+        return self._deadline_at is not None and monotonic() >= self._deadline_at
+
+
+class AwsAthenaScheduler:
+    def __init__(
+        self,
+        athena: Callable[[], BaseClient],
+        limiter: AwsAthenaQueryLimiter,
+        executor: Optional[Executor] = None,
+    ):
+        self._logger = getLogger(self.__class__.__name__)
+        self._athena = athena
+        self._limiter = limiter
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+        self._owns_executor = executor is None
+        self._config = Config()
+        self._condition = Condition()
+        self._ready: Deque[AwsAthenaJob] = deque()
+        self._running: Dict[str, Tuple[AwsAthenaJob, float, PendingQuery]] = {}
+        self._waiting: Set[AwsAthenaJob] = set()
+        self._fetching: Dict[str, AwsAthenaJob] = {}
+        self._fetched: Deque[Tuple[AwsAthenaJob, Optional[AthenaColumns], Optional[Exception]]] = deque()
+        self._blocked = False
+        self._stopping = False
+        self._failure: Optional[Exception] = None
+        self._poller = Thread(target=self._poll, name=self.__class__.__name__, daemon=True)
+
+    def __enter__(self) -> "AwsAthenaScheduler":
+        self._poller.start()
+        return self
+
+    def __exit__(
+        self, exc_type: Optional[Type[BaseException]], exc: Optional[BaseException], tb: Optional[TracebackType]
+    ) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._poller.join()
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    def submit(
+        self,
+        pipeline: AwsAthenaPipeline,
+        deadline_at: Optional[float] = None,
+        catalog: Optional[AwsAthenaCatalog] = None,
+    ) -> Future[AwsTaskReport]:
+        job = AwsAthenaJob(pipeline, deadline_at, catalog)
+        with self._condition:
+            if self._failure:
+                job.future.set_exception(self._failure)
+            else:
+                self._ready.append(job)
+                self._condition.notify()
+        return job.future
+
+    def _poll(self) -> None:
+        try:
+            while self._wait_for_jobs():
+                self._collect_results()
+                self._start_queries()
+                self._check_queries()
+        except Exception as ex:
+            self._logger.error(f"athena scheduler stopped: {type(ex).__name__}: {ex}")
+            self._abort(ex)
+
+    def _wait_for_jobs(self) -> bool:
+        with self._condition:
+            if (self._running or self._blocked) and not self._fetched:
+                self._condition.wait(max(0.0, min(self._poll_times()) - monotonic()))
+            while not (self._ready or self._running or self._fetched) and (self._fetching or not self._stopping):
+                self._condition.wait()
+            return bool(self._ready or self._running or self._fetched)
+
+    def _poll_times(self) -> List[float]:
+        poll_times = [pending.poll_at for _, _, pending in self._running.values()]
+        if self._blocked:
+            poll_times.append(monotonic() + self._config.athena_query_results_polling_delay_seconds())
+        return poll_times
+
+    def _start_queries(self) -> None:
+        with self._condition:
+            ready, self._ready = self._ready, deque()
+        self._blocked = False
+        try:
+            while ready and not self._blocked:
+                job = ready[0]
+                statement = job.next_statement()
+                if job.waiting_on:
+                    self._wait_for_claim(ready.popleft(), job.waiting_on)
+                elif statement is None:
+                    ready.popleft().resolve()
+                elif not self._limiter.try_acquire():
+                    self._blocked = True
+                else:
+                    self._start_query(ready[0], statement)
+                    ready.popleft()
+        finally:
+            with self._condition:
+                self._ready.extendleft(reversed(ready))
+
+    def _wait_for_claim(self, job: AwsAthenaJob, claim: Future[Optional[AthenaColumns]]) -> None:
+        with self._condition:
+            self._waiting.add(job)
+        claim.add_done_callback(lambda _: self._resume(job))
+
+    def _resume(self, job: AwsAthenaJob) -> None:
+        with self._condition:
+            if job in self._waiting:
+                self._waiting.remove(job)
+                self._ready.append(job)
+                self._condition.notify()
+
+    def _start_query(self, job: AwsAthenaJob, statement: AwsAthenaStatement) -> None:
+        try:
+            query_id = AwsAthenaAsyncClient(self._athena()).run_query(
+                query=statement.query, database=statement.database, raise_on_failure=statement.raise_on_failure
+            )
+        except exceptions.AwsScannerException as ex:
+            self._limiter.release()
+            self._advance(job, error=ex)
+        else:
+            started_at, delay = monotonic(), self._config.athena_query_results_polling_delay_seconds()
+            self._running[query_id] = (job, started_at, PendingQuery(delay, started_at + delay))
+
+    def _check_queries(self) -> None:
+        now = monotonic()
+        due = [query_id for query_id, (_, _, pending) in self._running.items() if pending.poll_at <= now]
+        if not due:
+            return
+        try:
+            executions = get_query_executions(self._athena(), due)
+        except exceptions.UnknownQueryStateException as ex:
+            for query_id in due:
+                self._finish(query_id, error=ex)
+            return
+        now = monotonic()
+        timeout_at = now - self._config.athena_query_timeout_seconds()
+        for query_id in due:
+            _, started_at, pending = self._running[query_id]
+            status = executions.get(query_id, {}).get("Status", {})
+            if status.get("State") in COMPLETED_STATES:
+                self._complete(query_id, status)
+            elif started_at <= timeout_at:
+                self._finish(query_id, error=exceptions.TimeoutException(f"query execution id: {query_id}"))
+            else:
+                pending.back_off(now, self._config.athena_query_results_polling_max_delay_seconds())
+
+    def _complete(self, query_id: str, status: Dict[str, Any]) -> None:
+        job = self._running[query_id][0]
+        if status["State"] not in SUCCESS_STATES:
+            self._finish(query_id, error=job.statement.raise_on_failure(str(status["StateChangeReason"])))
+            return
+        if not job.awaits_results:
+            self._finish(query_id, columns={})
+            return
+        self._limiter.release()
+        del self._running[query_id]
+        with self._condition:
+            self._fetching[query_id] = job
+        fetch = self._executor.submit(AwsAthenaAsyncClient(self._athena()).get_query_columns, query_id)
+        fetch.add_done_callback(lambda _: self._fetched_results(query_id, fetch))
+
+    def _fetched_results(self, query_id: str, fetch: Future[AthenaColumns]) -> None:
+        error = fetch.exception()
+        with self._condition:
+            job = self._fetching.pop(query_id, None)
+            if job:
+                self._fetched.append(
+                    (job, None, error) if isinstance(error, Exception) else (job, fetch.result(), None)
+                )
+                self._condition.notify()
+
+    def _collect_results(self) -> None:
+        with self._condition:
+            fetched, self._fetched = self._fetched, deque()
+        for job, columns, error in fetched:
+            self._advance(job, columns, error)
+
+    def _finish(
+        self, query_id: str, columns: Optional[AthenaColumns] = None, error: Optional[Exception] = None
+    ) -> None:
+        self._limiter.release()
+        self._advance(self._running.pop(query_id)[0], columns, error)
+
+    def _advance(
+        self, job: AwsAthenaJob, columns: Optional[AthenaColumns] = None, error: Optional[Exception] = None
+    ) -> None:
+        if error:
+            job.failed(error)
+        else:
+            job.succeeded(columns or {})
+        if job.done:
+            job.resolve()
+        else:
+            with self._condition:
+                self._ready.append(job)
+
+    def _abort(self, error: Exception) -> None:
+        with self._condition:
+            self._failure = error
+            jobs = [
+                *self._ready,
+                *self._waiting,
+                *(job for job, _, _ in self._running.values()),
+                *self._fetching.values(),
+                *(job for job, _, _ in self._fetched),
+            ]
+            self._ready.clear()
+            self._waiting.clear()
+            self._running.clear()
+            self._fetching.clear()
+            self._fetched.clear()
+        for job in jobs:
+            job.abort(error)
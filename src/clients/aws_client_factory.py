@@ -1,23 +1,34 @@
 import boto3
 
+from collections import Counter
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from logging import getLogger
-from typing import Any, Callable, Optional
+from threading import Lock
+from weakref import WeakSet, finalize
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, cast
 
 from botocore.client import BaseClient
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, BotoCoreError
 
 from src.aws_scanner_config import AwsScannerConfig as Config
-from src.clients.aws_athena_client import AwsAthenaClient
+from src.clients.aws_athena_client import AwsAthenaClient, athena_query_limiter
+from src.clients.aws_athena_query_waiter import AwsAthenaQueryWaiter
+from src.clients.aws_athena_scheduler import AwsAthenaScheduler
+from src.clients.aws_credentials_cache import AwsCredentialsCache
+from src.clients.aws_deadline import check_deadline
 from src.clients.aws_cost_explorer_client import AwsCostExplorerClient
 from src.clients.aws_ec2_client import AwsEC2Client
 from src.clients.aws_iam_audit_client import AwsIamAuditClient
 from src.clients.aws_iam_client import AwsIamClient
 from src.clients.aws_kms_client import AwsKmsClient
+from src.clients.aws_lazy_client import AwsLazyClient
 from src.clients.aws_log_group_client import AwsLogGroupClient
 from src.clients.aws_logs_client import AwsLogsClient
 from src.clients.aws_organizations_client import AwsOrganizationsClient
 from src.clients.aws_resolver_client import AwsResolverClient
+from src.clients.aws_service_limiter import AwsServiceLimiter
 from src.clients.aws_ssm_client import AwsSSMClient
 from src.clients.aws_s3_client import AwsS3Client
 from src.clients.aws_hosted_zones_client import AwsHostedZonesClient
@@ -28,22 +39,64 @@ from src.clients.composite.aws_vpc_peering_client import AwsVpcPeeringClient
 from src.clients.composite.aws_s3_kms_client import AwsS3KmsClient
 from src.clients.composite.aws_route53_client import AwsRoute53Client
 from src.data import SERVICE_ACCOUNT_USER
+from src.data.aws_common_types import AwsCredentials
 from src.data.aws_organizations_types import Account
 from src.data.aws_scanner_exceptions import ClientFactoryException
 
+T = TypeVar("T")
 
-@dataclass
-class AwsCredentials:
-    accessKeyId: str
-    secretAccessKey: str
-    sessionToken: str
+ClientKey = Tuple[str, str, str, Optional[str]]
+
+
+@dataclass(frozen=True)
+class PooledClient:
+    credentials: Optional[AwsCredentials]
+    client: BaseClient
 
 
 class AwsClientFactory:
     def __init__(self, mfa: str, username: str):
+        self._setup()
+        self._session_token = self._get_session_token(mfa, username)
+
+    def _setup(self) -> None:
         self._logger = getLogger(self.__class__.__name__)
         self._config = Config()
-        self._session_token = self._get_session_token(mfa, username)
+        self._session = boto3.session.Session()
+        self._boto_config = BotoConfig(
+            max_pool_connections=self._config.tasks_executors() + self._config.tasks_sub_task_executors()
+        )
+        self._service_limiter = AwsServiceLimiter(self._config.concurrency_limits())
+        self._clients: Dict[ClientKey, PooledClient] = {}
+        self._clients_lock = Lock()
+        self._lazy_clients: WeakSet[AwsLazyClient] = WeakSet()
+        self._released_unused_clients: Counter[str] = Counter()
+        self._credentials_cache = AwsCredentialsCache(self._config.session_duration_seconds())
+        self._athena_waiter = AwsAthenaQueryWaiter(self.get_athena_boto_client)
+        self._athena_limiter = athena_query_limiter(self._config)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"session_token": self._session_token}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._setup()
+        self._session_token = state["session_token"]
+
+    @property
+    def credentials_cache(self) -> AwsCredentialsCache:
+        return self._credentials_cache
+
+    def unused_clients(self) -> Dict[str, int]:
+        with self._clients_lock:
+            unused = Counter(self._released_unused_clients)
+            clients = list(self._lazy_clients)
+        unused.update(str(client) for client in clients if not client.materialised)
+        return dict(sorted(unused.items()))
+
+    def forget_lazy_clients(self) -> None:
+        with self._clients_lock:
+            self._lazy_clients = WeakSet()
+            self._released_unused_clients = Counter()
 
     def get_athena_boto_client(self) -> BaseClient:
         return self._get_client("athena", self._config.athena_account(), self._config.athena_role())
@@ -56,15 +109,16 @@ class AwsClientFactory:
 
     def get_s3_kms_client(self, account: Account, role: Optional[str] = None) -> AwsS3KmsClient:
         return AwsS3KmsClient(
-            s3=self.get_s3_client(account, role or self._config.s3_role()),
-            kms=self.get_kms_client(account),
+            s3=self._lazy("s3", account, lambda: self.get_s3_client(account, role or self._config.s3_role())),
+            kms=self._lazy("kms", account, lambda: self.get_kms_client(account)),
         )
 
     def get_central_logging_client(self) -> AwsCentralLoggingClient:
+        account = self._config.cloudtrail_account()
         return AwsCentralLoggingClient(
-            s3=self.get_s3_client(self._config.cloudtrail_account()),
-            kms=self.get_kms_client(self._config.cloudtrail_account()),
-            org=self.get_organizations_client(),
+            s3=self._lazy("s3", account, lambda: self.get_s3_client(account)),
+            kms=self._lazy("kms", account, lambda: self.get_kms_client(account)),
+            org=self._lazy("organizations", self._config.organization_account(), self.get_organizations_client),
         )
 
     def get_cost_explorer_boto_client(self, account: Account) -> BaseClient:
@@ -95,7 +149,10 @@ class AwsClientFactory:
         return self._get_client("cloudtrail", account, self._config.cloudtrail_role())
 
     def get_athena_client(self) -> AwsAthenaClient:
-        return AwsAthenaClient(self.get_athena_boto_client())
+        return AwsAthenaClient(self.get_athena_boto_client(), self._athena_waiter, self._athena_limiter)
+
+    def get_athena_scheduler(self, executor: Optional[Executor] = None) -> AwsAthenaScheduler:
+        return AwsAthenaScheduler(self.get_athena_boto_client, self._athena_limiter, executor)
 
     def get_ec2_boto_client(self, account: Account, role: str) -> BaseClient:
         return self._get_client("ec2", account, role)
@@ -108,9 +165,9 @@ class AwsClientFactory:
 
     def get_route53_client(self, account: Account) -> AwsRoute53Client:
         return AwsRoute53Client(
-            boto_route53=self.get_hosted_zones_client(account),
-            iam=self.get_iam_client(account),
-            log_group=self.get_log_group_client(account, region="us-east-1"),
+            boto_route53=self._lazy("hosted zones", account, lambda: self.get_hosted_zones_client(account)),
+            iam=self._lazy("iam", account, lambda: self.get_iam_client(account)),
+            log_group=self._lazy("log group", account, lambda: self.get_log_group_client(account, region="us-east-1")),
         )
 
     def get_hosted_zones_client(self, account: Account, role: Optional[str] = None) -> AwsHostedZonesClient:
@@ -124,7 +181,9 @@ class AwsClientFactory:
 
     def get_logs_client(self, account: Account, region: Optional[str] = None) -> AwsLogsClient:
         return AwsLogsClient(
-            boto_logs=self.get_logs_boto_client(account, region), kms=self.get_kms_boto_client(account), account=account
+            boto_logs=self.get_logs_boto_client(account, region),
+            kms=self._lazy("kms", account, lambda: self.get_kms_boto_client(account)),
+            account=account,
         )
 
     def get_iam_client(self, account: Account) -> AwsIamClient:
@@ -140,33 +199,54 @@ class AwsClientFactory:
         return AwsResolverClient(self.get_route53_resolver_boto_client(account))
 
     def get_cloudtrail_client(self, account: Account) -> AwsCloudtrailClient:
-        return AwsCloudtrailClient(self.get_cloudtrail_boto_client(account), self.get_logs_client(account))
+        return AwsCloudtrailClient(
+            self.get_cloudtrail_boto_client(account), self._lazy("logs", account, lambda: self.get_logs_client(account))
+        )
 
     def get_log_group_client(self, account: Account, region: Optional[str] = None) -> AwsLogGroupClient:
         return AwsLogGroupClient(logs=self.get_logs_client(account, region))
 
     def get_vpc_client(self, account: Account) -> AwsVpcClient:
         return AwsVpcClient(
-            ec2=self.get_ec2_client(account),
-            iam=self.get_iam_client(account),
-            logs=self.get_logs_client(account),
+            ec2=self._lazy("ec2", account, lambda: self.get_ec2_client(account)),
+            iam=self._lazy("iam", account, lambda: self.get_iam_client(account)),
+            logs=self._lazy("logs", account, lambda: self.get_logs_client(account)),
             config=self._config,
-            log_group=self.get_log_group_client(account),
-            resolver=self.get_route53resolver_client(account),
+            log_group=self._lazy("log group", account, lambda: self.get_log_group_client(account)),
+            resolver=self._lazy("resolver", account, lambda: self.get_route53resolver_client(account)),
         )
 
     def get_vpc_peering_client(self, account: Account) -> AwsVpcPeeringClient:
         return AwsVpcPeeringClient(
-            ec2=self.get_ec2_client(account, self._config.vpc_peering_role()), org=self.get_organizations_client()
+            ec2=self._lazy("ec2", account, lambda: self.get_ec2_client(account, self._config.vpc_peering_role())),
+            org=self._lazy("organizations", self._config.organization_account(), self.get_organizations_client),
         )
 
+    def _lazy(self, name: str, account: Account, provider: Callable[[], T]) -> T:
+        used: List[bool] = []
+
+        def provide() -> T:
+            used.append(True)
+            return provider()
+
+        client = AwsLazyClient(f"{name} client for {account}", provide)
+        with self._clients_lock:
+            self._lazy_clients.add(client)
+            finalize(client, self._released, self._released_unused_clients, str(client), used)
+        return cast(T, client)
+
+    def _released(self, unused: "Counter[str]", name: str, used: List[bool]) -> None:
+        if not used:
+            with self._clients_lock:
+                unused[name] += 1
+
     def _get_session_token(self, mfa: str, username: str) -> Optional[AwsCredentials]:
         self._logger.info(f"getting session token for {username}")
         return (
             None
             if username == SERVICE_ACCOUNT_USER
             else self._to_credentials(
-                lambda: boto3.client(service_name="sts").get_session_token(
+                lambda: self._pooled_client(("sts", "", "", None), None).get_session_token(
                     DurationSeconds=self._config.session_duration_seconds(),
                     SerialNumber=f"arn:aws:iam::{self._config.user_account().identifier}:mfa/{username}",
                     TokenCode=mfa,
@@ -188,24 +268,34 @@ class AwsClientFactory:
         )
 
     def _get_client(self, service_name: str, account: Account, role: str, region: Optional[str] = None) -> BaseClient:
-        assumed_role = self._assume_role(account, role)
-        self._logger.info(f"creating {service_name} client for {role} in {account}")
-        if region is not None:
-            return boto3.client(
+        return self._pooled_client((service_name, account.identifier, role, region), self._assume_role(account, role))
+
+    def _pooled_client(self, key: ClientKey, credentials: Optional[AwsCredentials]) -> BaseClient:
+        with self._clients_lock:
+            pooled = self._clients.get(key)
+            if pooled and pooled.credentials is credentials:
+                return pooled.client
+            service_name, account_id, role, region = key
+            self._logger.info(
+                f"creating {service_name} client for {role or 'default role'} in {account_id or 'default'}"
+            )
+            client = self._session.client(
                 service_name=service_name,
-                aws_access_key_id=assumed_role.accessKeyId,
-                aws_secret_access_key=assumed_role.secretAccessKey,
-                aws_session_token=assumed_role.sessionToken,
+                aws_access_key_id=credentials.accessKeyId if credentials else None,
+                aws_secret_access_key=credentials.secretAccessKey if credentials else None,
+                aws_session_token=credentials.sessionToken if credentials else None,
                 region_name=region,
+                config=self._boto_config,
             )
-        return boto3.client(
-            service_name=service_name,
-            aws_access_key_id=assumed_role.accessKeyId,
-            aws_secret_access_key=assumed_role.secretAccessKey,
-            aws_session_token=assumed_role.sessionToken,
-        )
+            client.meta.events.register_first("before-call.*.*", check_deadline)
+            self._service_limiter.register(service_name, client)
+            self._clients[key] = PooledClient(credentials, client)
+            return client
 
     def _assume_role(self, account: Account, role: str) -> AwsCredentials:
+        return self._credentials_cache.get((account.identifier, role), lambda: self._request_role(account, role))
+
+    def _request_role(self, account: Account, role: str) -> AwsCredentials:
         self._logger.info(f"assuming {role} in {account}")
         return self._to_credentials(
             lambda: self._sts().assume_role(
@@ -216,13 +306,4 @@ class AwsClientFactory:
         )
 
     def _sts(self) -> BaseClient:
-        return (
-            boto3.client(
-                service_name="sts",
-                aws_access_key_id=self._session_token.accessKeyId,
-                aws_secret_access_key=self._session_token.secretAccessKey,
-                aws_session_token=self._session_token.sessionToken,
-            )
-            if self._session_token
-            else boto3.client(service_name="sts")
-        )
+        return self._pooled_client(("sts", "", "", None), self._session_token)
@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from logging import getLogger
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Tuple
+
+from src.data.aws_common_types import AwsCredentials
+
+CredentialsKey = Tuple[str, str]
+
+REFRESH_MARGIN_SECONDS = 300
+
+
+def credentials_lifetime_seconds(duration_seconds: int) -> int:
+    return duration_seconds - min(REFRESH_MARGIN_SECONDS, duration_seconds // 2)
+
+
+@dataclass(frozen=True)
+class CachedCredentials:
+    credentials: AwsCredentials
+    expires_at: float
+
+
+class AwsCredentialsCache:
+    def __init__(self, duration_seconds: int):
+        self._logger = getLogger(self.__class__.__name__)
+        self._lifetime_seconds = credentials_lifetime_seconds(duration_seconds)
+        self._lock = Lock()
+        self._key_locks: Dict[CredentialsKey, Lock] = {}
+        self._entries: Dict[CredentialsKey, CachedCredentials] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def get(self, key: CredentialsKey, provider: Callable[[], AwsCredentials]) -> AwsCredentials:
+        with self._lock_for(key):
+            entry = self._entries.get(key)
+            if entry and entry.expires_at > monotonic():
+                self._record(hit=True)
+                return entry.credentials
+            self._record(hit=False)
+            self._logger.debug(f"{'refreshing expired' if entry else 'fetching'} credentials for {key}")
+            credentials = provider()
+            self._entries[key] = CachedCredentials(credentials, monotonic() + self._lifetime_seconds)
+            return credentials
+
+    def _lock_for(self, key: CredentialsKey) -> Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, Lock())
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def __str__(self) -> str:
+        return f"credentials cache (hits: {self._hits}, misses: {self._misses})"
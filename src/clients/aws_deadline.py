@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+from threading import local
+from time import monotonic
+from typing import Any, Iterator, Optional
+
+from src.data.aws_scanner_exceptions import TaskDeadlineException
+
+_deadline = local()
+
+
+@contextmanager
+def deadline(at: Optional[float]) -> Iterator[None]:
+    previous = current_deadline()
+    _deadline.at = at
+    try:
+        yield
+    finally:
+        _deadline.at = previous
+
+
+@contextmanager
+def deadline_suspended() -> Iterator[None]:
+    with deadline(None):
+        yield
+
+
+def current_deadline() -> Optional[float]:
+    return getattr(_deadline, "at", None)
+
+
+def check_deadline(**_: Any) -> None:
+    at = current_deadline()
+    if at is not None and monotonic() >= at:
+        raise TaskDeadlineException("deadline exceeded, no further AWS calls are made")
@@ -0,0 +1,30 @@
+from logging import getLogger
+from threading import Lock
+from typing import Any, Callable, Optional
+
+
+class AwsLazyClient:
+    def __init__(self, name: str, provider: Callable[[], Any]):
+        self._lazy_name = name
+        self._lazy_provider = provider
+        self._lazy_client: Optional[Any] = None
+        self._lazy_lock = Lock()
+
+    @property
+    def materialised(self) -> bool:
+        return self._lazy_client is not None
+
+    def materialise(self) -> Any:
+        with self._lazy_lock:
+            if self._lazy_client is None:
+                getLogger(self.__class__.__name__).debug(f"materialising {self._lazy_name}")
+                self._lazy_client = self._lazy_provider()
+            return self._lazy_client
+
+    def __getattr__(self, item: str) -> Any:
+        if item.startswith("_lazy_"):
+            raise AttributeError(item)
+        return getattr(self.materialise(), item)
+
+    def __str__(self) -> str:
+        return self._lazy_name
@@ -1,6 +1,7 @@
+from itertools import chain
 from json import loads
 from logging import getLogger
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from botocore.client import BaseClient
 from botocore.exceptions import BotoCoreError, ClientError
@@ -20,6 +21,7 @@ from src.data.aws_s3_types import (
     BucketPublicAccessBlock,
     BucketSecureTransport,
     BucketVersioning,
+    S3Object,
     to_bucket,
     to_bucket_acl,
     to_bucket_content_deny,
@@ -35,6 +37,8 @@ from src.data.aws_s3_types import (
     to_bucket_versioning,
 )
 
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
 
 class AwsS3Client:
     def __init__(self, boto_s3: BaseClient):
@@ -150,6 +154,55 @@ class AwsS3Client:
             f"unable to put object '{object_name}' in bucket '{bucket}'",
         )
 
+    def put_object_stream(
+        self, bucket: str, object_name: str, chunks: Iterable[str], part_size: int = MULTIPART_PART_SIZE
+    ) -> str:
+        parts = self._to_parts(chunks, part_size)
+        first_part = next(parts, b"")
+        second_part = next(parts, None)
+        if second_part is None:
+            return self.put_object(bucket, object_name, first_part.decode("utf-8"))
+        self._logger.info(f"uploading object '{object_name}' in parts to bucket '{bucket}'")
+        upload_id = None
+        try:
+            upload_id = self._s3.create_multipart_upload(Bucket=bucket, Key=object_name)["UploadId"]
+            uploaded = []
+            for number, part in enumerate(chain([first_part, second_part], parts), start=1):
+                response = self._s3.upload_part(
+                    Bucket=bucket, Key=object_name, UploadId=upload_id, PartNumber=number, Body=part
+                )
+                uploaded.append({"ETag": response["ETag"], "PartNumber": number})
+            return str(
+                self._s3.complete_multipart_upload(
+                    Bucket=bucket, Key=object_name, UploadId=upload_id, MultipartUpload={"Parts": uploaded}
+                ).get("VersionId")
+            )
+        except (BotoCoreError, ClientError) as error:
+            self._logger.warning(f"unable to upload object '{object_name}' in bucket '{bucket}': {error}")
+            self._abort_multipart_upload(bucket, object_name, upload_id)
+            for _ in parts:
+                pass
+            return ""
+
+    def _abort_multipart_upload(self, bucket: str, object_name: str, upload_id: Optional[str]) -> None:
+        if upload_id:
+            boto_try(
+                lambda: self._s3.abort_multipart_upload(Bucket=bucket, Key=object_name, UploadId=upload_id),
+                dict,
+                f"unable to abort upload of object '{object_name}' in bucket '{bucket}'",
+            )
+
+    @staticmethod
+    def _to_parts(chunks: Iterable[str], part_size: int) -> Iterator[bytes]:
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer.extend(chunk.encode("utf-8"))
+            if len(buffer) >= part_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
     def get_bucket_policy(self, bucket: str) -> Optional[Dict[str, Any]]:
         return boto_try(
             lambda: dict(loads(self._s3.get_bucket_policy(Bucket=bucket)["Policy"])),
@@ -163,3 +216,26 @@ class AwsS3Client:
             str,
             f"unable to get object '{key}' from bucket '{bucket}'",
         )
+
+    def list_object_keys(self, bucket: str, prefix: str) -> List[str]:
+        return boto_try(
+            lambda: [
+                obj["Key"]
+                for page in self._s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix)
+                for obj in page.get("Contents", [])
+            ],
+            list,
+            f"unable to list objects with prefix '{prefix}' in bucket '{bucket}'",
+        )
+
+    def get_object_if_none_match(self, bucket: str, key: str, etag: Optional[str] = None) -> Optional[S3Object]:
+        try:
+            response = self._s3.get_object(Bucket=bucket, Key=key, **({"IfNoneMatch": etag} if etag else {}))
+            return S3Object(content=str(response["Body"].read().decode("utf-8")), etag=response.get("ETag"))
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ["304", "NotModified"]:
+                return None
+            self._logger.warning(f"unable to get object '{key}' from bucket '{bucket}': {error}")
+        except BotoCoreError as error:
+            self._logger.warning(f"unable to get object '{key}' from bucket '{bucket}': {error}")
+        return None
@@ -0,0 +1,36 @@
+from functools import partial
+from logging import getLogger
+from threading import BoundedSemaphore, local
+from typing import Any, Dict, Mapping
+
+from botocore.client import BaseClient
+
+
+class AwsServiceLimiter:
+    def __init__(self, limits: Mapping[str, int]):
+        self._logger = getLogger(self.__class__.__name__)
+        self._limits = dict(limits)
+        self._semaphores = {service: BoundedSemaphore(limit) for service, limit in limits.items()}
+        self._held = local()
+
+    @property
+    def limits(self) -> Dict[str, int]:
+        return dict(self._limits)
+
+    def register(self, service_name: str, client: BaseClient) -> None:
+        if service_name not in self._semaphores:
+            return
+        self._logger.debug(f"limiting {service_name} to {self._limits[service_name]} concurrent calls")
+        client.meta.events.register_first("before-call.*.*", partial(self._acquire, service_name))
+        client.meta.events.register("after-call", partial(self._release, service_name))
+        client.meta.events.register("after-call-error", partial(self._release, service_name))
+
+    def _acquire(self, service_name: str, **_: Any) -> None:
+        self._semaphores[service_name].acquire()
+        setattr(self._held, service_name, getattr(self._held, service_name, 0) + 1)
+
+    def _release(self, service_name: str, **_: Any) -> None:
+        held = getattr(self._held, service_name, 0)
+        if held:
+            setattr(self._held, service_name, held - 1)
+            self._semaphores[service_name].release()
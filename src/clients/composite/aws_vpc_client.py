@@ -44,9 +44,9 @@ class AwsVpcClient:
         self.resolver = resolver
 
     def list_vpcs(self) -> Sequence[Vpc]:
-        return [self._enrich_vpc(vpc) for vpc in self.ec2.list_vpcs()]
+        return [self.enrich_vpc(vpc) for vpc in self.ec2.list_vpcs()]
 
-    def _enrich_vpc(self, vpc: Vpc) -> Vpc:
+    def enrich_vpc(self, vpc: Vpc) -> Vpc:
         vpc.flow_logs = [self._enrich_flow_log(fl) for fl in vpc.flow_logs]
         return vpc
 
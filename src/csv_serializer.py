@@ -1,4 +1,5 @@
-from typing import Any, Dict, Sequence
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, Sequence
 
 from src.data.aws_task_report import AwsTaskReport
 
@@ -17,6 +18,20 @@ def to_csv(reports: Sequence[AwsTaskReport]) -> str:
     return f"{_headers(reports)}{NEW_LINE}{_rows(reports)}"
 
 
+def to_csv_chunks(reports: Iterable[AwsTaskReport]) -> Iterator[str]:
+    """
+    Same as to_csv, but yields the CSV output one task report at a time so that reports can be written as they come.
+    Headers are derived from the first report.
+    :param reports: task reports to be converted to CSV format
+    :return: CSV string chunks that, joined together, are equal to to_csv(reports)
+    """
+    remaining = iter(reports)
+    first = next(remaining, None)
+    yield f"{_headers([first] if first else [])}{NEW_LINE}"
+    for index, report in enumerate(chain([first] if first else [], remaining)):
+        yield f"{NEW_LINE if index else ''}{_result_rows(report)}"
+
+
 def _headers(reports: Sequence[AwsTaskReport]) -> str:
     default_headers = f"account_id{SEPARATOR}account_name"
     specific_headers = _results_headers(next(iter(reports)).results) if reports else ""
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import Iterable, Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 from boto3.session import Session
 
@@ -30,7 +30,7 @@ class AwsAthenaDataPartition:
 
     @staticmethod
     def _validate_region(region: str) -> str:
-        regions = Session().get_available_regions("athena")
+        regions = AwsAthenaDataPartition.regions()
 
         if region not in regions:
             raise InvalidRegionException(region, regions)
@@ -43,8 +43,18 @@ class AwsAthenaDataPartition:
     def _get_valid_year_month_day(self, retention: int) -> Iterable[Tuple[int, int, int]]:
         return {(d.year, d.month, d.day) for d in self._get_valid_dates(retention)}
 
-    def _get_valid_dates(self, retention: int) -> Iterable[date]:
-        return [self._today() - timedelta(delta) for delta in range(retention)]
+    @classmethod
+    def _get_valid_dates(cls, retention: int) -> Iterable[date]:
+        return [cls._today() - timedelta(delta) for delta in range(retention)]
+
+    @staticmethod
+    def regions() -> List[str]:
+        return list(Session().get_available_regions("athena"))
+
+    @classmethod
+    def years(cls) -> Tuple[int, int]:
+        years = [d.year for d in cls._get_valid_dates(Config().cloudtrail_logs_retention_days())]
+        return min(years), max(years)
 
     @staticmethod
     def _today() -> date:
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Type
+
+from src.data.aws_scanner_exceptions import RunQueryException
+from src.data.aws_task_report import AwsTaskReport
+
+
+@dataclass(frozen=True)
+class AwsAthenaStatement:
+    query: str
+    database: str = ""
+    raise_on_failure: Type[Exception] = RunQueryException
+
+
+@dataclass(frozen=True)
+class AwsAthenaResource:
+    create: AwsAthenaStatement
+    drop: Tuple[AwsAthenaStatement, ...] = ()
+
+
+@dataclass(frozen=True)
+class AwsAthenaPipeline:
+    resources: Sequence[AwsAthenaResource]
+    query: AwsAthenaStatement
+    report: Callable[[Dict[str, List[Any]]], AwsTaskReport]
+    incomplete: Callable[[Exception], AwsTaskReport]
+    readers: int = 1
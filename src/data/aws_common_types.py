@@ -9,3 +9,10 @@ class Tag:
 
     def to_dict(self, key_key: str = "Key", value_key: str = "Value") -> Dict[str, str]:
         return {key_key: self.key, value_key: self.value}
+
+
+@dataclass
+class AwsCredentials:
+    accessKeyId: str
+    secretAccessKey: str
+    sessionToken: str
@@ -97,7 +97,7 @@ class AccessKey:
     last_used: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(frozen=True)
 class PasswordPolicy:
     minimum_password_length: Optional[int]
     require_symbols: Optional[bool]
@@ -259,3 +259,9 @@ def to_bucket_versioning(versioning_dict: Dict[Any, Any]) -> BucketVersioning:
     return BucketVersioning(
         enabled=enabled,
     )
+
+
+@dataclass(frozen=True)
+class S3Object:
+    content: str
+    etag: Optional[str] = None
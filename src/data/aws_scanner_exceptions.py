@@ -5,10 +5,6 @@ class AwsScannerException(Exception):
     pass
 
 
-class AddPartitionException(AwsScannerException):
-    pass
-
-
 class ClientFactoryException(AwsScannerException):
     pass
 
@@ -53,6 +49,10 @@ class QueryLogException(AwsScannerException):
     pass
 
 
+class IncompleteShardedRunException(AwsScannerException):
+    pass
+
+
 class InvalidDataPartitionException(AwsScannerException):
     def __init__(self, partitions: Iterable[Any], retention: int, year: int, month: int, day: Optional[int] = None):
         super().__init__(
@@ -92,6 +92,10 @@ class RunQueryException(AwsScannerException):
     pass
 
 
+class TaskDeadlineException(AwsScannerException):
+    pass
+
+
 class TimeoutException(AwsScannerException):
     pass
 
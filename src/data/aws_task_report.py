@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from hashlib import sha256
 from typing import Any, Dict, Optional
 
 from src.data.aws_athena_data_partition import AwsAthenaDataPartition
@@ -11,3 +12,8 @@ class AwsTaskReport:
     description: str
     partition: Optional[AwsAthenaDataPartition]
     results: Dict[Any, Any]
+    incomplete: Optional[bool] = None
+
+    @property
+    def key(self) -> str:
+        return sha256(f"{self.account.identifier}:{self.description}:{self.partition}".encode("utf-8")).hexdigest()
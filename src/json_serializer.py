@@ -1,6 +1,6 @@
 import datetime
-from json import dumps
-from typing import Any
+from json import dumps, loads
+from typing import Any, Dict, Iterable, Iterator, Mapping, Type
 
 
 def to_json(obj: Any) -> str:
@@ -12,6 +12,45 @@ def to_json(obj: Any) -> str:
     )
 
 
+def to_json_chunks(objs: Iterable[Any]) -> Iterator[str]:
+    yield "["
+    for index, obj in enumerate(objs):
+        yield f"{', ' if index else ''}{to_json(obj)}"
+    yield "]"
+
+
+def to_typed_json(obj: Any, types: Mapping[str, Type[Any]]) -> str:
+    return dumps(obj, default=lambda o: _typed(o, types))
+
+
+def from_typed_json(content: str, types: Mapping[str, Type[Any]]) -> Any:
+    return loads(content, object_hook=lambda o: _untyped(o, types))
+
+
+def type_name(cls: Type[Any]) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _typed(o: Any, types: Mapping[str, Type[Any]]) -> Dict[str, Any]:
+    if isinstance(o, datetime.datetime):
+        return {"__datetime__": o.isoformat()}
+    if type_name(type(o)) not in types:
+        raise TypeError(f"objects of type {type_name(type(o))} cannot be serialised")
+    return {"__type__": type_name(type(o)), "__fields__": vars(o)}
+
+
+def _untyped(o: Dict[str, Any], types: Mapping[str, Type[Any]]) -> Any:
+    if "__datetime__" in o:
+        return datetime.datetime.fromisoformat(o["__datetime__"])
+    if "__type__" not in o:
+        return o
+    if o["__type__"] not in types:
+        raise ValueError(f"objects of type {o['__type__']} cannot be deserialised")
+    obj = object.__new__(types[o["__type__"]])
+    vars(obj).update(o["__fields__"])
+    return obj
+
+
 def _is_public(prop: str) -> bool:
     return not prop.startswith("_")
 
@@ -1,10 +1,13 @@
 from random import randint
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from src.aws_scanner_config import AwsScannerConfig as Config
 from src.clients.aws_athena_client import AwsAthenaClient
+from src.clients.aws_deadline import deadline_suspended
 from src.data.aws_athena_data_partition import AwsAthenaDataPartition
+from src.data.aws_athena_pipeline import AwsAthenaPipeline
 from src.data.aws_organizations_types import Account
+from src.data.aws_scanner_exceptions import TaskDeadlineException
 from src.data.aws_task_report import AwsTaskReport
 from src.tasks.aws_task import AwsTask
 
@@ -16,26 +19,31 @@ class AwsAthenaTask(AwsTask):
         self._partition = partition
 
     def run(self, client: AwsAthenaClient) -> AwsTaskReport:
-        self._setup(client)
         try:
-            self._logger.info(f"running {self}")
-            results = self._run_task(client)
-        finally:
-            self._teardown(client)
+            self._setup(client)
+            try:
+                self._logger.info(f"running {self}")
+                return self._report(self._run_task(client))
+            finally:
+                with deadline_suspended():
+                    self._teardown(client)
+        except TaskDeadlineException as ex:
+            return self.incomplete(ex)
+
+    def pipeline(self) -> Optional[AwsAthenaPipeline]:
+        return None
+
+    def _report(self, results: Dict[Any, Any]) -> AwsTaskReport:
         return AwsTaskReport(self._account, self._description, self._partition, results)
 
     def _setup(self, client: AwsAthenaClient) -> None:
         self._logger.info(f"setting up {self}")
         client.create_database(self._database)
         self._create_table(client)
-        self._create_partition(client)
 
     def _create_table(self, client: AwsAthenaClient) -> None:
         raise NotImplementedError("this is an abstract class")
 
-    def _create_partition(self, client: AwsAthenaClient) -> None:
-        raise NotImplementedError("this is an abstract class")
-
     def _run_task(self, client: AwsAthenaClient) -> Dict[Any, Any]:
         raise NotImplementedError("this is an abstract class")
 
@@ -51,9 +59,5 @@ class AwsAthenaTask(AwsTask):
     def _randomise_name(name: str) -> str:
         return f"{Config().athena_database_prefix()}_{name}_{''.join([str(randint(0, 9)) for _ in range(10)])}"
 
-    @staticmethod
-    def _read_value(results: List[Any], row_index: int, item_index: int) -> str:
-        return str(results[row_index]["Data"][item_index].get("VarCharValue", ""))
-
     def __str__(self) -> str:
         return f"{super().__str__()} with {self._partition}"
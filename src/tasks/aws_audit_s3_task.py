@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Any, Dict
 
+from src.aws_sub_tasks import map_in_chunks
 from src.clients.composite.aws_s3_kms_client import AwsS3KmsClient
 from src.data.aws_organizations_types import Account
 from src.data.aws_s3_types import Bucket, BucketCompliancy, ComplianceCheck
@@ -13,11 +14,9 @@ class AwsAuditS3Task(AwsS3Task):
         super().__init__("audit S3 bucket compliance", account)
 
     def _run_task(self, client: AwsS3KmsClient) -> Dict[Any, Any]:
-        return {
-            "buckets": list(
-                map(lambda bucket: self._set_compliance(client.enrich_bucket(bucket)), client.list_buckets())
-            )
-        }
+        buckets = self._partial_results.setdefault("buckets", [])
+        map_in_chunks(lambda bucket: self._set_compliance(client.enrich_bucket(bucket)), client.list_buckets(), buckets)
+        return {"buckets": buckets}
 
     def _is_acl_compliant(self, bucket: Bucket) -> ComplianceCheck:
         return ComplianceCheck(
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Any, Dict
 
+from src.aws_sub_tasks import map_in_chunks
 from src.clients.composite.aws_vpc_client import AwsVpcClient
 from src.data.aws_organizations_types import Account
 from src.tasks.aws_task import AwsTask
@@ -15,7 +16,7 @@ class AwsAuditVPCDnsLogsTask(AwsTask):
         self.skip_tags = skip_tags
 
     def _run_task(self, client: AwsVpcClient) -> Dict[Any, Any]:
-        vpcs = client.list_vpcs()
+        vpcs = map_in_chunks(client.enrich_vpc, client.ec2.list_vpcs())
         actions = client.enforcement_dns_log_actions(vpcs, self.with_subscription_filter, self.skip_tags)
         if self.enforce:
             apply = [a.apply() for a in actions]
@@ -0,0 +1,86 @@
+from string import Template
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.clients.aws_athena_catalog import current_athena_catalog
+from src.clients.aws_athena_client import AwsAthenaClient
+from src.clients.aws_athena_result_set import AthenaColumns, extend_columns
+from src.clients.aws_athena_scheduler import create_database_statement, drop_database_statement, drop_table_statement
+from src.data.aws_athena_pipeline import AwsAthenaPipeline, AwsAthenaResource, AwsAthenaStatement
+from src.tasks.aws_cloudtrail_task import AwsCloudTrailTask
+
+
+class AwsCloudTrailQueryTask(AwsCloudTrailTask):
+    def pipeline(self) -> Optional[AwsAthenaPipeline]:
+        self._use_shared_database()
+        return AwsAthenaPipeline(
+            resources=self._resources(),
+            query=AwsAthenaStatement(self._query(), self._database),
+            report=lambda columns: self._report(self._results(columns)),
+            incomplete=self.incomplete,
+            readers=self._query_readers(),
+        )
+
+    def _setup(self, client: AwsAthenaClient) -> None:
+        catalog = current_athena_catalog()
+        if catalog:
+            self._logger.info(f"setting up shared resources for {self}")
+            self._use_shared_database()
+            for resource in self._resources():
+                catalog.create(resource, lambda statement: self._execute(client, statement))
+        else:
+            super()._setup(client)
+
+    def _teardown(self, client: AwsAthenaClient) -> None:
+        if not current_athena_catalog():
+            super()._teardown(client)
+
+    def _use_shared_database(self) -> None:
+        catalog = current_athena_catalog()
+        if catalog:
+            self._database = catalog.database(self._account.identifier, self._database)
+
+    def _resources(self) -> List[AwsAthenaResource]:
+        return [
+            AwsAthenaResource(create_database_statement(self._database), (drop_database_statement(self._database),)),
+            AwsAthenaResource(
+                self._create_table_statement(), (drop_table_statement(self._database, self._account.identifier),)
+            ),
+        ]
+
+    def _run_task(self, client: AwsAthenaClient) -> Dict[Any, Any]:
+        catalog = current_athena_catalog()
+        statement = AwsAthenaStatement(self._query(), self._database)
+        if catalog:
+            return self._results(
+                catalog.query(statement, lambda shared: self._query_columns(client, shared), self._query_readers())
+            )
+        return self._page_results(client.query_column_pages(database=statement.database, query=statement.query))
+
+    @staticmethod
+    def _query_columns(client: AwsAthenaClient, statement: AwsAthenaStatement) -> AthenaColumns:
+        return client.query_columns(database=statement.database, query=statement.query)
+
+    def _page_results(self, pages: Iterable[AthenaColumns]) -> Dict[Any, Any]:
+        columns: AthenaColumns = {}
+        for page in pages:
+            extend_columns(columns, page)
+        return self._results(columns)
+
+    def _query_readers(self) -> int:
+        return 1
+
+    def _query(self) -> str:
+        raise NotImplementedError("this is an abstract class")
+
+    def _substitute(self, query: str, **attributes: str) -> str:
+        return Template(query).substitute(
+            database=self._database,
+            account=self._account.identifier,
+            region=self._partition.region,
+            year=self._partition.year,
+            month=self._partition.month,
+            **attributes,
+        )
+
+    def _results(self, columns: AthenaColumns) -> Dict[Any, Any]:
+        raise NotImplementedError("this is an abstract class")
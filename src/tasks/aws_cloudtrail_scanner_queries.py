@@ -1,15 +1,27 @@
 SCAN_SERVICE_USAGE = (
     "SELECT eventsource, eventname, errorcode, COUNT(1) AS count "
     'FROM "$database"."$account" '
-    "WHERE eventsource LIKE '%$service%' "
+    "WHERE region = '$region' AND year = '$year' AND month = '$month' "
+    "AND eventsource LIKE '%$service%' "
     "GROUP BY eventsource, eventname, errorcode "
     "LIMIT 100"
 )
 
+SCAN_SERVICES_USAGE = (
+    "SELECT eventsource, eventname, errorcode, COUNT(1) AS count "
+    'FROM "$database"."$account" '
+    "WHERE region = '$region' AND year = '$year' AND month = '$month' "
+    "AND $services "
+    "GROUP BY eventsource, eventname, errorcode"
+)
+
+SERVICE_EVENT_SOURCE = "eventsource LIKE '%$service%'"
+
 FIND_PRINCIPAL_BY_IP = (
     "SELECT DISTINCT useridentity.principalid "
     'FROM "$database"."$account" '
-    "WHERE sourceipaddress = '$source_ip' "
+    "WHERE region = '$region' AND year = '$year' AND month = '$month' "
+    "AND sourceipaddress = '$source_ip' "
     "AND useridentity.principalid not like '%boto%' "
     "AND useridentity.principalid not like '%aws%' "
     "LIMIT 100"
@@ -18,7 +30,8 @@ FIND_PRINCIPAL_BY_IP = (
 SCAN_ROLE_USAGE = (
     "SELECT eventsource, eventname, count(1) as count "
     'FROM "$database"."$account" '
-    "WHERE useridentity.arn like '%assumed-role/$role%' "
+    "WHERE region = '$region' AND year = '$year' AND month = '$month' "
+    "AND useridentity.arn like '%assumed-role/$role%' "
     "GROUP by eventsource, eventname "
     "ORDER by eventsource, eventname "
     "LIMIT 100"
@@ -1,35 +1,36 @@
 from string import Template
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from src.aws_scanner_config import AwsScannerConfig as Config
 from src.clients.aws_athena_client import AwsAthenaClient
-from src.clients.aws_athena_cloudtrail_queries import ADD_PARTITION_YEAR_MONTH, CREATE_TABLE
-from src.data.aws_scanner_exceptions import AddPartitionException, CreateTableException
+from src.clients.aws_athena_cloudtrail_queries import CREATE_TABLE
+from src.data.aws_athena_data_partition import AwsAthenaDataPartition
+from src.data.aws_athena_pipeline import AwsAthenaStatement
+from src.data.aws_scanner_exceptions import CreateTableException
 from src.tasks.aws_athena_task import AwsAthenaTask
 
 
 class AwsCloudTrailTask(AwsAthenaTask):
     def _create_table(self, client: AwsAthenaClient) -> None:
-        client.run_query(
-            database=self._database,
-            query=Template(CREATE_TABLE).substitute(
-                account=self._account.identifier, cloudtrail_logs_bucket=Config().cloudtrail_logs_bucket()
-            ),
-            raise_on_failure=CreateTableException,
-        )
+        self._execute(client, self._create_table_statement())
 
-    def _create_partition(self, client: AwsAthenaClient) -> None:
-        client.run_query(
-            database=self._database,
-            query=Template(ADD_PARTITION_YEAR_MONTH).substitute(
+    def _create_table_statement(self) -> AwsAthenaStatement:
+        return AwsAthenaStatement(
+            query=Template(CREATE_TABLE).substitute(
                 account=self._account.identifier,
-                region=self._partition.region,
-                year=self._partition.year,
-                month=self._partition.month,
+                regions=",".join(AwsAthenaDataPartition.regions()),
+                years=",".join(map(str, AwsAthenaDataPartition.years())),
                 cloudtrail_logs_bucket=Config().cloudtrail_logs_bucket(),
             ),
-            raise_on_failure=AddPartitionException,
+            database=self._database,
+            raise_on_failure=CreateTableException,
         )
 
     def _run_task(self, client: AwsAthenaClient) -> Dict[Any, Any]:
         raise NotImplementedError("this is an abstract class")
+
+    @staticmethod
+    def _execute(client: AwsAthenaClient, statement: AwsAthenaStatement) -> List[Any]:
+        return client.run_query(
+            database=statement.database, query=statement.query, raise_on_failure=statement.raise_on_failure
+        )
@@ -4,13 +4,11 @@ from typing import Any, Dict
 from src.aws_scanner_config import AwsScannerConfig as Config
 from src.clients.aws_athena_client import AwsAthenaClient
 from src.data.aws_athena_data_partition import AwsAthenaDataPartition
-from src.data.aws_scanner_exceptions import AddPartitionException, CreateTableException
+from src.data.aws_scanner_exceptions import CreateTableException
 from src.tasks.aws_athena_task import AwsAthenaTask
 from src.clients.aws_athena_flow_logs_queries import (
     CREATE_FL_TABLE_YEAR_MONTH,
     CREATE_FL_TABLE_YEAR_MONTH_DAY,
-    ADD_PARTITION_YEAR_MONTH_DAY,
-    ADD_PARTITION_YEAR_MONTH,
 )
 
 
@@ -24,27 +22,17 @@ class AwsCreateFlowLogsTableTask(AwsAthenaTask):
 
     def _create_table(self, client: AwsAthenaClient) -> None:
         query_template = CREATE_FL_TABLE_YEAR_MONTH_DAY if self._partition.day else CREATE_FL_TABLE_YEAR_MONTH
-        query_attributes = {"table_name": self._table_name, "flow_logs_bucket": self._config.athena_flow_logs_bucket()}
-
-        client.run_query(
-            database=self._database,
-            query=Template(query_template).substitute(**query_attributes),
-            raise_on_failure=CreateTableException,
-        ),
-
-    def _create_partition(self, client: AwsAthenaClient) -> None:
-        query_template = ADD_PARTITION_YEAR_MONTH_DAY if self._partition.day else ADD_PARTITION_YEAR_MONTH
         query_attributes = {
             "table_name": self._table_name,
             "year": self._partition.year,
             "month": self._partition.month,
-            "flow_logs_bucket": Config().athena_flow_logs_bucket(),
+            "flow_logs_bucket": self._config.athena_flow_logs_bucket(),
         } | {"day": day for day in [self._partition.day] if day}
 
         client.run_query(
             database=self._database,
             query=Template(query_template).substitute(**query_attributes),
-            raise_on_failure=AddPartitionException,
+            raise_on_failure=CreateTableException,
         )
 
     def _run_task(self, client: AwsAthenaClient) -> Dict[Any, Any]:
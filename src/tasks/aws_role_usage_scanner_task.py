@@ -1,33 +1,28 @@
-from string import Template
 from typing import Any, Dict
 
 from src.tasks import aws_cloudtrail_scanner_queries as queries
 
-from src.clients.aws_athena_client import AwsAthenaClient
+from src.clients.aws_athena_result_set import AthenaColumns
+
 from src.data.aws_athena_data_partition import AwsAthenaDataPartition
-from src.tasks.aws_cloudtrail_task import AwsCloudTrailTask
+from src.tasks.aws_cloudtrail_query_task import AwsCloudTrailQueryTask
 from src.data.aws_organizations_types import Account
 
 
-class AwsRoleUsageScannerTask(AwsCloudTrailTask):
+class AwsRoleUsageScannerTask(AwsCloudTrailQueryTask):
     def __init__(self, account: Account, partition: AwsAthenaDataPartition, role: str):
         super().__init__(f"AWS {role} usage scan", account, partition)
         self._role = role
 
-    def _run_task(self, client: AwsAthenaClient) -> Dict[Any, Any]:
-        results = self._run_query(
-            client,
-            Template(queries.SCAN_ROLE_USAGE).substitute(
-                database=self._database, account=self._account.identifier, role=self._role
-            ),
-        )
+    def _query(self) -> str:
+        return self._substitute(queries.SCAN_ROLE_USAGE, role=self._role)
+
+    def _results(self, columns: AthenaColumns) -> Dict[Any, Any]:
         return {
             "role_usage": [
-                {
-                    "event_source": self._read_value(results, row, 0),
-                    "event_name": self._read_value(results, row, 1),
-                    "count": int(self._read_value(results, row, 2)),
-                }
-                for row in range(len(results))
+                {"event_source": event_source, "event_name": event_name, "count": count}
+                for event_source, event_name, count in zip(
+                    columns["eventsource"], columns["eventname"], columns["count"]
+                )
             ]
         }
@@ -1,34 +1,58 @@
+from itertools import islice
 from string import Template
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
 
 from src.tasks import aws_cloudtrail_scanner_queries as queries
 
-from src.clients.aws_athena_client import AwsAthenaClient
+from src.clients.aws_athena_catalog import current_athena_catalog
+from src.clients.aws_athena_result_set import AthenaColumns, iter_records
+
 from src.data.aws_athena_data_partition import AwsAthenaDataPartition
-from src.tasks.aws_cloudtrail_task import AwsCloudTrailTask
+from src.tasks.aws_cloudtrail_query_task import AwsCloudTrailQueryTask
 from src.data.aws_organizations_types import Account
 
+SERVICE_USAGE_LIMIT = 100
+
 
-class AwsServiceUsageScannerTask(AwsCloudTrailTask):
-    def __init__(self, account: Account, partition: AwsAthenaDataPartition, service: str):
+class AwsServiceUsageScannerTask(AwsCloudTrailQueryTask):
+    def __init__(
+        self,
+        account: Account,
+        partition: AwsAthenaDataPartition,
+        service: str,
+        services: Optional[Sequence[str]] = None,
+    ):
         super().__init__(f"AWS {service} service usage scan", account, partition)
         self._service = service
+        self._services = tuple(services or [service])
+
+    def _batched(self) -> bool:
+        return bool(current_athena_catalog()) and len(self._services) > 1
+
+    def _query_readers(self) -> int:
+        return len(self._services) if self._batched() else 1
+
+    def _query(self) -> str:
+        if self._batched():
+            return self._batched_query()
+        return self._substitute(queries.SCAN_SERVICE_USAGE, service=self._service)
+
+    def _batched_query(self) -> str:
+        event_sources = (Template(queries.SERVICE_EVENT_SOURCE).substitute(service=s) for s in self._services)
+        return self._substitute(queries.SCAN_SERVICES_USAGE, services=f"({' OR '.join(event_sources)})")
+
+    def _results(self, columns: AthenaColumns) -> Dict[Any, Any]:
+        return self._usage(iter_records([columns]))
+
+    def _page_results(self, pages: Iterable[AthenaColumns]) -> Dict[Any, Any]:
+        return self._usage(iter_records(pages))
 
-    def _run_task(self, client: AwsAthenaClient) -> Dict[Any, Any]:
-        results = self._run_query(
-            client,
-            Template(queries.SCAN_SERVICE_USAGE).substitute(
-                database=self._database, account=self._account.identifier, service=self._service
-            ),
-        )
+    def _usage(self, records: Iterator[Dict[str, Any]]) -> Dict[Any, Any]:
+        usage = list(islice((row for row in records if self._service in row["eventsource"]), SERVICE_USAGE_LIMIT))
         return {
-            "event_source": self._read_value(results, 0, 0) if results else self._service,
+            "event_source": next((row["eventsource"] for row in usage), self._service),
             "service_usage": [
-                {
-                    "event_name": self._read_value(results, row, 1),
-                    "error_code": self._read_value(results, row, 2),
-                    "count": int(self._read_value(results, row, 3)),
-                }
-                for row in range(len(results))
+                {"event_name": row["eventname"], "error_code": row["errorcode"] or "", "count": row["count"]}
+                for row in usage
             ],
         }
@@ -1,6 +1,8 @@
+from dataclasses import replace
 from typing import Any, Dict
 from logging import getLogger
 
+from src.data.aws_scanner_exceptions import TaskDeadlineException
 from src.data.aws_task_report import AwsTaskReport
 from src.data.aws_organizations_types import Account
 
@@ -10,17 +12,37 @@ class AwsTask:
         self._logger = getLogger(self.__class__.__name__)
         self._description = description
         self._account = account
+        self._partial_results: Dict[Any, Any] = {}
 
     def run(self, client: Any) -> AwsTaskReport:
         self._logger.info(f"running {self}")
-        return AwsTaskReport(
-            account=self._account, description=self._description, partition=None, results=self._run_task(client)
-        )
+        try:
+            return self._report(self._run_task(client))
+        except TaskDeadlineException as ex:
+            return self.incomplete(ex)
+        finally:
+            self._partial_results = {}
+
+    def incomplete(self, reason: Exception) -> AwsTaskReport:
+        self._logger.warning(f"{self} did not complete: {reason}")
+        results, self._partial_results = self._partial_results, {}
+        return replace(self._report(results), incomplete=True)
 
     @property
     def account(self) -> Account:
         return self._account
 
+    @property
+    def description(self) -> str:
+        return self._description
+
+    @property
+    def report_key(self) -> str:
+        return self._report({}).key
+
+    def _report(self, results: Dict[Any, Any]) -> AwsTaskReport:
+        return AwsTaskReport(account=self._account, description=self._description, partition=None, results=results)
+
     def _run_task(self, client: Any) -> Dict[Any, Any]:
         raise NotImplementedError("this is an abstract class")
 
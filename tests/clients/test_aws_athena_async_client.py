@@ -1,10 +1,9 @@
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
-from botocore.exceptions import ClientError, ParamValidationError
-from typing import Any, Dict, Type
+from botocore.exceptions import BotoCoreError, ClientError, ParamValidationError
+from typing import Any, Dict, Optional, Type
 
-from src.clients import aws_athena_query_states as states
 from src.data import aws_scanner_exceptions as exception
 from src.clients.aws_athena_async_client import AwsAthenaAsyncClient
 
@@ -140,64 +139,6 @@ class TestRunQuery(TestCase):
         self.assertIn(error_message, ex.exception.args[0])
 
 
-class TestIsQueryStateIn(TestCase):
-    def test_query_state_is_in_completed_states(self) -> None:
-        query_id = "48068afb-edde-4e9c-bcef-6bfa29987b1a"
-        for state in [states.QUERY_SUCCEEDED, states.QUERY_FAILED, states.QUERY_CANCELLED]:
-            mock_athena = Mock(get_query_execution=Mock(return_value={"QueryExecution": {"Status": {"State": state}}}))
-            self.assertTrue(
-                AwsAthenaAsyncClient(mock_athena)._is_query_state_in(query_id, states.COMPLETED_STATES),
-                f"query should be considered completed when status is {state}",
-            )
-            mock_athena.get_query_execution.assert_called_once_with(QueryExecutionId=query_id)
-
-    def test_query_state_is_not_in_completed_states(self) -> None:
-        query_id = "6da1f9be-772e-4a19-a542-f9f13e037707"
-        for state in [states.QUERY_QUEUED, states.QUERY_RUNNING]:
-            mock_athena = Mock(get_query_execution=Mock(return_value={"QueryExecution": {"Status": {"State": state}}}))
-            self.assertFalse(
-                AwsAthenaAsyncClient(mock_athena)._is_query_state_in(query_id, states.COMPLETED_STATES),
-                f"query should not be considered completed when status is {state}",
-            )
-            mock_athena.get_query_execution.assert_called_once_with(QueryExecutionId=query_id)
-
-    def test_query_state_is_unknown(self) -> None:
-        query_id = "6da1f9be-772e-4a19-a542-f9f13e037707"
-        error_message = "some client error"
-        mock_athena = Mock(
-            get_query_execution=Mock(
-                side_effect=ClientError(
-                    operation_name="AssumeRole",
-                    error_response={
-                        "Error": {
-                            "Code": "AccessDenied",
-                            "Message": error_message,
-                        }
-                    },
-                )
-            )
-        )
-        with self.assertRaises(exception.UnknownQueryStateException) as ex:
-            AwsAthenaAsyncClient(mock_athena)._is_query_state_in(query_id, states.COMPLETED_STATES)
-        self.assertIn(error_message, ex.exception.args[0])
-
-    def test_has_query_completed(self) -> None:
-        query_id = "4321-8765"
-        with patch(
-            "src.clients.aws_athena_async_client.AwsAthenaAsyncClient._is_query_state_in"
-        ) as mock_is_query_state_in:
-            AwsAthenaAsyncClient(Mock()).has_query_completed(query_id)
-        mock_is_query_state_in.assert_called_once_with(query_id, states.COMPLETED_STATES)
-
-    def test_has_query_succeeded(self) -> None:
-        query_id = "9876-6543"
-        with patch(
-            "src.clients.aws_athena_async_client.AwsAthenaAsyncClient._is_query_state_in"
-        ) as mock_is_query_state_in:
-            AwsAthenaAsyncClient(Mock()).has_query_succeeded(query_id)
-        mock_is_query_state_in.assert_called_once_with(query_id, states.SUCCESS_STATES)
-
-
 class TestGetQueryResults(TestCase):
     def test_get_query_results_has_results(self) -> None:
         query_id = "48068afb-edde-4e9c-bcef-6bfa29987b1a"
@@ -240,13 +181,47 @@ class TestGetQueryResults(TestCase):
         self.assertIn(error_message, ex.exception.args[0])
 
 
-class TestGetQueryError(TestCase):
-    def test_get_query_error(self) -> None:
-        query_id = "5789-3472-6589"
-        error = "FAILED: SemanticException [Error 10072]: Database does not exist: 1234"
-        mock_athena = Mock(get_query_execution=Mock(return_value=queries_results.DROP_DATABASE_EXECUTION_FAILURE))
-        self.assertEqual(error, AwsAthenaAsyncClient(mock_athena).get_query_error(query_id))
-        mock_athena.get_query_execution.assert_called_once_with(QueryExecutionId=query_id)
+class TestPaginatedQueryResults(TestCase):
+    metadata = {"ColumnInfo": [{"Name": "name", "Type": "varchar"}]}
+    pages: Dict[Optional[str], Dict[str, Any]] = {
+        None: {
+            "ResultSet": {
+                "ResultSetMetadata": metadata,
+                "Rows": [{"Data": [{"VarCharValue": "name"}]}, {"Data": [{"VarCharValue": "a"}]}],
+            },
+            "NextToken": "page-2",
+        },
+        "page-2": {
+            "ResultSet": {"ResultSetMetadata": metadata, "Rows": [{"Data": [{"VarCharValue": "b"}]}, {"Data": [{}]}]}
+        },
+    }
+
+    def get_query_results(self, QueryExecutionId: str, NextToken: Optional[str] = None) -> Dict[str, Any]:
+        return self.pages[NextToken]
+
+    def test_get_query_results_reads_all_pages(self) -> None:
+        mock_athena = Mock(get_query_results=Mock(side_effect=self.get_query_results))
+        self.assertEqual(
+            [{"Data": [{"VarCharValue": "a"}]}, {"Data": [{"VarCharValue": "b"}]}, {"Data": [{}]}],
+            AwsAthenaAsyncClient(mock_athena).get_query_results("1234"),
+        )
+        mock_athena.get_query_results.assert_called_with(QueryExecutionId="1234", NextToken="page-2")
+
+    def test_get_query_columns_reads_all_pages(self) -> None:
+        mock_athena = Mock(get_query_results=Mock(side_effect=self.get_query_results))
+        self.assertEqual({"name": ["a", "b", None]}, AwsAthenaAsyncClient(mock_athena).get_query_columns("1234"))
+
+    def test_iter_query_columns(self) -> None:
+        mock_athena = Mock(get_query_results=Mock(side_effect=self.get_query_results))
+        pages = AwsAthenaAsyncClient(mock_athena).iter_query_columns("1234")
+        self.assertEqual({"name": ["a"]}, next(pages))
+        mock_athena.get_query_results.assert_called_once_with(QueryExecutionId="1234")
+        self.assertEqual([{"name": ["b", None]}], list(pages))
+
+    def test_get_query_columns_failure_on_later_page(self) -> None:
+        mock_athena = Mock(get_query_results=Mock(side_effect=[self.pages[None], BotoCoreError()]))
+        with self.assertRaises(exception.GetQueryResultsException):
+            AwsAthenaAsyncClient(mock_athena).get_query_columns("1234")
 
 
 class TestListTables(TestCase):
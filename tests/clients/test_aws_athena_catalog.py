@@ -0,0 +1,141 @@
+from concurrent.futures import Future
+from threading import Thread
+from unittest import TestCase
+from unittest.mock import Mock
+
+from src.clients.aws_athena_catalog import AwsAthenaCatalog, athena_catalog, current_athena_catalog
+from src.data.aws_athena_pipeline import AwsAthenaResource, AwsAthenaStatement
+from src.data import aws_scanner_exceptions as exceptions
+
+DATABASE = AwsAthenaResource(
+    AwsAthenaStatement("CREATE DATABASE db", raise_on_failure=exceptions.CreateDatabaseException),
+    (AwsAthenaStatement("DROP DATABASE db", raise_on_failure=exceptions.DropDatabaseException),),
+)
+QUERY = AwsAthenaStatement("SELECT COUNT(1) FROM t", "db")
+TABLE = AwsAthenaResource(
+    AwsAthenaStatement("CREATE TABLE t", "db", exceptions.CreateTableException),
+    (AwsAthenaStatement("DROP TABLE t", "db", exceptions.DropTableException),),
+)
+
+
+class TestAthenaCatalogContext(TestCase):
+    def test_athena_catalog(self) -> None:
+        catalog = AwsAthenaCatalog()
+        self.assertIsNone(current_athena_catalog())
+        with athena_catalog(catalog):
+            self.assertIs(catalog, current_athena_catalog())
+            with athena_catalog(None):
+                self.assertIsNone(current_athena_catalog())
+            self.assertIs(catalog, current_athena_catalog())
+        self.assertIsNone(current_athena_catalog())
+
+
+class TestAwsAthenaCatalog(TestCase):
+    def test_first_database_name_per_account_wins(self) -> None:
+        catalog = AwsAthenaCatalog()
+        self.assertEqual("db_1", catalog.database("account_1", "db_1"))
+        self.assertEqual("db_1", catalog.database("account_1", "db_2"))
+        self.assertEqual("db_3", catalog.database("account_2", "db_3"))
+
+    def test_resources_are_created_once(self) -> None:
+        catalog = AwsAthenaCatalog()
+        execute = Mock()
+        for resource in [DATABASE, TABLE, DATABASE, TABLE]:
+            catalog.create(resource, execute)
+        self.assertEqual([DATABASE.create, TABLE.create], [c.args[0] for c in execute.call_args_list])
+        self.assertEqual([*TABLE.drop, *DATABASE.drop], catalog.drop_statements())
+        self.assertEqual([], catalog.drop_statements())
+
+    def test_concurrent_creations_wait_for_the_first(self) -> None:
+        catalog = AwsAthenaCatalog()
+        catalog.claim(DATABASE)
+        execute = Mock()
+        waiter = Thread(target=catalog.create, args=(DATABASE, execute))
+        waiter.start()
+        catalog.created(DATABASE)
+        waiter.join()
+        execute.assert_not_called()
+
+    def test_failed_creation_is_retried_later(self) -> None:
+        catalog = AwsAthenaCatalog()
+        with self.assertRaises(exceptions.CreateDatabaseException):
+            catalog.create(DATABASE, Mock(side_effect=exceptions.CreateDatabaseException("boom")))
+        execute = Mock()
+        catalog.create(DATABASE, execute)
+        execute.assert_called_once_with(DATABASE.create)
+
+    def test_waiters_see_failed_creation(self) -> None:
+        catalog = AwsAthenaCatalog()
+        future, owner = catalog.claim(DATABASE)
+        self.assertTrue(owner)
+        self.assertFalse(catalog.claim(DATABASE)[1])
+        catalog.failed(DATABASE, exceptions.CreateDatabaseException("boom"))
+        self.assertRaisesRegex(exceptions.CreateDatabaseException, "boom", future.result)
+
+    def test_creation_past_deadline_is_released(self) -> None:
+        catalog = AwsAthenaCatalog()
+        with self.assertRaises(exceptions.TaskDeadlineException):
+            catalog.create(DATABASE, Mock(side_effect=exceptions.TaskDeadlineException("late")))
+        future, owner = catalog.claim(DATABASE)
+        self.assertTrue(owner)
+        catalog.release(DATABASE)
+        self.assertIsNone(future.result())
+
+    def test_released_resources_are_claimed_again(self) -> None:
+        catalog = AwsAthenaCatalog()
+        catalog.claim(DATABASE)
+        execute = Mock()
+        waiter = Thread(target=catalog.create, args=(DATABASE, execute))
+        waiter.start()
+        catalog.release(DATABASE)
+        waiter.join()
+        execute.assert_called_once_with(DATABASE.create)
+
+    def test_identical_queries_run_once(self) -> None:
+        catalog = AwsAthenaCatalog()
+        execute = Mock(return_value={"count": [1]})
+        self.assertEqual({"count": [1]}, catalog.query(QUERY, execute, readers=2))
+        self.assertEqual({"count": [1]}, catalog.query(QUERY, execute, readers=2))
+        execute.assert_called_once_with(QUERY)
+        self.assertEqual([], catalog.drop_statements())
+
+    def test_query_results_are_released_once_read_by_all_readers(self) -> None:
+        catalog = AwsAthenaCatalog()
+        execute = Mock(return_value={"count": [1]})
+        catalog.query(QUERY, execute, readers=2)
+        catalog.query(QUERY, execute, readers=2)
+        self.assertEqual({"count": [1]}, catalog.query(QUERY, execute, readers=2))
+        self.assertEqual(2, execute.call_count)
+        self.assertEqual({QUERY: 1}, catalog._unread)
+
+    def test_stale_reads_are_ignored(self) -> None:
+        catalog = AwsAthenaCatalog()
+        catalog.query(QUERY, Mock(return_value={"count": [1]}))
+        catalog.read(QUERY, Future())
+        self.assertEqual({}, catalog._unread)
+
+    def test_failed_queries_are_run_again(self) -> None:
+        catalog = AwsAthenaCatalog()
+        with self.assertRaises(exceptions.RunQueryException):
+            catalog.query(QUERY, Mock(side_effect=exceptions.RunQueryException("boom")))
+        self.assertEqual({}, catalog.query(QUERY, Mock(return_value={})))
+
+    def test_drop_all(self) -> None:
+        catalog = AwsAthenaCatalog()
+        catalog.create(DATABASE, Mock())
+        catalog.create(TABLE, Mock())
+        client = Mock(run_query=Mock(side_effect=[exceptions.DropTableException("nope"), None]))
+        with self.assertLogs("AwsAthenaCatalog", level="ERROR") as logs:
+            catalog.drop_all(lambda: client)
+        self.assertIn("DropTableException: nope", logs.output[0])
+        client.run_query.assert_any_call(
+            database="db", query="DROP TABLE t", raise_on_failure=exceptions.DropTableException
+        )
+        client.run_query.assert_called_with(
+            database="", query="DROP DATABASE db", raise_on_failure=exceptions.DropDatabaseException
+        )
+
+    def test_drop_all_without_resources(self) -> None:
+        athena = Mock()
+        AwsAthenaCatalog().drop_all(athena)
+        athena.assert_not_called()
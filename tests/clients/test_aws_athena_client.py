@@ -1,5 +1,5 @@
 from unittest import TestCase
-from unittest.mock import Mock, call, patch
+from unittest.mock import MagicMock, Mock, patch
 
 from typing import Any, Dict, Type
 
@@ -9,59 +9,35 @@ from src.clients.aws_athena_client import AwsAthenaClient
 
 class TestWaitFor(TestCase):
     def test_wait_for_completion(self) -> None:
-        query_id = "8759-2768-2364"
-        mock_has_query_completed = Mock(side_effect=[False, False, True])
-        with patch(
-            "src.clients.aws_athena_async_client.AwsAthenaAsyncClient.has_query_completed", mock_has_query_completed
-        ):
-            AwsAthenaClient(Mock())._wait_for_completion(query_id, 60)
-        mock_has_query_completed.assert_has_calls([call(query_id) for _ in range(3)])
-
-    def test_wait_for_completion_timeout(self) -> None:
-        query_id = "9837-4857-3576"
-        mock_has_query_completed = Mock(return_value=False)
-        with patch(
-            "src.clients.aws_athena_async_client.AwsAthenaAsyncClient.has_query_completed", mock_has_query_completed
-        ):
-            with self.assertRaises(exceptions.TimeoutException) as ex:
-                AwsAthenaClient(Mock())._wait_for_completion(query_id, 30)
-        mock_has_query_completed.assert_has_calls([call(query_id) for _ in range(30)])
-        self.assertIn(query_id, ex.exception.args[0])
+        execution = {"Status": {"State": "SUCCEEDED"}}
+        waiter = Mock(wait=Mock(return_value=execution))
+        self.assertEqual(execution, AwsAthenaClient(Mock(), waiter)._wait_for_completion("8759-2768-2364", 60))
+        waiter.wait.assert_called_once_with("8759-2768-2364", 60)
 
     def test_wait_for_success(self) -> None:
         query_id = "9847-2919-2284"
-        timeout = 74
         query_results = ["some results"]
-        mock_wait_for_completion = Mock(return_value=None)
-        mock_query_succeeded = Mock(return_value=True)
+        waiter = Mock(wait=Mock(return_value={"Status": {"State": "SUCCEEDED"}}))
         mock_query_results = Mock(return_value=query_results)
-        with patch("src.clients.aws_athena_client.AwsAthenaClient._wait_for_completion", mock_wait_for_completion):
-            with patch(
-                "src.clients.aws_athena_async_client.AwsAthenaAsyncClient.has_query_succeeded", mock_query_succeeded
-            ):
-                with patch(
-                    "src.clients.aws_athena_async_client.AwsAthenaAsyncClient.get_query_results", mock_query_results
-                ):
-                    actual_results = AwsAthenaClient(Mock())._wait_for_success(query_id, timeout, Exception)
+        with patch("src.clients.aws_athena_async_client.AwsAthenaAsyncClient.get_query_results", mock_query_results):
+            actual_results = AwsAthenaClient(Mock(), waiter)._wait_for_success(query_id, 74, Exception)
         self.assertEqual(query_results, actual_results)
-        mock_wait_for_completion.assert_called_once_with(query_id, timeout)
-        mock_query_succeeded.assert_called_once_with(query_id)
+        waiter.wait.assert_called_once_with(query_id, 74)
+        mock_query_results.assert_called_once_with(query_id)
 
     def test_wait_for_success_query_does_not_succeed(self) -> None:
-        mock_wait_for_completion = Mock(return_value=None)
-        mock_query_succeeded = Mock(return_value=False)
         query_error = "the query failed for some reasons"
-        mock_get_query_error = Mock(return_value=query_error)
-        with patch("src.clients.aws_athena_client.AwsAthenaClient._wait_for_completion", mock_wait_for_completion):
-            with patch(
-                "src.clients.aws_athena_async_client.AwsAthenaAsyncClient.has_query_succeeded", mock_query_succeeded
-            ):
-                with patch(
-                    "src.clients.aws_athena_async_client.AwsAthenaAsyncClient.get_query_error", mock_get_query_error
-                ):
-                    with self.assertRaises(exceptions.RunQueryException) as ex:
-                        AwsAthenaClient(Mock())._wait_for_success("9847-2919-2284", 74, exceptions.RunQueryException)
+        boto_athena = Mock()
+        waiter = Mock(wait=Mock(return_value={"Status": {"State": "FAILED", "StateChangeReason": query_error}}))
+        with self.assertRaises(exceptions.RunQueryException) as ex:
+            AwsAthenaClient(boto_athena, waiter)._wait_for_success("9847-2919-2284", 74, exceptions.RunQueryException)
         self.assertIn(query_error, ex.exception.args)
+        boto_athena.get_query_execution.assert_not_called()
+        boto_athena.get_query_results.assert_not_called()
+
+    def test_default_waiter_polls_the_client_boto_athena(self) -> None:
+        boto_athena = Mock()
+        self.assertIs(boto_athena, AwsAthenaClient(boto_athena)._waiter._athena())
 
 
 @patch("src.clients.aws_athena_client.AwsAthenaClient._wait_for_success")
@@ -128,6 +104,52 @@ class TestQueries(TestCase):
             self.assertEqual(query_results, actual_results)
 
 
+class TestQueryColumns(TestCase):
+    def test_query_columns(self) -> None:
+        limiter = MagicMock()
+        waiter = Mock(wait=Mock(return_value={"Status": {"State": "SUCCEEDED"}}))
+        client = AwsAthenaClient(Mock(), waiter, limiter)
+        with patch.object(client, "_athena_async") as athena_async:
+            athena_async.run_query.return_value = "1234"
+            athena_async.get_query_columns.return_value = {"count": [42]}
+            self.assertEqual({"count": [42]}, client.query_columns("some_db", "SELECT COUNT(1) AS count"))
+        athena_async.run_query.assert_called_once_with(query="SELECT COUNT(1) AS count", database="some_db")
+        athena_async.get_query_columns.assert_called_once_with("1234")
+        limiter.running.return_value.__exit__.assert_called_once()
+
+    def test_query_columns_failure(self) -> None:
+        waiter = Mock(wait=Mock(return_value={"Status": {"State": "FAILED", "StateChangeReason": "bad query"}}))
+        client = AwsAthenaClient(Mock(), waiter)
+        with patch.object(client, "_athena_async") as athena_async:
+            with self.assertRaisesRegex(exceptions.RunQueryException, "bad query"):
+                client.query_columns("some_db", "SELECT something")
+        athena_async.get_query_columns.assert_not_called()
+
+
+class TestQueryColumnPages(TestCase):
+    def test_query_column_pages(self) -> None:
+        limiter = MagicMock()
+        waiter = Mock(wait=Mock(return_value={"Status": {"State": "SUCCEEDED"}}))
+        client = AwsAthenaClient(Mock(), waiter, limiter)
+        with patch.object(client, "_athena_async") as athena_async:
+            athena_async.run_query.return_value = "1234"
+            athena_async.iter_query_columns.side_effect = lambda query_id: iter([{"count": [1]}, {"count": [2]}])
+            pages = client.query_column_pages("some_db", "SELECT something")
+            athena_async.run_query.assert_not_called()
+            self.assertEqual([{"count": [1]}, {"count": [2]}], list(pages))
+        athena_async.run_query.assert_called_once_with(query="SELECT something", database="some_db")
+        waiter.wait.assert_called_once_with("1234", 1200)
+        limiter.running.return_value.__exit__.assert_called_once()
+
+    def test_query_column_pages_failure(self) -> None:
+        waiter = Mock(wait=Mock(return_value={"Status": {"State": "FAILED", "StateChangeReason": "bad query"}}))
+        client = AwsAthenaClient(Mock(), waiter)
+        with patch.object(client, "_athena_async") as athena_async:
+            with self.assertRaisesRegex(exceptions.CreateTableException, "bad query"):
+                list(client.query_column_pages("some_db", "SELECT something", exceptions.CreateTableException))
+        athena_async.iter_query_columns.assert_not_called()
+
+
 class TestList(TestCase):
     def test_list_databases(self) -> None:
         dbs = ["db1", "db2", "db3"]
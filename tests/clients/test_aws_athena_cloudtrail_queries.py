@@ -30,10 +30,16 @@ CREATE_TABLE = (
     "STORED AS INPUTFORMAT 'com.amazon.emr.cloudtrail.CloudTrailInputFormat' "
     "OUTPUTFORMAT 'org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat' "
     "LOCATION 's3://cloudtrail-logs-bucket/AWSLogs/account_id/CloudTrail/' "
-    "TBLPROPERTIES ('classification'='cloudtrail')"
-)
-
-ADD_PARTITION_YEAR_MONTH = (
-    "ALTER TABLE `account_id` ADD PARTITION (region='eu', year='2020', month='11') LOCATION "
-    "'s3://cloudtrail-logs-bucket/AWSLogs/account_id/CloudTrail/eu/2020/11'"
+    "TBLPROPERTIES ("
+    "'classification'='cloudtrail',"
+    "'projection.enabled'='true',"
+    "'projection.region.type'='enum',"
+    "'projection.region.values'='us,eu',"
+    "'projection.year.type'='integer',"
+    "'projection.year.range'='2020,2020',"
+    "'projection.month.type'='integer',"
+    "'projection.month.range'='1,12',"
+    "'projection.month.digits'='2',"
+    "'storage.location.template'="
+    "'s3://cloudtrail-logs-bucket/AWSLogs/account_id/CloudTrail/${region}/${year}/${month}')"
 )
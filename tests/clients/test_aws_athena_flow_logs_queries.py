@@ -17,7 +17,14 @@ CREATE_TABLE_WITH_YEAR_MONTH_PARTITION = (
     "PARTITIONED BY (`year` string, `month` string) "
     "ROW FORMAT DELIMITED "
     "FIELDS TERMINATED BY ' ' "
-    "LOCATION 's3://the-flow-logs-bucket/'"
+    "LOCATION 's3://the-flow-logs-bucket/' "
+    "TBLPROPERTIES ("
+    "'projection.enabled'='true',"
+    "'projection.year.type'='enum',"
+    "'projection.year.values'='2020',"
+    "'projection.month.type'='enum',"
+    "'projection.month.values'='11',"
+    "'storage.location.template'='s3://the-flow-logs-bucket/${year}/${month}')"
 )
 
 CREATE_TABLE_WITH_YEAR_MONTH_DAY_PARTITION = (
@@ -39,17 +46,11 @@ CREATE_TABLE_WITH_YEAR_MONTH_DAY_PARTITION = (
     "PARTITIONED BY (`date` date) "
     "ROW FORMAT DELIMITED "
     "FIELDS TERMINATED BY ' ' "
-    "LOCATION 's3://the-flow-logs-bucket/'"
-)
-
-ADD_PARTITION_YEAR_MONTH = (
-    "ALTER TABLE `flow_logs_2020_09` "
-    "ADD PARTITION (year='2020', month='09') "
-    "LOCATION 's3://the-flow-logs-bucket/2020/09'"
-)
-
-ADD_PARTITION_YEAR_MONTH_DAY = (
-    "ALTER TABLE `flow_logs_2020_09_29` "
-    "ADD PARTITION (date='2020-09-29') "
-    "LOCATION 's3://the-flow-logs-bucket/2020/09/29'"
+    "LOCATION 's3://the-flow-logs-bucket/' "
+    "TBLPROPERTIES ("
+    "'projection.enabled'='true',"
+    "'projection.date.type'='date',"
+    "'projection.date.format'='yyyy/MM/dd',"
+    "'projection.date.range'='2020/10/30,2020/10/30',"
+    "'storage.location.template'='s3://the-flow-logs-bucket/${date}')"
 )
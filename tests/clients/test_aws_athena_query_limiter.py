@@ -0,0 +1,58 @@
+from unittest import TestCase
+from unittest.mock import Mock, call, patch
+
+from src.clients.aws_athena_query_limiter import AwsAthenaQueryLimiter
+
+LIMITER = "src.clients.aws_athena_query_limiter"
+
+
+class TestAwsAthenaQueryLimiter(TestCase):
+    def test_queries_start_immediately_within_burst(self) -> None:
+        with patch(f"{LIMITER}.monotonic", return_value=0), patch(f"{LIMITER}.sleep") as sleep:
+            limiter = AwsAthenaQueryLimiter(rate_per_second=2, burst=3, max_running=0)
+            for _ in range(3):
+                with limiter.running():
+                    pass
+        sleep.assert_not_called()
+
+    def test_queries_wait_for_tokens_beyond_burst(self) -> None:
+        with patch(f"{LIMITER}.monotonic", side_effect=[0, 0, 0, 0.5]), patch(f"{LIMITER}.sleep") as sleep:
+            limiter = AwsAthenaQueryLimiter(rate_per_second=2, burst=1, max_running=0)
+            limiter.acquire()
+            limiter.acquire()
+        sleep.assert_called_once_with(0.5)
+
+    def test_tokens_refill_up_to_burst(self) -> None:
+        with patch(f"{LIMITER}.monotonic", side_effect=[0, 0, 100]):
+            limiter = AwsAthenaQueryLimiter(rate_per_second=2, burst=2, max_running=0)
+            limiter.acquire()
+            limiter.acquire()
+        self.assertEqual(1, limiter._tokens)
+
+    def test_zero_rate_is_unlimited(self) -> None:
+        with patch(f"{LIMITER}.sleep") as sleep:
+            limiter = AwsAthenaQueryLimiter(rate_per_second=0, burst=0, max_running=0)
+            for _ in range(5):
+                limiter.acquire()
+        sleep.assert_not_called()
+
+    def test_running_queries_hold_a_slot_until_released(self) -> None:
+        limiter = AwsAthenaQueryLimiter(rate_per_second=0, burst=0, max_running=2)
+        running = limiter._running = Mock(wraps=limiter._running)
+        with limiter.running():
+            with self.assertRaises(ValueError):
+                with limiter.running():
+                    raise ValueError()
+        self.assertEqual([call.acquire(), call.acquire(), call.release(), call.release()], running.mock_calls)
+
+    def test_try_acquire_never_waits(self) -> None:
+        with patch(f"{LIMITER}.monotonic", return_value=0), patch(f"{LIMITER}.sleep") as sleep:
+            limiter = AwsAthenaQueryLimiter(rate_per_second=1, burst=2, max_running=1)
+            self.assertTrue(limiter.try_acquire())
+            self.assertFalse(limiter.try_acquire())
+            limiter.release()
+            self.assertTrue(limiter.try_acquire())
+            limiter.release()
+            self.assertFalse(limiter.try_acquire())
+        sleep.assert_not_called()
+        self.assertTrue(limiter._running and limiter._running.acquire(blocking=False))
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, repeat
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from typing import Any, Dict, List
+
+from botocore.exceptions import BotoCoreError
+
+from src.clients.aws_athena_query_waiter import AwsAthenaQueryWaiter, PendingQuery
+from src.clients.aws_deadline import deadline
+from src.data import aws_scanner_exceptions as exceptions
+
+
+def execution(query_id: str, state: str) -> Dict[str, Any]:
+    return {"QueryExecutionId": query_id, "Status": {"State": state}}
+
+
+def batch_response(states: Dict[str, str], unprocessed: List[str] = []) -> Dict[str, Any]:
+    return {
+        "QueryExecutions": [execution(query_id, state) for query_id, state in states.items()],
+        "UnprocessedQueryExecutionIds": [{"QueryExecutionId": query_id} for query_id in unprocessed],
+    }
+
+
+def succeed_all(QueryExecutionIds: List[str]) -> Dict[str, Any]:
+    return batch_response({query_id: "SUCCEEDED" for query_id in QueryExecutionIds})
+
+
+class TestAwsAthenaQueryWaiter(TestCase):
+    def test_wait_returns_final_execution(self) -> None:
+        boto_athena = Mock(
+            batch_get_query_execution=Mock(
+                side_effect=[batch_response({"q1": "RUNNING"}), batch_response({"q1": "FAILED"})]
+            )
+        )
+        waiter = AwsAthenaQueryWaiter(lambda: boto_athena)
+        self.assertEqual(execution("q1", "FAILED"), waiter.wait("q1", 60))
+        boto_athena.batch_get_query_execution.assert_called_with(QueryExecutionIds=["q1"])
+        self.assertEqual(2, waiter.polls)
+        self.assertEqual(({}, {}), (waiter._pending, waiter._completed))
+
+    def test_wait_sleeps_until_next_poll(self) -> None:
+        boto_athena = Mock(batch_get_query_execution=Mock(side_effect=succeed_all))
+        waiter = AwsAthenaQueryWaiter(lambda: boto_athena)
+        with patch("src.clients.aws_athena_query_waiter.monotonic", side_effect=chain([0, 0, 0.999], repeat(1))):
+            with patch(
+                "src.aws_scanner_config.AwsScannerConfig.athena_query_results_polling_delay_seconds", return_value=1
+            ):
+                self.assertEqual(execution("q1", "SUCCEEDED"), waiter.wait("q1", 60))
+        self.assertEqual(1, waiter.polls)
+
+    def test_only_one_thread_polls_at_a_time(self) -> None:
+        waiter = AwsAthenaQueryWaiter(Mock())
+        waiter._pending = {"q1": PendingQuery(0, 0)}
+        self.assertEqual(["q1"], waiter._claim_due(0))
+        self.assertEqual(([], []), (waiter._claim_due(0), waiter._poll_times()))
+
+    def test_unprocessed_queries_are_polled_again(self) -> None:
+        boto_athena = Mock(
+            batch_get_query_execution=Mock(
+                side_effect=[batch_response({}, unprocessed=["q1"]), batch_response({"q1": "SUCCEEDED"})]
+            )
+        )
+        self.assertEqual(execution("q1", "SUCCEEDED"), AwsAthenaQueryWaiter(lambda: boto_athena).wait("q1", 60))
+
+    def test_wait_times_out(self) -> None:
+        boto_athena = Mock()
+        with self.assertRaises(exceptions.TimeoutException) as ex:
+            AwsAthenaQueryWaiter(lambda: boto_athena).wait("9837-4857-3576", 0)
+        self.assertIn("9837-4857-3576", ex.exception.args[0])
+        boto_athena.batch_get_query_execution.assert_not_called()
+
+    def test_wait_stops_at_task_deadline(self) -> None:
+        boto_athena = Mock()
+        waiter = AwsAthenaQueryWaiter(lambda: boto_athena)
+        with deadline(0), self.assertRaises(exceptions.TaskDeadlineException):
+            waiter.wait("q1", 60)
+        self.assertEqual({}, waiter._pending)
+
+    def test_polling_failure(self) -> None:
+        boto_athena = Mock(batch_get_query_execution=Mock(side_effect=BotoCoreError))
+        waiter = AwsAthenaQueryWaiter(lambda: boto_athena)
+        with self.assertRaises(exceptions.UnknownQueryStateException) as ex:
+            waiter.wait("q1", 60)
+        self.assertIn("q1", ex.exception.args[0])
+        self.assertEqual(({}, False), (waiter._pending, waiter._polling))
+
+    def test_poll_checks_queries_in_batches(self) -> None:
+        boto_athena = Mock(batch_get_query_execution=Mock(side_effect=succeed_all))
+        waiter = AwsAthenaQueryWaiter(lambda: boto_athena)
+        query_ids = [f"q{i}" for i in range(120)]
+        waiter._pending = {query_id: PendingQuery(0, 0) for query_id in query_ids}
+        waiter._poll(query_ids)
+        batches = [c.kwargs["QueryExecutionIds"] for c in boto_athena.batch_get_query_execution.call_args_list]
+        self.assertEqual([50, 50, 20], [len(batch) for batch in batches])
+        self.assertEqual(set(query_ids), set(waiter._completed))
+        self.assertEqual(1, waiter.polls)
+
+    def test_incomplete_queries_back_off(self) -> None:
+        waiter = AwsAthenaQueryWaiter(Mock())
+        waiter._pending = {"q1": PendingQuery(1, 0)}
+        poll_times = []
+        with patch("src.clients.aws_athena_query_waiter.monotonic", side_effect=[10, 20, 30, 40]):
+            with patch(
+                "src.aws_scanner_config.AwsScannerConfig.athena_query_results_polling_max_delay_seconds",
+                return_value=3,
+            ):
+                for _ in range(4):
+                    waiter._record(["q1", "gone"], {"q1": execution("q1", "QUEUED")})
+                    poll_times.append(waiter._pending["q1"].poll_at)
+        self.assertEqual([11, 22, 33, 43], poll_times)
+        self.assertEqual({}, waiter._completed)
+
+    def test_concurrent_waits_share_polls(self) -> None:
+        boto_athena = Mock(batch_get_query_execution=Mock(side_effect=succeed_all))
+        waiter = AwsAthenaQueryWaiter(lambda: boto_athena)
+        query_ids = [f"q{i}" for i in range(40)]
+        with patch("src.clients.aws_athena_query_waiter.monotonic", return_value=0), ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda query_id: waiter.wait(query_id, 60), query_ids))
+        self.assertEqual([execution(query_id, "SUCCEEDED") for query_id in query_ids], results)
+        self.assertLessEqual(waiter.polls, len(query_ids))
+        self.assertEqual(({}, {}), (waiter._pending, waiter._completed))
@@ -0,0 +1,73 @@
+from typing import Any, Dict
+from unittest import TestCase
+
+from src.clients.aws_athena_result_set import decode_columns, extend_columns, iter_records, to_records
+
+RESULT_SET: Dict[str, Any] = {
+    "ResultSetMetadata": {
+        "ColumnInfo": [
+            {"Name": "name", "Type": "varchar"},
+            {"Name": "count", "Type": "bigint"},
+            {"Name": "ratio", "Type": "double"},
+            {"Name": "enabled", "Type": "boolean"},
+            {"Name": "day", "Type": "date"},
+        ]
+    },
+    "Rows": [
+        {
+            "Data": [
+                {"VarCharValue": "name"},
+                {"VarCharValue": "count"},
+                {"VarCharValue": "ratio"},
+                {"VarCharValue": "enabled"},
+                {"VarCharValue": "day"},
+            ]
+        },
+        {
+            "Data": [
+                {"VarCharValue": "a"},
+                {"VarCharValue": "42"},
+                {"VarCharValue": "0.5"},
+                {"VarCharValue": "true"},
+                {"VarCharValue": "2021-09-01"},
+            ]
+        },
+        {"Data": [{}, {"VarCharValue": "7"}, {}, {"VarCharValue": "false"}, {}]},
+    ],
+}
+
+
+class TestAwsAthenaResultSet(TestCase):
+    def test_decode_columns(self) -> None:
+        self.assertEqual(
+            {
+                "name": ["a", None],
+                "count": [42, 7],
+                "ratio": [0.5, None],
+                "enabled": [True, False],
+                "day": ["2021-09-01", None],
+            },
+            decode_columns(RESULT_SET, skip_rows=1),
+        )
+
+    def test_decode_columns_without_rows(self) -> None:
+        self.assertEqual(
+            {"name": [], "count": [], "ratio": [], "enabled": [], "day": []},
+            decode_columns({**RESULT_SET, "Rows": RESULT_SET["Rows"][:1]}, skip_rows=1),
+        )
+
+    def test_extend_columns(self) -> None:
+        columns = extend_columns({}, {"name": ["a"], "count": [1]})
+        self.assertEqual({"name": ["a", "b"], "count": [1, 2]}, extend_columns(columns, {"name": ["b"], "count": [2]}))
+
+    def test_to_records(self) -> None:
+        self.assertEqual(
+            [{"name": "a", "count": 1}, {"name": "b", "count": 2}],
+            to_records({"name": ["a", "b"], "count": [1, 2]}),
+        )
+
+    def test_iter_records(self) -> None:
+        self.assertEqual(
+            [{"name": "a", "count": 1}, {"name": "b", "count": 2}],
+            list(iter_records([{"name": ["a"], "count": [1]}, {"name": ["b"], "count": [2]}])),
+        )
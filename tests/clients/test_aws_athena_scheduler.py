@@ -0,0 +1,329 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import replace
+from threading import Event
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from botocore.exceptions import BotoCoreError
+
+from src.clients.aws_athena_catalog import AwsAthenaCatalog
+from src.clients.aws_athena_query_limiter import AwsAthenaQueryLimiter
+from src.clients.aws_athena_scheduler import (
+    AwsAthenaJob,
+    AwsAthenaScheduler,
+    create_database_statement,
+    drop_database_statement,
+    drop_table_statement,
+)
+from src.data import aws_scanner_exceptions as exceptions
+from src.data.aws_athena_pipeline import AwsAthenaPipeline, AwsAthenaResource, AwsAthenaStatement
+from src.data.aws_task_report import AwsTaskReport
+
+from tests.test_types_generator import client_error, task_report
+
+SCHEDULER = "src.clients.aws_athena_scheduler"
+
+
+def resource(name: str) -> AwsAthenaResource:
+    return AwsAthenaResource(
+        AwsAthenaStatement(f"create {name}", raise_on_failure=exceptions.CreateDatabaseException),
+        (AwsAthenaStatement(f"drop {name}", raise_on_failure=exceptions.DropDatabaseException),),
+    )
+
+
+def pipeline(name: str, report: Optional[Any] = None, shared: str = "") -> AwsAthenaPipeline:
+    return AwsAthenaPipeline(
+        resources=[resource(shared or name)],
+        query=AwsAthenaStatement(f"select {name}", name),
+        report=report or (lambda columns: task_report(description=name, results=columns)),
+        incomplete=lambda ex: task_report(description=name, results={}, incomplete=True),
+    )
+
+
+class FakeAthena:
+    def __init__(self, failing: Sequence[str] = (), running: Sequence[str] = ()) -> None:
+        self.queries: List[str] = []
+        self._failing = failing
+        self._running = running
+
+    def start_query_execution(self, QueryString: str, **_: Any) -> Dict[str, Any]:
+        self.queries.append(QueryString)
+        return {"QueryExecutionId": QueryString}
+
+    def batch_get_query_execution(self, QueryExecutionIds: List[str]) -> Dict[str, Any]:
+        return {"QueryExecutions": [self._execution(query_id) for query_id in QueryExecutionIds]}
+
+    def get_query_results(self, QueryExecutionId: str) -> Dict[str, Any]:
+        return {
+            "ResultSet": {
+                "ResultSetMetadata": {"ColumnInfo": [{"Name": "query", "Type": "varchar"}]},
+                "Rows": [{"Data": [{"VarCharValue": "query"}]}, {"Data": [{"VarCharValue": QueryExecutionId}]}],
+            }
+        }
+
+    def _execution(self, query_id: str) -> Dict[str, Any]:
+        if query_id in self._running:
+            return {"QueryExecutionId": query_id, "Status": {"State": "RUNNING"}}
+        if query_id in self._failing:
+            return {"QueryExecutionId": query_id, "Status": {"State": "FAILED", "StateChangeReason": "boom"}}
+        return {"QueryExecutionId": query_id, "Status": {"State": "SUCCEEDED"}}
+
+
+def unlimited() -> AwsAthenaQueryLimiter:
+    return AwsAthenaQueryLimiter(rate_per_second=0, burst=0, max_running=0)
+
+
+def schedule(athena: Any, *pipelines: AwsAthenaPipeline, **kwargs: Any) -> List[Future[AwsTaskReport]]:
+    limiter = kwargs.pop("limiter", unlimited())
+    with AwsAthenaScheduler(lambda: athena, limiter) as scheduler:
+        futures = [scheduler.submit(p, **kwargs) for p in pipelines]
+        wait(futures)
+    return futures
+
+
+class TestStatements(TestCase):
+    def test_database_statements(self) -> None:
+        self.assertEqual(
+            AwsAthenaStatement("CREATE DATABASE `some_db`", "", exceptions.CreateDatabaseException),
+            create_database_statement("some_db"),
+        )
+        self.assertEqual(
+            AwsAthenaStatement("DROP DATABASE `some_db`", "", exceptions.DropDatabaseException),
+            drop_database_statement("some_db"),
+        )
+        self.assertEqual(
+            AwsAthenaStatement("DROP TABLE `some_table`", "some_db", exceptions.DropTableException),
+            drop_table_statement("some_db", "some_table"),
+        )
+
+
+class TestAwsAthenaScheduler(TestCase):
+    def test_pipelines_run_setup_query_and_teardown(self) -> None:
+        athena = FakeAthena()
+        futures = schedule(athena, pipeline("a"), pipeline("b"))
+        self.assertEqual(task_report(description="a", results={"query": ["select a"]}), futures[0].result())
+        self.assertEqual(task_report(description="b", results={"query": ["select b"]}), futures[1].result())
+        self.assertEqual(["create a", "select a", "drop a"], [q for q in athena.queries if q.endswith("a")])
+        self.assertEqual(["create b", "select b", "drop b"], [q for q in athena.queries if q.endswith("b")])
+
+    def test_accounts_progress_together(self) -> None:
+        athena = FakeAthena()
+        scheduler = AwsAthenaScheduler(lambda: athena, unlimited())
+        futures = [scheduler.submit(pipeline("a")), scheduler.submit(pipeline("b"))]
+        with scheduler:
+            wait(futures)
+        self.assertEqual(["create a", "create b", "select a", "select b", "drop a", "drop b"], athena.queries)
+
+    def test_queries_wait_for_capacity(self) -> None:
+        athena = FakeAthena()
+        limiter = AwsAthenaQueryLimiter(rate_per_second=0, burst=0, max_running=1)
+        futures = schedule(athena, pipeline("a"), pipeline("b"), limiter=limiter)
+        self.assertTrue(all(future.result() for future in futures))
+        self.assertEqual(6, len(athena.queries))
+        self.assertTrue(limiter.try_acquire())
+
+    def test_failed_query_is_torn_down(self) -> None:
+        athena = FakeAthena(failing=["select a"])
+        with self.assertRaisesRegex(exceptions.RunQueryException, "boom"):
+            schedule(athena, pipeline("a"))[0].result()
+        self.assertEqual(["create a", "select a", "drop a"], athena.queries)
+
+    def test_failed_setup_is_not_torn_down(self) -> None:
+        athena = FakeAthena(failing=["create a"])
+        with self.assertRaises(exceptions.CreateDatabaseException):
+            schedule(athena, pipeline("a"))[0].result()
+        self.assertEqual(["create a"], athena.queries)
+
+    def test_failed_teardown(self) -> None:
+        athena = FakeAthena(failing=["drop a"])
+        with self.assertRaises(exceptions.DropDatabaseException):
+            schedule(athena, pipeline("a"))[0].result()
+
+    def test_failed_report_is_torn_down(self) -> None:
+        athena = FakeAthena()
+        with self.assertRaises(ValueError):
+            schedule(athena, pipeline("a", report=Mock(side_effect=ValueError)))[0].result()
+        self.assertEqual(["create a", "select a", "drop a"], athena.queries)
+
+    def test_results_are_fetched_off_the_poller(self) -> None:
+        athena, fetched = FakeAthena(), Event()
+        fetch = athena.get_query_results
+        athena.get_query_results = lambda QueryExecutionId: (  # type: ignore
+            QueryExecutionId != "select a" or fetched.wait(5)
+        ) and fetch(QueryExecutionId)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with AwsAthenaScheduler(lambda: athena, unlimited(), executor) as scheduler:
+                slow, other = scheduler.submit(pipeline("a")), scheduler.submit(pipeline("b"))
+                self.assertEqual(task_report(description="b", results={"query": ["select b"]}), other.result(5))
+                self.assertFalse(slow.done())
+                fetched.set()
+                self.assertEqual(task_report(description="a", results={"query": ["select a"]}), slow.result())
+
+    def test_fetched_results_of_aborted_jobs_are_dropped(self) -> None:
+        scheduler = AwsAthenaScheduler(lambda: FakeAthena(), unlimited())
+        fetch: Future[Dict[str, List[Any]]] = Future()
+        fetch.set_result({})
+        scheduler._fetched_results("select a", fetch)
+        self.assertEqual(0, len(scheduler._fetched))
+
+    def test_query_that_cannot_start(self) -> None:
+        athena = Mock(start_query_execution=Mock(side_effect=client_error("StartQueryExecution", "Throttling", "no")))
+        with self.assertRaises(exceptions.CreateDatabaseException):
+            schedule(athena, pipeline("a"))[0].result()
+
+    def test_results_that_cannot_be_fetched(self) -> None:
+        athena = FakeAthena()
+        athena.get_query_results = Mock(side_effect=BotoCoreError)  # type: ignore
+        with self.assertRaises(exceptions.GetQueryResultsException):
+            schedule(athena, pipeline("a"))[0].result()
+        self.assertEqual(["create a", "select a", "drop a"], athena.queries)
+
+    def test_query_states_that_cannot_be_polled(self) -> None:
+        athena = FakeAthena()
+        athena.batch_get_query_execution = Mock(side_effect=BotoCoreError)  # type: ignore
+        with self.assertRaises(exceptions.UnknownQueryStateException):
+            schedule(athena, pipeline("a"))[0].result()
+
+    def test_query_timeout(self) -> None:
+        athena = FakeAthena(running=["select a"])
+        with patch("src.aws_scanner_config.AwsScannerConfig.athena_query_timeout_seconds", return_value=0):
+            with self.assertRaises(exceptions.TimeoutException):
+                schedule(athena, pipeline("a"))[0].result()
+        self.assertEqual(["create a", "select a", "drop a"], athena.queries)
+
+    def test_running_queries_back_off(self) -> None:
+        scheduler = AwsAthenaScheduler(lambda: FakeAthena(running=["select a"]), unlimited())
+        config = "src.aws_scanner_config.AwsScannerConfig"
+        poll_times = []
+        with patch(f"{config}.athena_query_results_polling_delay_seconds", return_value=1), patch(
+            f"{config}.athena_query_results_polling_max_delay_seconds", return_value=3
+        ):
+            with patch(f"{SCHEDULER}.monotonic", return_value=0):
+                scheduler._start_query(AwsAthenaJob(pipeline("a"), None), AwsAthenaStatement("select a", "a"))
+            for now in [0, 1, 2, 3, 5, 8]:
+                with patch(f"{SCHEDULER}.monotonic", return_value=now):
+                    scheduler._check_queries()
+                    poll_times.append(min(scheduler._poll_times()))
+        self.assertEqual([1, 2, 4, 4, 8, 11], poll_times)
+
+    def test_past_deadline_pipelines_are_incomplete(self) -> None:
+        athena = FakeAthena()
+        futures = schedule(athena, pipeline("a"), deadline_at=0)
+        self.assertEqual(task_report(description="a", results={}, incomplete=True), futures[0].result())
+        self.assertEqual([], athena.queries)
+
+    def test_unexpected_errors_fail_all_pipelines(self) -> None:
+        athena = Mock(start_query_execution=Mock(side_effect=RuntimeError("unexpected")))
+        with self.assertLogs("AwsAthenaScheduler", level="ERROR"):
+            with AwsAthenaScheduler(lambda: athena, unlimited()) as scheduler:
+                futures = [scheduler.submit(pipeline("a")), scheduler.submit(pipeline("b"))]
+                wait(futures)
+                futures.append(scheduler.submit(pipeline("c")))
+        for future in futures:
+            self.assertRaisesRegex(RuntimeError, "unexpected", future.result)
+
+
+class TestSharedResources(TestCase):
+    def test_shared_resources_are_created_once_and_kept(self) -> None:
+        athena = FakeAthena()
+        catalog = AwsAthenaCatalog()
+        futures = schedule(athena, pipeline("a", shared="db"), pipeline("b", shared="db"), catalog=catalog)
+        self.assertTrue(all(future.result() for future in futures))
+        self.assertEqual(["create db", "select a", "select b"], sorted(athena.queries))
+        self.assertEqual(list(resource("db").drop), catalog.drop_statements())
+
+    def test_resources_created_by_others_are_awaited(self) -> None:
+        athena = FakeAthena()
+        catalog = AwsAthenaCatalog()
+        catalog.claim(resource("db"))
+        with AwsAthenaScheduler(lambda: athena, unlimited()) as scheduler:
+            future = scheduler.submit(pipeline("a", shared="db"), catalog=catalog)
+            catalog.created(resource("db"))
+            self.assertEqual(task_report(description="a", results={"query": ["select a"]}), future.result())
+        self.assertEqual(["select a"], athena.queries)
+
+    def test_failed_shared_resources_fail_waiting_pipelines(self) -> None:
+        catalog = AwsAthenaCatalog()
+        catalog.claim(resource("db"))
+        job = AwsAthenaJob(pipeline("a", shared="db"), deadline_at=None, catalog=catalog)
+        self.assertIsNone(job.next_statement())
+        catalog.failed(resource("db"), exceptions.CreateDatabaseException("boom"))
+        self.assertIsNone(job.next_statement())
+        self.assertTrue(job.done)
+        job.resolve()
+        self.assertRaisesRegex(exceptions.CreateDatabaseException, "boom", job.future.result)
+
+    def test_released_resources_are_claimed_again(self) -> None:
+        athena = FakeAthena()
+        catalog = AwsAthenaCatalog()
+        catalog.claim(resource("db"))
+        with AwsAthenaScheduler(lambda: athena, unlimited()) as scheduler:
+            future = scheduler.submit(pipeline("a", shared="db"), catalog=catalog)
+            catalog.release(resource("db"))
+            self.assertTrue(future.result())
+        self.assertEqual(["create db", "select a"], athena.queries)
+
+    def test_identical_queries_run_once(self) -> None:
+        athena = FakeAthena()
+        catalog = AwsAthenaCatalog()
+        same_query = replace(pipeline("b", shared="db"), query=AwsAthenaStatement("select a", "a"))
+        futures = schedule(athena, pipeline("a", shared="db"), same_query, catalog=catalog)
+        self.assertEqual(task_report(description="a", results={"query": ["select a"]}), futures[0].result())
+        self.assertEqual(task_report(description="b", results={"query": ["select a"]}), futures[1].result())
+        self.assertEqual(["create db", "select a"], athena.queries)
+
+    def test_failed_shared_queries_fail_waiting_pipelines(self) -> None:
+        catalog = AwsAthenaCatalog()
+        owner = AwsAthenaJob(pipeline("a", shared="db"), deadline_at=None, catalog=catalog)
+        waiter = AwsAthenaJob(pipeline("a", shared="db"), deadline_at=None, catalog=catalog)
+        self.assertEqual("create db", owner.next_statement().query)  # type: ignore
+        owner.succeeded({})
+        self.assertEqual("select a", owner.next_statement().query)  # type: ignore
+        self.assertIsNone(waiter.next_statement())
+        owner.failed(exceptions.RunQueryException("boom"))
+        self.assertIsNone(waiter.next_statement())
+        waiter.resolve()
+        self.assertRaisesRegex(exceptions.RunQueryException, "boom", waiter.future.result)
+
+
+class TestAwsAthenaJob(TestCase):
+    def test_deadline_after_setup_tears_down(self) -> None:
+        job = AwsAthenaJob(pipeline("a"), deadline_at=10)
+        with patch(f"{SCHEDULER}.monotonic", side_effect=[0, 10, 10]):
+            self.assertEqual("create a", job.next_statement().query)  # type: ignore
+            job.succeeded({})
+            self.assertEqual("drop a", job.next_statement().query)  # type: ignore
+            job.succeeded({})
+            self.assertIsNone(job.next_statement())
+        job.resolve()
+        self.assertTrue(job.future.result().incomplete)
+
+    def test_deadline_before_creation_releases_the_claim(self) -> None:
+        catalog = AwsAthenaCatalog()
+        job = AwsAthenaJob(pipeline("a"), deadline_at=10, catalog=catalog)
+        with patch(f"{SCHEDULER}.monotonic", side_effect=[0, 10]):
+            self.assertEqual("create a", job.next_statement().query)  # type: ignore
+            self.assertIsNone(job.next_statement())
+        self.assertTrue(job.done)
+        self.assertTrue(catalog.claim(resource("a"))[1])
+
+    def test_aborted_jobs_release_their_claims(self) -> None:
+        catalog = AwsAthenaCatalog()
+        job = AwsAthenaJob(pipeline("a"), deadline_at=None, catalog=catalog)
+        job.next_statement()
+        job.abort(RuntimeError("unexpected"))
+        self.assertRaises(RuntimeError, job.future.result)
+        self.assertTrue(catalog.claim(resource("a"))[1])
+
+    def test_first_error_is_reported(self) -> None:
+        job = AwsAthenaJob(pipeline("a"), deadline_at=None)
+        job.next_statement()
+        job.succeeded({})
+        job.next_statement()
+        job.failed(exceptions.RunQueryException("query"))
+        job.failed(exceptions.DropDatabaseException("teardown"))
+        self.assertTrue(job.done)
+        job.resolve()
+        self.assertRaisesRegex(exceptions.RunQueryException, "query", job.future.result)
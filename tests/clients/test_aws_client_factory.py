@@ -1,18 +1,26 @@
+import gc
+import pickle
 from unittest import TestCase
-from typing import Any, Dict, Optional, Callable
+from typing import Any, Callable, Dict, List, Optional
 from unittest.mock import Mock, patch
 
 from botocore.exceptions import NoCredentialsError
 
-from src.clients.aws_client_factory import AwsClientFactory, AwsCredentials
+from src.clients.aws_client_factory import AwsClientFactory
+from src.clients.aws_deadline import check_deadline
 from src.clients.aws_iam_audit_client import AwsIamAuditClient
 from src.data import SERVICE_ACCOUNT_TOKEN, SERVICE_ACCOUNT_USER
+from src.data.aws_common_types import AwsCredentials
 from src.data.aws_organizations_types import Account
 from src.data.aws_scanner_exceptions import ClientFactoryException
 
 from tests.test_types_generator import account
 
 
+def materialise(*clients: Any) -> List[Any]:
+    return [client.materialise() for client in clients]
+
+
 class TestGetBotoClients(TestCase):
     mfa, username = "123456", "joe.bloggs"
 
@@ -168,8 +176,16 @@ class TestGetClients(TestCase):
 
     def test_get_athena_client(self, _: Mock) -> None:
         with patch(f"{self.factory_path}.get_athena_boto_client") as boto_client:
-            athena_client = AwsClientFactory(self.mfa, self.username).get_athena_client()
+            factory = AwsClientFactory(self.mfa, self.username)
+            athena_client = factory.get_athena_client()
             self.assertEqual(athena_client._athena_async._boto_athena, boto_client.return_value)
+            self.assertIs(factory.get_athena_client()._waiter, athena_client._waiter)
+            self.assertIs(factory.get_athena_client()._limiter, athena_client._limiter)
+            executor = Mock()
+            scheduler = factory.get_athena_scheduler(executor)
+            self.assertIs(athena_client._limiter, scheduler._limiter)
+            self.assertIs(executor, scheduler._executor)
+            self.assertEqual(boto_client.return_value, scheduler._athena())
 
     def test_get_cost_explorer_client(self, _: Mock) -> None:
         cost_explorer_boto_client = Mock()
@@ -245,7 +261,7 @@ class TestGetClients(TestCase):
             ):
                 logs_client = AwsClientFactory(self.mfa, self.username).get_logs_client(account(), None)
                 self.assertEqual(logs_client._logs, logs_boto_client)
-                self.assertEqual(logs_client.kms, kms_boto_client)
+                self.assertEqual([kms_boto_client], materialise(logs_client.kms))
 
     def test_get_log_group_client(self, _: Mock) -> None:
         logs_boto_client = Mock()
@@ -307,7 +323,7 @@ class TestGetClients(TestCase):
                 cloudtrail_client = AwsClientFactory(self.mfa, self.username).get_cloudtrail_client(account())
 
                 self.assertEqual(cloudtrail_client._cloudtrail, cloudtrail_boto_client)
-                self.assertEqual(cloudtrail_client._logs, logs_client)
+                self.assertEqual([logs_client], materialise(cloudtrail_client._logs))
 
     def test_get_central_logging_client(self, _: Mock) -> None:
         cloudtrail_acc = account("111344576685", "cloudtrail")
@@ -324,9 +340,9 @@ class TestGetClients(TestCase):
             ):
                 with patch(f"{self.factory_path}.get_organizations_client", return_value=org_client):
                     central_logging_client = AwsClientFactory(self.mfa, self.username).get_central_logging_client()
-                    self.assertEqual(central_logging_client._s3, s3_client)
-                    self.assertEqual(central_logging_client._kms, kms_client)
-                    self.assertEqual(central_logging_client._org, org_client)
+                    self.assertEqual([s3_client], materialise(central_logging_client._s3))
+                    self.assertEqual([kms_client], materialise(central_logging_client._kms))
+                    self.assertEqual([org_client], materialise(central_logging_client._org))
 
     def test_get_s3_kms_client(self, _: Mock) -> None:
         s3_client = Mock()
@@ -340,8 +356,8 @@ class TestGetClients(TestCase):
                 side_effect=lambda acc: kms_client if acc == account() else None,
             ):
                 s3_kms_client = AwsClientFactory(self.mfa, self.username).get_s3_kms_client(account())
-                self.assertEqual(s3_kms_client._s3, s3_client)
-                self.assertEqual(s3_kms_client._kms, kms_client)
+                self.assertEqual([s3_client], materialise(s3_kms_client._s3))
+                self.assertEqual([kms_client], materialise(s3_kms_client._kms))
 
 
 @patch.object(AwsClientFactory, "_get_session_token")
@@ -381,9 +397,16 @@ class TestGetCompositeClients(TestCase):
                             AwsClientFactory, "get_route53resolver_client", side_effect=self.mock_client(resolver, acc)
                         ):
                             vpc_client = AwsClientFactory("123456", "joe.bloggs").get_vpc_client(acc)
-        self.assertEqual(
-            [ec2, iam, logs, log_group], [vpc_client.ec2, vpc_client.iam, vpc_client.logs, vpc_client.log_group]
-        )
+                            self.assertEqual(
+                                [ec2, iam, logs, log_group, resolver],
+                                materialise(
+                                    vpc_client.ec2,
+                                    vpc_client.iam,
+                                    vpc_client.logs,
+                                    vpc_client.log_group,
+                                    vpc_client.resolver,
+                                ),
+                            )
 
     def test_get_route53_client(self, _: Mock) -> None:
         acc = account(identifier="1234", name="some_account")
@@ -402,10 +425,10 @@ class TestGetCompositeClients(TestCase):
             ):
                 with patch.object(AwsClientFactory, "get_iam_client", side_effect=self.mock_client(iam, acc)):
                     route53_client = AwsClientFactory("123456", "joe.bloggs").get_route53_client(acc)
-        self.assertEqual(
-            [boto_route53, iam, log_group],
-            [route53_client._route53, route53_client._iam, route53_client.log_group],
-        )
+                    self.assertEqual(
+                        [boto_route53, iam, log_group],
+                        materialise(route53_client._route53, route53_client._iam, route53_client.log_group),
+                    )
 
     def test_get_vpc_peering_client(self, _: Mock) -> None:
         acc = account(identifier="1234", name="some_account")
@@ -413,12 +436,54 @@ class TestGetCompositeClients(TestCase):
         with patch.object(AwsClientFactory, "get_ec2_client", side_effect=self.mock_client_role(ec2, acc, "pcx_role")):
             with patch.object(AwsClientFactory, "get_organizations_client", return_value=org):
                 client = AwsClientFactory("123456", "joe.bloggs").get_vpc_peering_client(acc)
-        self.assertEqual([ec2, org], [client.ec2, client.org])
+                self.assertEqual([ec2, org], materialise(client.ec2, client.org))
+
+    def test_composite_sub_clients_are_only_built_on_first_use(self, _: Mock) -> None:
+        acc = account(identifier="1234", name="some_account")
+        ec2 = Mock(name="ec2", list_vpcs=Mock(return_value=[]))
+        with patch.object(AwsClientFactory, "get_ec2_client", return_value=ec2) as get_ec2_client:
+            with patch.object(AwsClientFactory, "get_route53resolver_client") as get_resolver_client:
+                factory = AwsClientFactory("123456", "joe.bloggs")
+                vpc_client = factory.get_vpc_client(acc)
+                get_ec2_client.assert_not_called()
+                self.assertEqual([], vpc_client.list_vpcs())
+        get_ec2_client.assert_called_once_with(acc)
+        get_resolver_client.assert_not_called()
+        self.assertEqual(
+            {
+                "iam client for some_account (1234)": 1,
+                "log group client for some_account (1234)": 1,
+                "logs client for some_account (1234)": 1,
+                "resolver client for some_account (1234)": 1,
+            },
+            factory.unused_clients(),
+        )
+        factory.forget_lazy_clients()
+        self.assertEqual({}, factory.unused_clients())
+
+    def test_unused_clients_are_counted_once_released(self, _: Mock) -> None:
+        acc = account(identifier="1234", name="some_account")
+        with patch.object(AwsClientFactory, "get_ec2_client"), patch.object(
+            AwsClientFactory, "get_organizations_client"
+        ):
+            factory = AwsClientFactory("123456", "joe.bloggs")
+            for _task in range(3):
+                client = factory.get_vpc_peering_client(acc)
+                materialise(client.ec2)
+                del client
+        gc.collect()
+        self.assertEqual({"organizations client for organization (999888777666)": 3}, factory.unused_clients())
+        self.assertEqual(0, len(factory._lazy_clients))
+
+
+def mock_boto_session(client: Mock) -> Mock:
+    return Mock(session=Mock(Session=Mock(return_value=Mock(client=Mock(return_value=client)))))
 
 
 class TestAwsClientFactory(TestCase):
     mfa, username = "123456", "joe.bloggs"
     service_name, role = "some_service", "some_role"
+    boto_config = "src.clients.aws_client_factory.BotoConfig"
 
     def test_get_session_token_user_account(self) -> None:
         boto_credentials = {
@@ -429,7 +494,7 @@ class TestAwsClientFactory(TestCase):
             }
         }
         mock_sts_client = Mock(get_session_token=Mock(return_value=boto_credentials))
-        mock_boto3 = Mock(client=Mock(return_value=mock_sts_client))
+        mock_boto3 = mock_boto_session(mock_sts_client)
 
         with patch("src.clients.aws_client_factory.boto3", mock_boto3):
             client_factory = AwsClientFactory(self.mfa, self.username)
@@ -437,7 +502,14 @@ class TestAwsClientFactory(TestCase):
             client_factory._session_token,
             AwsCredentials("some_access_key", "some_secret_access_key", "some_session_token"),
         )
-        mock_boto3.client.assert_called_once_with(service_name="sts")
+        mock_boto3.session.Session.return_value.client.assert_called_once_with(
+            service_name="sts",
+            aws_access_key_id=None,
+            aws_secret_access_key=None,
+            aws_session_token=None,
+            region_name=None,
+            config=client_factory._boto_config,
+        )
         mock_sts_client.get_session_token.assert_called_once_with(
             DurationSeconds=3600, SerialNumber="arn:aws:iam::111222333444:mfa/joe.bloggs", TokenCode="123456"
         )
@@ -445,49 +517,96 @@ class TestAwsClientFactory(TestCase):
     def test_get_session_token_service_account(self) -> None:
         with patch("src.clients.aws_client_factory.boto3") as mock_boto3:
             self.assertIsNone(AwsClientFactory(SERVICE_ACCOUNT_TOKEN, SERVICE_ACCOUNT_USER)._session_token)
-        mock_boto3.client.assert_not_called()
+        mock_boto3.session.Session.return_value.client.assert_not_called()
+
+    def test_client_pool_size_follows_tasks_and_sub_task_executors(self) -> None:
+        with patch("src.clients.aws_client_factory.AwsClientFactory._get_session_token"):
+            with patch(self.boto_config) as boto_config:
+                AwsClientFactory(self.mfa, self.username)
+        boto_config.assert_called_once_with(max_pool_connections=14)
 
     def test_get_client(self) -> None:
         mock_client = Mock()
-        mock_boto = Mock(client=Mock(return_value=mock_client))
+        mock_boto = mock_boto_session(mock_client)
         mock_assume_role = Mock(return_value=AwsCredentials("access", "secret", "session"))
 
         with patch("src.clients.aws_client_factory.AwsClientFactory._get_session_token"):
             with patch("src.clients.aws_client_factory.AwsClientFactory._assume_role", mock_assume_role):
                 with patch("src.clients.aws_client_factory.boto3", mock_boto):
-                    client = AwsClientFactory(self.mfa, self.username)._get_client(
-                        self.service_name, account(), self.role
-                    )
+                    factory = AwsClientFactory(self.mfa, self.username)
+                    client = factory._get_client(self.service_name, account(), self.role)
         self.assertEqual(mock_client, client)
         mock_assume_role.assert_called_once_with(account(), self.role)
-        mock_boto.client.assert_called_once_with(
+        mock_boto.session.Session.return_value.client.assert_called_once_with(
             service_name="some_service",
             aws_access_key_id="access",
             aws_secret_access_key="secret",
             aws_session_token="session",
+            region_name=None,
+            config=factory._boto_config,
         )
 
     def test_get_client_with_region(self) -> None:
         mock_client = Mock()
-        mock_boto = Mock(client=Mock(return_value=mock_client))
+        mock_boto = mock_boto_session(mock_client)
         mock_assume_role = Mock(return_value=AwsCredentials("access", "secret", "session"))
 
         with patch("src.clients.aws_client_factory.AwsClientFactory._get_session_token"):
             with patch("src.clients.aws_client_factory.AwsClientFactory._assume_role", mock_assume_role):
                 with patch("src.clients.aws_client_factory.boto3", mock_boto):
-                    client = AwsClientFactory(self.mfa, self.username)._get_client(
-                        self.service_name, account(), self.role, "us-east-1"
-                    )
+                    factory = AwsClientFactory(self.mfa, self.username)
+                    client = factory._get_client(self.service_name, account(), self.role, "us-east-1")
         self.assertEqual(mock_client, client)
         mock_assume_role.assert_called_once_with(account(), self.role)
-        mock_boto.client.assert_called_once_with(
+        mock_boto.session.Session.return_value.client.assert_called_once_with(
             service_name="some_service",
             aws_access_key_id="access",
             aws_secret_access_key="secret",
             aws_session_token="session",
             region_name="us-east-1",
+            config=factory._boto_config,
         )
 
+    def test_pooled_clients_are_registered_with_service_limiter(self) -> None:
+        mock_client = Mock()
+        with patch("src.clients.aws_client_factory.AwsClientFactory._get_session_token"):
+            with patch("src.clients.aws_client_factory.AwsClientFactory._assume_role"):
+                with patch("src.clients.aws_client_factory.boto3", mock_boto_session(mock_client)):
+                    with patch("src.clients.aws_client_factory.AwsServiceLimiter") as limiter:
+                        factory = AwsClientFactory(self.mfa, self.username)
+                        factory._get_client("iam", account(), self.role)
+                        factory._get_client("iam", account(), self.role)
+        limiter.assert_called_once_with({"organizations": 1, "iam": 4})
+        limiter.return_value.register.assert_called_once_with("iam", mock_client)
+        mock_client.meta.events.register_first.assert_called_once_with("before-call.*.*", check_deadline)
+
+    def test_get_client_is_pooled_per_service_account_role_and_region(self) -> None:
+        creds = AwsCredentials("access", "secret", "session")
+        mock_boto = Mock(session=Mock(Session=Mock(return_value=Mock(client=Mock(side_effect=lambda **_: Mock())))))
+
+        with patch("src.clients.aws_client_factory.AwsClientFactory._get_session_token"):
+            with patch("src.clients.aws_client_factory.AwsClientFactory._assume_role", return_value=creds):
+                with patch("src.clients.aws_client_factory.boto3", mock_boto):
+                    factory = AwsClientFactory(self.mfa, self.username)
+                    client = factory._get_client("s3", account(), self.role)
+                    self.assertIs(client, factory._get_client("s3", account(), self.role))
+                    self.assertIsNot(client, factory._get_client("s3", account(), self.role, "us-east-1"))
+                    self.assertIsNot(client, factory._get_client("s3", account("other"), self.role))
+                    self.assertIsNot(client, factory._get_client("s3", account(), "other_role"))
+                    self.assertIsNot(client, factory._get_client("ec2", account(), self.role))
+        self.assertEqual(5, mock_boto.session.Session.return_value.client.call_count)
+
+    def test_get_client_is_rebuilt_when_credentials_are_refreshed(self) -> None:
+        creds = [AwsCredentials("access", "secret", "session"), AwsCredentials("access_2", "secret_2", "session_2")]
+        mock_boto = Mock(session=Mock(Session=Mock(return_value=Mock(client=Mock(side_effect=lambda **_: Mock())))))
+
+        with patch("src.clients.aws_client_factory.AwsClientFactory._get_session_token"):
+            with patch("src.clients.aws_client_factory.AwsClientFactory._assume_role", side_effect=creds):
+                with patch("src.clients.aws_client_factory.boto3", mock_boto):
+                    factory = AwsClientFactory(self.mfa, self.username)
+                    client = factory._get_client("s3", account(), self.role)
+                    self.assertIsNot(client, factory._get_client("s3", account(), self.role))
+
     def test_assume_role_user_account(self) -> None:
         assumed_role_creds = {
             "Credentials": {
@@ -497,18 +616,21 @@ class TestAwsClientFactory(TestCase):
             }
         }
         mock_sts_client = Mock(assume_role=Mock(return_value=assumed_role_creds))
-        mock_boto = Mock(client=Mock(return_value=mock_sts_client))
+        mock_boto = mock_boto_session(mock_sts_client)
         session_token = AwsCredentials("session_access_key", "session_secret_key", "session_token")
 
         with patch("src.clients.aws_client_factory.AwsClientFactory._get_session_token", return_value=session_token):
             with patch("src.clients.aws_client_factory.boto3", mock_boto):
-                creds = AwsClientFactory(self.mfa, self.username)._assume_role(account(), self.role)
+                factory = AwsClientFactory(self.mfa, self.username)
+                creds = factory._assume_role(account(), self.role)
         self.assertEqual(creds, AwsCredentials("some_access_key", "some_secret_access_key", "some_session_token"))
-        mock_boto.client.assert_called_once_with(
+        mock_boto.session.Session.return_value.client.assert_called_once_with(
             service_name="sts",
             aws_access_key_id="session_access_key",
             aws_secret_access_key="session_secret_key",
             aws_session_token="session_token",
+            region_name=None,
+            config=factory._boto_config,
         )
         mock_sts_client.assume_role.assert_called_once_with(
             DurationSeconds=3600,
@@ -525,18 +647,40 @@ class TestAwsClientFactory(TestCase):
             }
         }
         mock_sts_client = Mock(assume_role=Mock(return_value=assumed_role_creds))
-        mock_boto = Mock(client=Mock(return_value=mock_sts_client))
+        mock_boto = mock_boto_session(mock_sts_client)
 
         with patch("src.clients.aws_client_factory.boto3", mock_boto):
-            creds = AwsClientFactory(SERVICE_ACCOUNT_TOKEN, SERVICE_ACCOUNT_USER)._assume_role(account(), self.role)
+            factory = AwsClientFactory(SERVICE_ACCOUNT_TOKEN, SERVICE_ACCOUNT_USER)
+            creds = factory._assume_role(account(), self.role)
         self.assertEqual(creds, AwsCredentials("some_access_key", "some_secret_access_key", "some_session_token"))
-        mock_boto.client.assert_called_once_with(service_name="sts")
+        mock_boto.session.Session.return_value.client.assert_called_once_with(
+            service_name="sts",
+            aws_access_key_id=None,
+            aws_secret_access_key=None,
+            aws_session_token=None,
+            region_name=None,
+            config=factory._boto_config,
+        )
         mock_sts_client.assume_role.assert_called_once_with(
             DurationSeconds=3600,
             RoleArn="arn:aws:iam::account_id:role/some_role",
             RoleSessionName="boto3_assuming_some_role",
         )
 
+    def test_assume_role_is_cached(self) -> None:
+        mock_sts_client = Mock(
+            assume_role=Mock(
+                return_value={"Credentials": {"AccessKeyId": "key", "SecretAccessKey": "secret", "SessionToken": "tok"}}
+            )
+        )
+        with patch("src.clients.aws_client_factory.boto3", mock_boto_session(mock_sts_client)):
+            factory = AwsClientFactory(SERVICE_ACCOUNT_TOKEN, SERVICE_ACCOUNT_USER)
+            first = factory._assume_role(account(), self.role)
+            second = factory._assume_role(account(), self.role)
+        self.assertIs(first, second)
+        mock_sts_client.assume_role.assert_called_once()
+        self.assertEqual((1, 1), (factory.credentials_cache.hits, factory.credentials_cache.misses))
+
     def test_to_credentials_failure(self) -> None:
         def trigger_error() -> None:
             raise NoCredentialsError
@@ -544,3 +688,14 @@ class TestAwsClientFactory(TestCase):
         with patch("src.clients.aws_client_factory.AwsClientFactory._get_session_token"):
             with self.assertRaisesRegex(ClientFactoryException, NoCredentialsError.fmt):
                 AwsClientFactory("123456", "bob")._to_credentials(trigger_error)
+
+
+def test_factory_is_picklable_without_requesting_a_new_session_token() -> None:
+    token = AwsCredentials("access", "secret", "session")
+    with patch.object(AwsClientFactory, "_get_session_token", return_value=token) as get_session_token:
+        factory = AwsClientFactory("123456", "joe.bloggs")
+        copy = pickle.loads(pickle.dumps(factory))
+    get_session_token.assert_called_once()
+    assert copy._session_token == token
+    assert copy._credentials_cache is not factory._credentials_cache
+    assert copy._clients == {}
@@ -0,0 +1,37 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from src.clients.aws_credentials_cache import AwsCredentialsCache
+from src.data.aws_common_types import AwsCredentials
+
+
+class TestAwsCredentialsCache(TestCase):
+    creds_1 = AwsCredentials("access_1", "secret_1", "session_1")
+    creds_2 = AwsCredentials("access_2", "secret_2", "session_2")
+
+    def test_get_reuses_credentials_until_refresh_margin(self) -> None:
+        cache = AwsCredentialsCache(duration_seconds=3600)
+        provider = Mock(side_effect=[self.creds_1, self.creds_2])
+        with patch("src.clients.aws_credentials_cache.monotonic", side_effect=[0, 3299, 3300, 3300]):
+            self.assertEqual(self.creds_1, cache.get(("111", "role"), provider))
+            self.assertEqual(self.creds_1, cache.get(("111", "role"), provider))
+            self.assertEqual(self.creds_2, cache.get(("111", "role"), provider))
+        self.assertEqual(2, provider.call_count)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_get_is_keyed_by_account_and_role(self) -> None:
+        cache = AwsCredentialsCache(duration_seconds=3600)
+        provider = Mock(side_effect=[self.creds_1, self.creds_2])
+        self.assertEqual(self.creds_1, cache.get(("111", "role"), provider))
+        self.assertEqual(self.creds_2, cache.get(("222", "role"), provider))
+        self.assertEqual(self.creds_1, cache.get(("111", "role"), provider))
+        self.assertEqual("credentials cache (hits: 1, misses: 2)", str(cache))
+
+    def test_short_sessions_keep_half_of_their_duration(self) -> None:
+        cache = AwsCredentialsCache(duration_seconds=120)
+        provider = Mock(side_effect=[self.creds_1, self.creds_2])
+        with patch("src.clients.aws_credentials_cache.monotonic", side_effect=[0, 59, 60, 60]):
+            cache.get(("111", "role"), provider)
+            cache.get(("111", "role"), provider)
+            cache.get(("111", "role"), provider)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
@@ -0,0 +1,49 @@
+from typing import Any
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from src.clients.aws_deadline import check_deadline, deadline, deadline_suspended
+from src.data.aws_scanner_exceptions import TaskDeadlineException
+
+
+def organizations_client() -> Any:
+    return boto3.session.Session().client(
+        "organizations", region_name="us-east-1", aws_access_key_id="key", aws_secret_access_key="secret"
+    )
+
+
+def test_no_deadline() -> None:
+    check_deadline()
+
+
+def test_deadline_not_reached() -> None:
+    with deadline(float("inf")):
+        check_deadline()
+
+
+def test_deadline_exceeded() -> None:
+    with deadline(0):
+        with pytest.raises(TaskDeadlineException, match="deadline exceeded"):
+            check_deadline()
+    check_deadline()
+
+
+def test_deadline_suspended() -> None:
+    with deadline(0):
+        with deadline_suspended():
+            check_deadline()
+        with pytest.raises(TaskDeadlineException):
+            check_deadline()
+
+
+def test_calls_are_stopped_once_deadline_is_exceeded() -> None:
+    client = organizations_client()
+    with Stubber(client) as stubber:
+        client.meta.events.register_first("before-call.*.*", check_deadline)
+        stubber.add_response("describe_organization", {"Organization": {"Id": "o-1"}})
+        with deadline(0):
+            with pytest.raises(TaskDeadlineException):
+                client.describe_organization()
+        assert client.describe_organization()["Organization"]["Id"] == "o-1"
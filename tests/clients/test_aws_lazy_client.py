@@ -0,0 +1,26 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from src.clients.aws_lazy_client import AwsLazyClient
+
+
+class TestAwsLazyClient(TestCase):
+    def test_client_is_created_on_first_attribute_access_only(self) -> None:
+        provider = Mock(return_value=Mock(list_things=Mock(return_value=["thing"])))
+        client = AwsLazyClient("things client", provider)
+
+        provider.assert_not_called()
+        self.assertFalse(client.materialised)
+        self.assertEqual(["thing"], client.list_things())
+        self.assertEqual(["thing"], client.list_things())
+        self.assertTrue(client.materialised)
+        provider.assert_called_once_with()
+
+    def test_lazy_attributes_are_not_forwarded(self) -> None:
+        client = AwsLazyClient("things client", Mock())
+        del client._lazy_client
+        with self.assertRaisesRegex(AttributeError, "_lazy_client"):
+            client._lazy_client
+
+    def test_str(self) -> None:
+        self.assertEqual("things client", str(AwsLazyClient("things client", Mock())))
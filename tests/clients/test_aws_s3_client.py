@@ -1,10 +1,15 @@
 import logging
 
+from io import BytesIO
 from unittest.mock import Mock
 
+from botocore.exceptions import EndpointConnectionError
+from botocore.response import StreamingBody
+
 from typing import Any, Dict, Sequence
 
 from src.clients.aws_s3_client import AwsS3Client
+from src.data.aws_s3_types import S3Object
 
 from tests import _raise
 from tests.clients import test_aws_s3_client_responses as responses
@@ -711,3 +716,106 @@ def test_get_object() -> None:
     )
     actual_object = s3_client.get_object("buck", "fruit")
     assert actual_object == "banana"
+
+
+def test_list_object_keys() -> None:
+    pages = [{"Contents": [{"Key": "pre/a"}, {"Key": "pre/b"}]}, {"Contents": [{"Key": "pre/c"}]}, {"KeyCount": 0}]
+    paginator = Mock(paginate=Mock(return_value=iter(pages)))
+    boto_s3 = Mock(get_paginator=Mock(return_value=paginator))
+    assert ["pre/a", "pre/b", "pre/c"] == AwsS3Client(boto_s3).list_object_keys("buck", "pre/")
+    boto_s3.get_paginator.assert_called_once_with("list_objects_v2")
+    paginator.paginate.assert_called_once_with(Bucket="buck", Prefix="pre/")
+
+
+def test_list_object_keys_failure(caplog: Any) -> None:
+    paginator = Mock(paginate=Mock(side_effect=client_error("ListObjectsV2", "AccessDenied", "Access Denied")))
+    with caplog.at_level(logging.WARNING):
+        assert [] == AwsS3Client(Mock(get_paginator=Mock(return_value=paginator))).list_object_keys("buck", "pre/")
+    assert "unable to list objects with prefix 'pre/' in bucket 'buck'" in caplog.text
+
+
+def test_get_object_if_none_match() -> None:
+    get_object = Mock(return_value={"Body": StreamingBody(BytesIO(b"banana"), 6), "ETag": '"abc"'})
+    s3_object = AwsS3Client(Mock(get_object=get_object)).get_object_if_none_match("buck", "fruit")
+    assert s3_object == S3Object(content="banana", etag='"abc"')
+    get_object.assert_called_once_with(Bucket="buck", Key="fruit")
+
+
+def test_get_object_if_none_match_sends_etag() -> None:
+    get_object = Mock(return_value={"Body": StreamingBody(BytesIO(b"apple"), 5), "ETag": '"def"'})
+    s3_object = AwsS3Client(Mock(get_object=get_object)).get_object_if_none_match("buck", "fruit", '"abc"')
+    assert s3_object == S3Object(content="apple", etag='"def"')
+    get_object.assert_called_once_with(Bucket="buck", Key="fruit", IfNoneMatch='"abc"')
+
+
+def test_get_object_if_none_match_not_modified(caplog: Any) -> None:
+    s3_client = AwsS3Client(Mock(get_object=Mock(side_effect=client_error("GetObject", "304", "Not Modified"))))
+    with caplog.at_level(logging.WARNING):
+        assert s3_client.get_object_if_none_match("buck", "fruit", '"abc"') is None
+    assert not caplog.text
+
+
+def test_get_object_if_none_match_failure(caplog: Any) -> None:
+    s3_client = AwsS3Client(Mock(get_object=Mock(side_effect=client_error("GetObject", "AccessDenied", "denied"))))
+    with caplog.at_level(logging.WARNING):
+        assert s3_client.get_object_if_none_match("buck", "fruit") is None
+    assert "AccessDenied" in caplog.text
+
+
+def test_get_object_if_none_match_connection_failure(caplog: Any) -> None:
+    error = EndpointConnectionError(endpoint_url="https://s3")
+    s3_client = AwsS3Client(Mock(get_object=Mock(side_effect=error)))
+    with caplog.at_level(logging.WARNING):
+        assert s3_client.get_object_if_none_match("buck", "fruit") is None
+    assert "unable to get object 'fruit' from bucket 'buck'" in caplog.text
+
+
+def test_put_object_stream_in_single_part() -> None:
+    boto_s3 = Mock(put_object=Mock(return_value={"VersionId": "v1"}))
+    assert "v1" == AwsS3Client(boto_s3).put_object_stream("buck", "obj", iter(["[", "{}", "]"]))
+    boto_s3.put_object.assert_called_once_with(Bucket="buck", Key="obj", Body="[{}]")
+    boto_s3.create_multipart_upload.assert_not_called()
+
+
+def test_put_object_stream_in_multiple_parts() -> None:
+    boto_s3 = Mock(
+        create_multipart_upload=Mock(return_value={"UploadId": "up"}),
+        upload_part=Mock(side_effect=lambda **kwargs: {"ETag": f"etag-{kwargs['PartNumber']}"}),
+        complete_multipart_upload=Mock(return_value={"VersionId": "v2"}),
+    )
+    chunks = iter(["[", "{'a': 1}", ", ", "{'b': 2}", "]"])
+    assert "v2" == AwsS3Client(boto_s3).put_object_stream("buck", "obj", chunks, part_size=5)
+    boto_s3.create_multipart_upload.assert_called_once_with(Bucket="buck", Key="obj")
+    assert [c.kwargs for c in boto_s3.upload_part.call_args_list] == [
+        {"Bucket": "buck", "Key": "obj", "UploadId": "up", "PartNumber": 1, "Body": b"[{'a': 1}"},
+        {"Bucket": "buck", "Key": "obj", "UploadId": "up", "PartNumber": 2, "Body": b", {'b': 2}"},
+        {"Bucket": "buck", "Key": "obj", "UploadId": "up", "PartNumber": 3, "Body": b"]"},
+    ]
+    boto_s3.complete_multipart_upload.assert_called_once_with(
+        Bucket="buck",
+        Key="obj",
+        UploadId="up",
+        MultipartUpload={"Parts": [{"ETag": f"etag-{n}", "PartNumber": n} for n in [1, 2, 3]]},
+    )
+    boto_s3.put_object.assert_not_called()
+
+
+def test_put_object_stream_failure_aborts_upload_and_drains_chunks(caplog: Any) -> None:
+    boto_s3 = Mock(
+        create_multipart_upload=Mock(return_value={"UploadId": "up"}),
+        upload_part=Mock(side_effect=client_error("UploadPart", "AccessDenied", "denied")),
+    )
+    chunks = iter(["aaaaa", "bbbbb", "ccccc", "ddddd"])
+    with caplog.at_level(logging.WARNING):
+        assert "" == AwsS3Client(boto_s3).put_object_stream("buck", "obj", chunks, part_size=5)
+    assert "AccessDenied" in caplog.text
+    boto_s3.abort_multipart_upload.assert_called_once_with(Bucket="buck", Key="obj", UploadId="up")
+    assert next(chunks, None) is None
+
+
+def test_put_object_stream_failure_to_start_upload(caplog: Any) -> None:
+    boto_s3 = Mock(create_multipart_upload=Mock(side_effect=client_error("CreateMultipartUpload", "NoSuchBucket", "")))
+    with caplog.at_level(logging.WARNING):
+        assert "" == AwsS3Client(boto_s3).put_object_stream("buck", "obj", iter(["aaaaa", "bbbbb"]), part_size=5)
+    assert "NoSuchBucket" in caplog.text
+    boto_s3.abort_multipart_upload.assert_not_called()
@@ -0,0 +1,76 @@
+from threading import Thread
+from typing import Any
+from unittest.mock import Mock
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from src.clients.aws_service_limiter import AwsServiceLimiter
+
+
+def organizations_client() -> Any:
+    return boto3.session.Session().client(
+        "organizations", region_name="us-east-1", aws_access_key_id="key", aws_secret_access_key="secret"
+    )
+
+
+def test_calls_are_counted_against_service_limit() -> None:
+    limiter = AwsServiceLimiter({"organizations": 1})
+    semaphore = limiter._semaphores["organizations"]
+    in_flight = []
+    client = organizations_client()
+    with Stubber(client) as stubber:
+        limiter.register("organizations", client)
+        client.meta.events.register_first("before-call.*.*", lambda **_: in_flight.append(semaphore._value))
+        stubber.add_response("describe_organization", {"Organization": {"Id": "o-1"}})
+        stubber.add_client_error("describe_organization", "AccessDeniedException")
+        assert client.describe_organization()["Organization"]["Id"] == "o-1"
+        with pytest.raises(client.exceptions.AccessDeniedException):
+            client.describe_organization()
+    assert in_flight == [0, 0]
+    assert semaphore._value == 1
+
+
+def test_release_without_acquire_is_ignored() -> None:
+    limiter = AwsServiceLimiter({"organizations": 1})
+    limiter._release("organizations")
+    assert limiter._semaphores["organizations"]._value == 1
+
+
+def test_concurrent_calls_wait_for_a_free_slot() -> None:
+    limiter = AwsServiceLimiter({"iam": 1})
+    client = Mock(meta=Mock(events=Mock()))
+    limiter.register("iam", client)
+    acquire = client.meta.events.register_first.call_args.args[1]
+    release = client.meta.events.register.call_args.args[1]
+    acquire()
+    waiting = Thread(target=acquire)
+    waiting.start()
+    waiting.join(timeout=0.1)
+    assert waiting.is_alive()
+    release()
+    waiting.join(timeout=1)
+    assert not waiting.is_alive()
+    release()
+
+
+def test_release_on_call_error() -> None:
+    limiter = AwsServiceLimiter({"athena": 2})
+    client = Mock(meta=Mock(events=Mock()))
+    limiter.register("athena", client)
+    client.meta.events.register_first.assert_called_once()
+    assert [call.args[0] for call in client.meta.events.register.call_args_list] == ["after-call", "after-call-error"]
+    acquire = client.meta.events.register_first.call_args.args[1]
+    release_on_error = client.meta.events.register.call_args_list[1].args[1]
+    acquire()
+    release_on_error(exception=Exception("boom"))
+    assert limiter._semaphores["athena"]._value == 2
+
+
+def test_unlimited_services_are_not_hooked() -> None:
+    limiter = AwsServiceLimiter({"iam": 1})
+    client = Mock()
+    limiter.register("s3", client)
+    client.meta.events.register_first.assert_not_called()
+    assert limiter.limits == {"iam": 1}
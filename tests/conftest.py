@@ -1,6 +1,9 @@
 from os import environ
 from unittest.mock import patch
 from freezegun import freeze_time
+from pytest import fixture
+
+from src.aws_scanner_config import AwsScannerConfig
 
 
 environ["AWS_SCANNER_CONFIG_FILE_NAME"] = "aws_scanner_test_config.ini"
@@ -8,3 +11,8 @@ patch("boto3.session.Session.get_available_regions", return_value=["us", "eu"]).
 
 freezer = freeze_time("2020-11-02")
 freezer.start()
+
+
+@fixture(autouse=True)
+def reload_config() -> None:
+    AwsScannerConfig.reload()
@@ -1,6 +1,7 @@
 from unittest import TestCase
 
 from datetime import date
+from unittest.mock import patch
 
 from src.data.aws_athena_data_partition import AwsAthenaDataPartition
 from src.data.aws_scanner_exceptions import InvalidDataPartitionException, InvalidRegionException
@@ -45,6 +46,14 @@ class TestAwsAthenaDataPartition(TestCase):
         with self.assertRaisesRegex(InvalidDataPartitionException, expected_msg):
             AwsAthenaDataPartition("eu", 2020, 8, 1)
 
+    def test_years_span_the_retention(self) -> None:
+        self.assertEqual((2020, 2020), AwsAthenaDataPartition.years())
+        with patch.object(AwsAthenaDataPartition, "_today", return_value=date(2021, 1, 15)):
+            self.assertEqual((2020, 2021), AwsAthenaDataPartition.years())
+
+    def test_regions(self) -> None:
+        self.assertEqual(["us", "eu"], AwsAthenaDataPartition.regions())
+
     def test_today(self) -> None:
         self.assertEqual(date.today(), AwsAthenaDataPartition._today())
 
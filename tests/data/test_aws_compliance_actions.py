@@ -1,3 +1,4 @@
+from dataclasses import replace
 from logging import ERROR
 from typing import Any, Sequence
 from unittest.mock import Mock, call
@@ -207,16 +208,14 @@ def test_plan_delete_flow_log_delivery_role_action() -> None:
 
 def test_apply_create_central_vpc_log_group_action() -> None:
     logs = Mock(spec=AwsLogsClient)
-    log_group_config = Config().logs_vpc_flow_log_group_config()
-    log_group_config.logs_group_name = "/vpc/flow_log"
+    log_group_config = replace(Config().logs_vpc_flow_log_group_config(), logs_group_name="/vpc/flow_log")
     create_log_group_action(log_group_config=log_group_config, logs=logs)._apply()
     logs.create_log_group.assert_called_once_with("/vpc/flow_log")
 
 
 def test_plan_create_central_vpc_log_group_action() -> None:
     expected = compliance_action_report(description="Create log group", details=dict(log_group_name="/vpc/flow_log"))
-    log_group_config = Config().logs_vpc_flow_log_group_config()
-    log_group_config.logs_group_name = "/vpc/flow_log"
+    log_group_config = replace(Config().logs_vpc_flow_log_group_config(), logs_group_name="/vpc/flow_log")
     assert expected == create_log_group_action(log_group_config=log_group_config).plan()
 
 
@@ -224,15 +223,17 @@ def test_plan_create_route53_log_group_action() -> None:
     expected = compliance_action_report(
         description="Create log group", details=dict(log_group_name="logs_route53_log_group_name")
     )
-    log_group_config = Config().logs_route53_query_log_group_config()
-    log_group_config.logs_group_name = "logs_route53_log_group_name"
+    log_group_config = replace(
+        Config().logs_route53_query_log_group_config(), logs_group_name="logs_route53_log_group_name"
+    )
     assert expected == create_log_group_action(log_group_config=log_group_config).plan()
 
 
 def test_apply_create_route53_log_group_action() -> None:
     logs = Mock()
-    log_group_config = Config().logs_route53_query_log_group_config()
-    log_group_config.logs_group_name = "logs_route53_log_group_name"
+    log_group_config = replace(
+        Config().logs_route53_query_log_group_config(), logs_group_name="logs_route53_log_group_name"
+    )
     create_log_group_action(logs=logs, log_group_config=log_group_config).apply()
     logs.create_log_group.assert_called_once_with("logs_route53_log_group_name")
 
@@ -294,8 +295,7 @@ def test_plan_put_vpc_log_group_retention_policy_action() -> None:
 
 
 def test_plan_put_route53_log_group_retention_policy_action() -> None:
-    log_group_config = Config().logs_route53_query_log_group_config()
-    log_group_config.logs_group_retention_policy_days = 5
+    log_group_config = replace(Config().logs_route53_query_log_group_config(), logs_group_retention_policy_days=5)
     assert (
         compliance_action_report(
             description=f"Put {log_group_config.logs_group_name} log group retention policy",
@@ -307,8 +307,7 @@ def test_plan_put_route53_log_group_retention_policy_action() -> None:
 
 def test_apply_put_route53_log_group_retention_policy_action() -> None:
     logs = Mock()
-    log_group_config = Config().logs_route53_query_log_group_config()
-    log_group_config.logs_group_retention_policy_days = 5
+    log_group_config = replace(Config().logs_route53_query_log_group_config(), logs_group_retention_policy_days=5)
     put_log_group_retention_policy_action(
         log_group_config=log_group_config,
         logs=logs,
@@ -318,8 +317,7 @@ def test_apply_put_route53_log_group_retention_policy_action() -> None:
 
 def test_apply_put_vpc_log_group_retention_policy_action() -> None:
     logs = Mock(spec=AwsLogsClient)
-    log_group_config = Config().logs_vpc_flow_log_group_config()
-    log_group_config.logs_group_retention_policy_days = 14
+    log_group_config = replace(Config().logs_vpc_flow_log_group_config(), logs_group_retention_policy_days=14)
     put_log_group_retention_policy_action(
         log_group_config=log_group_config,
         logs=logs,
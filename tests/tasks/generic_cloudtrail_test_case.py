@@ -1,6 +1,8 @@
 from unittest import TestCase
 from unittest.mock import Mock
 
+from src.clients.aws_athena_result_set import decode_columns
+
 from tests.test_types_generator import account, partition, task_report
 
 
@@ -15,7 +17,7 @@ class GenericCloudTrailTestCase(TestCase):
 
     def _assert_task_run(self, task_type, task_args, query, query_results, results) -> None:  # type: ignore
         for task_index, query_result in enumerate(query_results):
-            athena = Mock(run_query=Mock(return_value=query_result))
+            athena = Mock(query_column_pages=Mock(return_value=iter([decode_columns(query_result, skip_rows=1)])))
             task = self.__build_task_under_test(task_type=task_type, task_args=task_args)  # type: ignore
             self.assertEqual(task_report(description=task._description, results=results[task_index]), task.run(athena))
-            athena.run_query.assert_called_once_with(database="some_db", query=query)
+            athena.query_column_pages.assert_called_once_with(database="some_db", query=query)
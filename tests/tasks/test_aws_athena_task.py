@@ -1,9 +1,9 @@
 from unittest import TestCase
 from unittest.mock import Mock, call, patch
 
-from src.data.aws_scanner_exceptions import AwsScannerException
+from src.clients.aws_deadline import check_deadline, deadline
+from src.data.aws_scanner_exceptions import AwsScannerException, TaskDeadlineException
 from src.tasks.aws_athena_task import AwsAthenaTask
-from src.tasks.aws_cloudtrail_task import AwsCloudTrailTask
 
 from tests.test_types_generator import account, athena_task, cloudtrail_task, partition, task_report
 
@@ -17,9 +17,9 @@ class TestAwsAthenaTask(TestCase):
         with self.assertRaises(NotImplementedError):
             athena_task()._create_table(Mock())
 
-    def test_create_partition(self) -> None:
-        with self.assertRaises(NotImplementedError):
-            athena_task()._create_partition(Mock())
+    def test_athena_tasks_are_not_pipelined_by_default(self) -> None:
+        self.assertIsNone(athena_task().pipeline())
+        self.assertIsNone(cloudtrail_task().pipeline())
 
     def test_randomise_name(self) -> None:
         task_1 = cloudtrail_task()
@@ -31,18 +31,13 @@ class TestAwsAthenaTask(TestCase):
         self.assertTrue(task_1._database != task_2._database)
 
     def test_setup(self) -> None:
-        mock_create_table, mock_create_partition, mock_athena = Mock(), Mock(), Mock()
-        parent_mock = Mock(athena=mock_athena, create_partition=mock_create_partition, create_table=mock_create_table)
+        mock_create_table, mock_athena = Mock(), Mock()
+        parent_mock = Mock(athena=mock_athena, create_table=mock_create_table)
         with patch.object(AwsAthenaTask, "_create_table", mock_create_table):
-            with patch.object(AwsAthenaTask, "_create_partition", mock_create_partition):
-                task = athena_task()
-                task._setup(mock_athena)
-        parent_mock.assert_has_calls(
-            [
-                call.athena.create_database(task._database),
-                call.create_table(mock_athena),
-                call.create_partition(mock_athena),
-            ]
+            task = athena_task()
+            task._setup(mock_athena)
+        self.assertEqual(
+            [call.athena.create_database(task._database), call.create_table(mock_athena)], parent_mock.mock_calls
         )
 
     def test_teardown(self) -> None:
@@ -80,6 +75,27 @@ class TestAwsAthenaTask(TestCase):
                         cloudtrail_task().run(mock_athena)
         mocks.assert_has_calls([call.setup(mock_athena), call.task(mock_athena), call.teardown(mock_athena)])
 
+    def test_run_past_deadline_tears_down_and_reports_incomplete(self) -> None:
+        task_class = "src.tasks.aws_cloudtrail_task.AwsCloudTrailTask"
+        mock_athena = Mock()
+        past_deadline = Mock(side_effect=lambda _: check_deadline())
+        mocks = Mock(setup=Mock(), task=past_deadline, teardown=Mock(side_effect=lambda _: check_deadline()))
+
+        with patch(f"{task_class}._setup", mocks.setup):
+            with patch(f"{task_class}._run_task", mocks.task):
+                with patch(f"{task_class}._teardown", mocks.teardown):
+                    with deadline(0):
+                        report = cloudtrail_task().run(mock_athena)
+        self.assertEqual(task_report(results={}, incomplete=True), report)
+        mocks.assert_has_calls([call.setup(mock_athena), call.task(mock_athena), call.teardown(mock_athena)])
+
+    def test_setup_past_deadline_reports_incomplete(self) -> None:
+        task_class = "src.tasks.aws_cloudtrail_task.AwsCloudTrailTask"
+        with patch(f"{task_class}._setup", side_effect=TaskDeadlineException):
+            with patch(f"{task_class}._teardown") as teardown:
+                self.assertTrue(cloudtrail_task().run(Mock()).incomplete)
+        teardown.assert_not_called()
+
     def test_task(self) -> None:
         with self.assertRaises(NotImplementedError):
             cloudtrail_task()._run_task(Mock())
@@ -92,16 +108,6 @@ class TestAwsAthenaTask(TestCase):
         self.assertEqual(results, t._run_query(mock_athena, query))
         mock_athena.run_query.assert_called_once_with(database=t._database, query=query)
 
-    def test_read_value(self) -> None:
-        results = [
-            {"Data": [{"VarCharValue": "ssm.amazonaws.com"}, {"VarCharValue": "1024"}]},
-            {"Data": [{"VarCharValue": "some.service"}, {"VarCharValue": "42"}]},
-        ]
-        self.assertEqual("ssm.amazonaws.com", AwsCloudTrailTask._read_value(results, 0, 0))
-        self.assertEqual("1024", AwsCloudTrailTask._read_value(results, 0, 1))
-        self.assertEqual("some.service", AwsCloudTrailTask._read_value(results, 1, 0))
-        self.assertEqual("42", AwsCloudTrailTask._read_value(results, 1, 1))
-
     def test_str(self) -> None:
         self.assertEqual(
             f"task 'task' for 'account_name (account_id)' with {partition(2020, 9)}",
@@ -1,6 +1,8 @@
 from unittest import TestCase
 from unittest.mock import Mock
 
+from src.data.aws_scanner_exceptions import TaskDeadlineException
+
 from src.clients.composite.aws_s3_kms_client import AwsS3KmsClient
 from src.tasks.aws_audit_s3_task import AwsAuditS3Task
 
@@ -25,6 +27,19 @@ from tests.test_types_generator import (
 
 
 class TestAwsAuditS3Task(TestCase):
+    def test_run_past_deadline_reports_audited_buckets(self) -> None:
+        audited = bucket("audited", access_logging_tagging=bucket_access_logging_tagging("false"))
+        s3 = Mock(
+            spec=AwsS3KmsClient,
+            list_buckets=Mock(return_value=[audited, bucket("not-audited")]),
+            enrich_bucket=Mock(side_effect=[audited, TaskDeadlineException("too late")]),
+        )
+        task = AwsAuditS3Task(account())
+        report = task.run(s3)
+        self.assertTrue(report.incomplete)
+        self.assertEqual(["audited"], [b.name for b in report.results["buckets"]])
+        self.assertEqual({}, task._partial_results)
+
     def test_run_task(self) -> None:
         bucket_1, bucket_2, bucket_3, bucket_4 = "bucket-1", "bucket-2", "another_bucket", "forever-config-bucket"
         buckets = [bucket(bucket_1), bucket(bucket_2), bucket(bucket_3), bucket(bucket_4)]
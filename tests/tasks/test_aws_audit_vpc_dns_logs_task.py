@@ -35,7 +35,8 @@ def test_run_plan_task() -> None:
     vpc_client = Mock(spec=AwsVpcClient)
     vpc_client.resolver = resolver
     vpc_client.enforcement_dns_log_actions = Mock(return_value=actions)
-    vpc_client.list_vpcs = Mock(return_value=vpcs)
+    vpc_client.ec2 = Mock(list_vpcs=Mock(return_value=vpcs))
+    vpc_client.enrich_vpc = Mock(side_effect=lambda v: v)
 
     assert expected_report([]) == aws_audit_vpc_dns_logs_task(
         enforce=False, with_subscription_filter=True, skip_tags=False
@@ -54,7 +55,8 @@ def test_run_apply_task() -> None:
     vpc_client = Mock(spec=AwsVpcClient)
     vpc_client.resolver = resolver
     vpc_client.enforcement_dns_log_actions = Mock(return_value=[])
-    vpc_client.list_vpcs = Mock(return_value=vpcs)
+    vpc_client.ec2 = Mock(list_vpcs=Mock(return_value=vpcs))
+    vpc_client.enrich_vpc = Mock(side_effect=lambda v: v)
 
     assert expected_report([]) == aws_audit_vpc_dns_logs_task(
         enforce=True, with_subscription_filter=True, skip_tags=False
@@ -17,8 +17,15 @@ from tests.test_types_generator import (
     vpc,
 )
 
-vpc_client = AwsVpcClient(ec2=Mock(), iam=Mock(), logs=Mock(), config=Mock(), log_group=Mock(), resolver=Mock())
 vpcs = [vpc(id="vpc-1"), vpc(id="vpc-2")]
+vpc_client = AwsVpcClient(
+    ec2=Mock(list_vpcs=Mock(return_value=vpcs)),
+    iam=Mock(),
+    logs=Mock(),
+    config=Mock(),
+    log_group=Mock(),
+    resolver=Mock(),
+)
 actions = [delete_flow_log_action(flow_log_id="fl-4"), create_flow_log_action(vpc_id="vpc-7")]
 
 
@@ -31,7 +38,7 @@ def enforcement_actions(v: Sequence[Vpc], with_sub_filter: bool, skip_tags: bool
 
 
 @patch.object(AwsVpcClient, "enforcement_flow_log_actions", side_effect=enforcement_actions)
-@patch.object(AwsVpcClient, "list_vpcs", return_value=vpcs)
+@patch.object(AwsVpcClient, "enrich_vpc", side_effect=lambda v: v)
 class TestAwsAuditVPCFlowLogsTask(TestCase):
     def test_run_plan_task(self, _: Mock, __: Mock) -> None:
         action_reports = [
@@ -0,0 +1,111 @@
+from unittest import TestCase
+from unittest.mock import Mock, call
+
+from src.clients.aws_athena_catalog import AwsAthenaCatalog, athena_catalog
+from src.clients.aws_athena_result_set import to_records
+from src.clients.aws_athena_scheduler import create_database_statement, drop_database_statement, drop_table_statement
+from src.data.aws_athena_pipeline import AwsAthenaResource, AwsAthenaStatement
+from src.data.aws_scanner_exceptions import CreateTableException, TaskDeadlineException
+from src.tasks.aws_cloudtrail_query_task import AwsCloudTrailQueryTask
+
+from tests.clients.test_aws_athena_cloudtrail_queries import CREATE_TABLE
+from tests.test_types_generator import account, partition, task_report
+
+
+class CountTask(AwsCloudTrailQueryTask):
+    def _query(self) -> str:
+        return "SELECT COUNT(1)"
+
+    def _results(self, columns):  # type: ignore
+        return {"count": len(to_records(columns))}
+
+
+class PartitionTask(CountTask):
+    def _query(self) -> str:
+        return self._substitute('SELECT 1 FROM "$database"."$account" $region/$year/$month')
+
+
+def count_task() -> CountTask:
+    return CountTask("task", account(), partition())
+
+
+class TestAwsCloudTrailQueryTask(TestCase):
+    def test_run_task(self) -> None:
+        task = count_task()
+        client = Mock(query_column_pages=Mock(return_value=iter([{"name": ["a"]}, {"name": ["b"]}])))
+        self.assertEqual({"count": 2}, task._run_task(client))
+        client.query_column_pages.assert_called_once_with(database=task._database, query="SELECT COUNT(1)")
+
+    def test_pipeline(self) -> None:
+        task = count_task()
+        pipeline = task.pipeline()
+        assert pipeline
+        self.assertEqual(
+            [
+                AwsAthenaResource(
+                    create_database_statement(task._database), (drop_database_statement(task._database),)
+                ),
+                AwsAthenaResource(
+                    AwsAthenaStatement(CREATE_TABLE, task._database, CreateTableException),
+                    (drop_table_statement(task._database, "account_id"),),
+                ),
+            ],
+            pipeline.resources,
+        )
+        self.assertEqual(AwsAthenaStatement("SELECT COUNT(1)", task._database), pipeline.query)
+        self.assertEqual(task_report(results={"count": 1}), pipeline.report({"name": ["a"]}))
+        self.assertEqual(task_report(results={}, incomplete=True), pipeline.incomplete(TaskDeadlineException()))
+
+    def test_pipelines_share_the_account_database(self) -> None:
+        tasks = [count_task(), count_task()]
+        with athena_catalog(AwsAthenaCatalog()):
+            pipelines = [task.pipeline() for task in tasks]
+        self.assertEqual(tasks[0]._database, tasks[1]._database)
+        self.assertEqual(pipelines[0].resources, pipelines[1].resources)  # type: ignore
+
+    def test_run_with_own_resources(self) -> None:
+        client = Mock(query_column_pages=Mock(return_value=[{"name": ["a"]}]))
+        task = count_task()
+        self.assertEqual(task_report(results={"count": 1}), task.run(client))
+        client.create_database.assert_called_once_with(task._database)
+        client.drop_table.assert_called_once_with(task._database, "account_id")
+        client.drop_database.assert_called_once_with(task._database)
+
+    def test_run_with_shared_resources(self) -> None:
+        client = Mock(query_columns=Mock(return_value={"name": ["a"]}))
+        catalog = AwsAthenaCatalog()
+        with athena_catalog(catalog):
+            reports = [count_task().run(client), count_task().run(client)]
+        self.assertEqual([task_report(results={"count": 1})] * 2, reports)
+        self.assertEqual(2, client.run_query.call_count)
+        self.assertEqual(
+            [call(database=catalog.database("account_id", ""), query="SELECT COUNT(1)")] * 2,
+            client.query_columns.call_args_list,
+        )
+        client.drop_table.assert_not_called()
+        client.drop_database.assert_not_called()
+        self.assertEqual(2, len(catalog.drop_statements()))
+
+    def test_partitions_share_the_account_table(self) -> None:
+        tasks = [
+            PartitionTask("task", account(), partition(month=11)),
+            PartitionTask("task", account(), partition(month=10)),
+        ]
+        with athena_catalog(AwsAthenaCatalog()):
+            pipelines = [task.pipeline() for task in tasks]
+        self.assertEqual(pipelines[0].resources, pipelines[1].resources)  # type: ignore
+        self.assertEqual(
+            [
+                AwsAthenaStatement(f'SELECT 1 FROM "{tasks[0]._database}"."account_id" eu/2020/11', tasks[0]._database),
+                AwsAthenaStatement(f'SELECT 1 FROM "{tasks[0]._database}"."account_id" eu/2020/10', tasks[0]._database),
+            ],
+            [pipeline.query for pipeline in pipelines],  # type: ignore
+        )
+
+    def test_query(self) -> None:
+        with self.assertRaises(NotImplementedError):
+            AwsCloudTrailQueryTask("task", account(), partition())._query()
+
+    def test_results(self) -> None:
+        with self.assertRaises(NotImplementedError):
+            AwsCloudTrailQueryTask("task", account(), partition())._results({})
@@ -11,7 +11,7 @@ class TestAwsPrincipalByIPFinderTask(GenericCloudTrailTestCase):
             task_type=AwsPrincipalByIPFinderTask,
             task_args={"source_ip": "127.0.0.1"},
             query=queries.FIND_PRINCIPAL_BY_IP,
-            query_results=[queries.FIND_PRINCIPAL_BY_ID_RESULTS, []],
+            query_results=[queries.FIND_PRINCIPAL_BY_ID_RESULTS, queries.FIND_PRINCIPAL_BY_ID_EMPTY_RESULTS],
             results=[
                 {"principals": ["joe.bloggs", "john.doo"]},
                 {"principals": []},
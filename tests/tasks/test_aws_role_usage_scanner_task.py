@@ -11,7 +11,7 @@ class TestAwsRoleUsageScannerTask(GenericCloudTrailTestCase):
             task_type=AwsRoleUsageScannerTask,
             task_args={"role": "RoleSomething"},
             query=queries.SCAN_ROLE_USAGE,
-            query_results=[queries.SCAN_ROLE_USAGE_RESULTS, []],
+            query_results=[queries.SCAN_ROLE_USAGE_RESULTS, queries.SCAN_ROLE_USAGE_EMPTY_RESULTS],
             results=[
                 {
                     "role_usage": [
@@ -1,4 +1,11 @@
+from typing import Any, Dict, Iterator, List, Tuple
+from unittest.mock import Mock
+
+from src.clients.aws_athena_catalog import AwsAthenaCatalog, athena_catalog
+from src.clients.aws_athena_result_set import AthenaColumns, decode_columns
+
 from tests.tasks.generic_cloudtrail_test_case import GenericCloudTrailTestCase
+from tests.test_types_generator import account, partition
 from src.tasks.aws_service_usage_scanner_task import AwsServiceUsageScannerTask
 
 from tests.tasks import test_aws_cloudtrail_scanner_queries as queries
@@ -10,7 +17,7 @@ class TestAwsServiceUsageScannerTask(GenericCloudTrailTestCase):
             task_type=AwsServiceUsageScannerTask,
             task_args={"service": "ssm"},
             query=queries.SCAN_SERVICE_USAGE,
-            query_results=[queries.SCAN_SERVICE_USAGE_RESULTS, []],
+            query_results=[queries.SCAN_SERVICE_USAGE_RESULTS, queries.SCAN_SERVICE_USAGE_EMPTY_RESULTS],
             results=[
                 {
                     "event_source": "ssm.amazonaws.com",
@@ -22,3 +29,87 @@ class TestAwsServiceUsageScannerTask(GenericCloudTrailTestCase):
                 {"event_source": "ssm", "service_usage": []},
             ],
         )
+
+    def test_service_usage_scanner_task_without_shared_query(self) -> None:
+        self._assert_task_run(
+            task_type=AwsServiceUsageScannerTask,
+            task_args={"service": "ssm", "services": ["ssm", "s3"]},
+            query=queries.SCAN_SERVICE_USAGE,
+            query_results=[queries.SCAN_SERVICE_USAGE_RESULTS],
+            results=[
+                {
+                    "event_source": "ssm.amazonaws.com",
+                    "service_usage": [
+                        {"event_name": "describe_document", "error_code": "AccessDenied", "count": 1024},
+                        {"event_name": "get_inventory", "error_code": "", "count": 54},
+                    ],
+                }
+            ],
+        )
+
+    def test_services_usage_is_queried_once_per_account(self) -> None:
+        athena = Mock(query_columns=Mock(return_value=decode_columns(queries.SCAN_SERVICES_USAGE_RESULTS, skip_rows=1)))
+        services = ["ssm", "s3", "ec2"]
+        tasks = [AwsServiceUsageScannerTask(account(), partition(), s, services) for s in services]
+        catalog = AwsAthenaCatalog()
+        with athena_catalog(catalog):
+            for task in tasks:
+                task._database = "some_db"
+                task._setup = Mock()  # type: ignore
+            reports = [task.run(athena) for task in tasks]
+        athena.query_columns.assert_called_once_with(database="some_db", query=queries.SCAN_SERVICES_USAGE)
+        self.assertEqual({}, catalog._unread)
+        self.assertEqual(
+            [
+                {
+                    "event_source": "ssm.amazonaws.com",
+                    "service_usage": [{"event_name": "get_inventory", "error_code": "", "count": 54}],
+                },
+                {
+                    "event_source": "s3.amazonaws.com",
+                    "service_usage": [{"event_name": "get_object", "error_code": "AccessDenied", "count": 7}],
+                },
+                {"event_source": "ec2", "service_usage": []},
+            ],
+            [report.results for report in reports],
+        )
+
+    def test_batched_services_usage_is_capped_like_a_single_service_query(self) -> None:
+        def usage(service: str, events: int) -> List[Tuple[str, str, str, int]]:
+            return [(f"{service}.amazonaws.com", f"event_{n}", "", n) for n in range(events)]
+
+        def columns(rows: List[Tuple[str, str, str, int]]) -> AthenaColumns:
+            return dict(zip(["eventsource", "eventname", "errorcode", "count"], map(list, zip(*rows))))
+
+        def run(service: str, rows: List[Tuple[str, str, str, int]], services: List[str]) -> Dict[Any, Any]:
+            task = AwsServiceUsageScannerTask(account(), partition(), service, services)
+            task._database = "some_db"
+            task._setup = Mock()  # type: ignore
+            athena = Mock(
+                query_columns=Mock(return_value=columns(rows)), query_column_pages=Mock(return_value=[columns(rows)])
+            )
+            return task.run(athena).results
+
+        services = ["ssm", "s3"]
+        with athena_catalog(AwsAthenaCatalog()):
+            batched = [run(s, usage("ssm", 150) + usage("s3", 2), services) for s in services]
+        unbatched = [run("ssm", usage("ssm", 100), services), run("s3", usage("s3", 2), services)]
+        self.assertEqual(unbatched, batched)
+        self.assertEqual(100, len(batched[0]["service_usage"]))
+
+    def test_result_pages_are_read_until_the_usage_is_capped(self) -> None:
+        pulled = []
+
+        def pages() -> Iterator[AthenaColumns]:
+            for page in range(5):
+                pulled.append(page)
+                yield {
+                    "eventsource": ["ssm.amazonaws.com"] * 60,
+                    "eventname": ["a"] * 60,
+                    "errorcode": [None] * 60,
+                    "count": [1] * 60,
+                }
+
+        task = AwsServiceUsageScannerTask(account(), partition(), "ssm")
+        self.assertEqual(100, len(task._page_results(pages())["service_usage"]))
+        self.assertEqual([0, 1], pulled)
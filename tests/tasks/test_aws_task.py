@@ -1,6 +1,9 @@
+from typing import Any, Dict
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
+from src.data.aws_scanner_exceptions import TaskDeadlineException
+
 from tests.test_types_generator import account, aws_task, task_report
 
 
@@ -9,10 +12,45 @@ class TestAwsTaskTask(TestCase):
         with patch("src.tasks.aws_task.AwsTask._run_task", return_value={"key": "val"}):
             self.assertEqual(task_report(partition=None), aws_task().run(Mock()))
 
+    def test_run_past_deadline(self) -> None:
+        with patch("src.tasks.aws_task.AwsTask._run_task", side_effect=TaskDeadlineException("too late")):
+            with self.assertLogs("AwsTask", level="WARNING") as logs:
+                report = aws_task().run(Mock())
+        self.assertEqual(task_report(partition=None, results={}, incomplete=True), report)
+        self.assertIn("did not complete: too late", logs.output[0])
+
+    def test_run_past_deadline_keeps_partial_results(self) -> None:
+        task = aws_task()
+
+        def run_task(_: Mock) -> None:
+            task._partial_results["collected"] = ["a"]
+            raise TaskDeadlineException("too late")
+
+        with patch.object(task, "_run_task", side_effect=run_task):
+            with self.assertLogs("AwsTask", level="WARNING"):
+                report = task.run(Mock())
+        self.assertEqual(task_report(partition=None, results={"collected": ["a"]}, incomplete=True), report)
+        self.assertEqual({}, task._partial_results)
+
+    def test_partial_results_are_not_kept_after_a_run(self) -> None:
+        task = aws_task()
+
+        def run_task(_: Mock) -> Dict[Any, Any]:
+            task._partial_results["collected"] = ["a"]
+            return {"collected": ["a"]}
+
+        with patch.object(task, "_run_task", side_effect=run_task):
+            task.run(Mock())
+        self.assertEqual({}, task._partial_results)
+
     def test_get_account(self) -> None:
         task = aws_task()
         self.assertEqual(task.account, account())
 
+    def test_report_key(self) -> None:
+        self.assertEqual(task_report(partition=None).key, aws_task().report_key)
+        self.assertNotEqual(aws_task(description="other").report_key, aws_task().report_key)
+
     def test_run_task(self) -> None:
         with self.assertRaises(NotImplementedError):
             aws_task()._run_task(Mock())
@@ -0,0 +1,113 @@
+# type: ignore
+import os
+from threading import Lock
+from time import sleep
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from src.aws_async_task_runner import AwsAsyncTaskRunner
+from src.data.aws_scanner_exceptions import AwsScannerException
+from src.clients.aws_athena_client import AwsAthenaClient
+from src.clients.aws_s3_client import AwsS3Client
+
+from tests import _raise
+from tests.test_types_generator import account, cloudtrail_task, partition, s3_task, task_report
+
+
+def run_task_1(client: AwsAthenaClient):
+    return {"outcome_1": "success_1"}
+
+
+def run_task_2(client: AwsS3Client):
+    return {"outcome_2": "success_2"}
+
+
+def run_failing_task(client: AwsAthenaClient):
+    _raise(AwsScannerException("oops"))
+
+
+class ConcurrencyProbe:
+    def __init__(self):
+        self._lock = Lock()
+        self._running = {}
+        self.max_running = {}
+
+    def run(self, key):
+        with self._lock:
+            self._running[key] = self._running.get(key, 0) + 1
+            self.max_running[key] = max(self.max_running.get(key, 0), self._running[key])
+        sleep(0.01)
+        with self._lock:
+            self._running[key] -= 1
+        return {"key": key}
+
+
+class TestAwsAsyncTaskRunner(TestCase):
+    def test_run_tasks(self) -> None:
+        succeeding_task_1 = cloudtrail_task(description="some task")
+        succeeding_task_1._run_task = run_task_1
+
+        succeeding_task_2 = s3_task(description="other task")
+        succeeding_task_2._run_task = run_task_2
+
+        failing_task = cloudtrail_task(account=account("5678", "wrong account"), description="boom")
+        failing_task._run_task = run_failing_task
+
+        with self.assertLogs("AwsAsyncTaskRunner", level="ERROR") as error_log:
+            reports = AwsAsyncTaskRunner(Mock()).run([succeeding_task_1, failing_task, succeeding_task_2])
+
+        self.assertEqual(2, len(reports), "there should only be two task reports")
+        self.assertIn(
+            task_report(description="some task", results={"outcome_1": "success_1"}, partition=partition()), reports
+        )
+        self.assertIn(
+            task_report(description="other task", results={"outcome_2": "success_2"}, partition=None), reports
+        )
+        expected_error_msg = (
+            f"ERROR:AwsAsyncTaskRunner:task 'boom' for 'wrong account (5678)' with {partition()} failed with: "
+            "'AwsScannerException: oops'"
+        )
+        self.assertEqual([expected_error_msg], error_log.output)
+
+    @patch.dict(os.environ, {"AWS_SCANNER_TASKS_ACCOUNT_CONCURRENCY": "2", "AWS_SCANNER_TASKS_EXECUTORS": "20"})
+    def test_concurrency_is_bounded_per_account(self) -> None:
+        probe = ConcurrencyProbe()
+        tasks = []
+        for acc in ["1", "2"]:
+            for i in range(6):
+                task = s3_task(account=account(acc), description=f"{acc}-{i}")
+                task._run_task = lambda client, acc=acc: probe.run(acc)
+                tasks.append(task)
+        self.assertEqual(12, len(AwsAsyncTaskRunner(Mock()).run(tasks)))
+        self.assertEqual({"1": 2, "2": 2}, probe.max_running)
+
+    @patch.dict(os.environ, {"AWS_SCANNER_TASKS_SERVICE_CONCURRENCY": "3", "AWS_SCANNER_TASKS_EXECUTORS": "20"})
+    def test_concurrency_is_bounded_per_service(self) -> None:
+        probe = ConcurrencyProbe()
+        tasks = []
+        for i in range(12):
+            task = s3_task(account=account(str(i)), description=f"task-{i}")
+            task._run_task = lambda client: probe.run("s3")
+            tasks.append(task)
+        self.assertEqual(12, len(AwsAsyncTaskRunner(Mock()).run(tasks)))
+        self.assertEqual({"s3": 3}, probe.max_running)
+
+    @patch.dict(os.environ, {"AWS_SCANNER_TASKS_EXECUTORS": "1"})
+    def test_stream_can_be_closed_early(self) -> None:
+        tasks = []
+        for i in range(5):
+            task = s3_task(account=account(str(i)), description=f"task-{i}")
+            task._run_task = run_task_2
+            tasks.append(task)
+        reports = AwsAsyncTaskRunner(Mock()).stream(tasks)
+        self.assertEqual({"outcome_2": "success_2"}, next(reports).results)
+        reports.close()
+
+    def test_tasks_are_not_started_once_scheduling_stopped(self) -> None:
+        task = s3_task(description="late task")
+        task._run_task = run_task_2
+        runner = AwsAsyncTaskRunner(Mock())
+        runner.finish_by(500)
+        with patch("src.aws_task_runner.monotonic", side_effect=[0, 1000]):
+            self.assertEqual([], runner.run([task]))
+        self.assertEqual(1, runner.unscheduled)
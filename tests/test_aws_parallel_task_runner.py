@@ -1,13 +1,20 @@
 # type: ignore
+import os
+
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import MagicMock, Mock, patch
 
 from src.aws_parallel_task_runner import AwsParallelTaskRunner
+from src.clients.aws_athena_scheduler import AwsAthenaScheduler
 from src.data.aws_scanner_exceptions import AwsScannerException
+from src.data.aws_task_report import AwsTaskReport
 from src.clients.aws_athena_client import AwsAthenaClient
 from src.clients.aws_s3_client import AwsS3Client
 
 from tests import _raise
+from tests.clients.test_aws_athena_scheduler import FakeAthena, unlimited
+from tests.tasks.test_aws_cloudtrail_query_task import CountTask, count_task
 from tests.test_types_generator import account, cloudtrail_task, partition, s3_task, task_report
 
 
@@ -23,6 +30,16 @@ def run_failing_task(client: AwsAthenaClient):
     _raise(AwsScannerException("oops"))
 
 
+def completed(report: AwsTaskReport) -> Future:
+    future = Future()
+    future.set_result(report)
+    return future
+
+
+def athena_scheduler(athena: FakeAthena, executor: Executor) -> AwsAthenaScheduler:
+    return AwsAthenaScheduler(lambda: athena, unlimited(), executor)
+
+
 class TestAwsParallelTaskRunner(TestCase):
     def test_run_tasks(self) -> None:
         succeeding_task_1 = cloudtrail_task(description="some task")
@@ -52,3 +69,101 @@ class TestAwsParallelTaskRunner(TestCase):
             "'AwsScannerException: oops'"
         )
         self.assertEqual([expected_error_msg], error_log.output)
+
+    @patch.dict(os.environ, {"AWS_SCANNER_TASKS_EXECUTORS": "2", "AWS_SCANNER_ATHENA_PIPELINED_TASKS": "0"})
+    def test_stream_tasks_bounds_tasks_in_flight(self) -> None:
+        pulled = []
+
+        def tasks():
+            for i in range(20):
+                task = s3_task(description=f"task {i}")
+                task._run_task = run_task_2
+                pulled.append(task)
+                yield task
+
+        reports = AwsParallelTaskRunner(Mock()).stream(tasks())
+        next(reports)
+        self.assertLessEqual(len(pulled), 5)
+        self.assertEqual(19, len(list(reports)))
+        self.assertEqual(20, len(pulled))
+
+    @patch.dict(os.environ, {"AWS_SCANNER_ATHENA_PIPELINED_TASKS": "1"})
+    @patch.object(CountTask, "_query_readers", Mock(return_value=2))
+    def test_athena_query_tasks_are_pipelined(self) -> None:
+        athena = FakeAthena()
+        factory = Mock(get_athena_scheduler=Mock(side_effect=lambda executor: athena_scheduler(athena, executor)))
+        durations = Mock(order=Mock(side_effect=lambda tasks: tasks))
+        other_task = s3_task(description="other task")
+        other_task._run_task = run_task_2
+        tasks = [count_task(), other_task, count_task()]
+
+        reports = AwsParallelTaskRunner(factory, durations).run(tasks)
+
+        self.assertEqual(2, reports.count(task_report(results={"count": 1})))
+        self.assertIn(
+            task_report(description="other task", results={"outcome_2": "success_2"}, partition=None), reports
+        )
+        self.assertEqual(3, len(athena.queries))
+        self.assertEqual(1, len([query for query in athena.queries if query.startswith("SELECT COUNT(1)")]))
+        dropped = [c.kwargs["query"] for c in factory.get_athena_client.return_value.run_query.call_args_list]
+        self.assertEqual(["DROP TABLE `account_id`", f"DROP DATABASE `{tasks[0]._database}`"], dropped)
+        self.assertEqual(tasks[0]._database, tasks[2]._database)
+        factory.get_athena_scheduler.assert_called_once()
+        self.assertIsInstance(factory.get_athena_scheduler.call_args.args[0], ThreadPoolExecutor)
+        self.assertEqual(3, durations.record.call_count)
+
+    @patch.dict(os.environ, {"AWS_SCANNER_TASKS_EXECUTORS": "2"})
+    def test_stream_tasks_bounds_tasks_waiting_for_a_slot(self) -> None:
+        pulled = []
+
+        def tasks():
+            for i in range(20):
+                task = s3_task(description=f"task {i}")
+                task._run_task = run_task_2
+                pulled.append(task)
+                yield task
+
+        reports = AwsParallelTaskRunner(Mock()).stream(tasks())
+        next(reports)
+        self.assertLessEqual(len(pulled), 9)
+        self.assertEqual(19, len(list(reports)))
+
+    @patch.dict(os.environ, {"AWS_SCANNER_TASKS_EXECUTORS": "1", "AWS_SCANNER_ATHENA_PIPELINED_TASKS": "1"})
+    def test_tasks_start_when_their_own_limit_has_room(self) -> None:
+        pending: Future[AwsTaskReport] = Future()
+        scheduler = Mock(submit=Mock(side_effect=[pending, completed(task_report(description="second"))]))
+        context = MagicMock(__enter__=Mock(return_value=scheduler))
+        threaded_task = s3_task(description="other task")
+        threaded_task._run_task = run_task_2
+
+        reports = AwsParallelTaskRunner(Mock(get_athena_scheduler=Mock(return_value=context))).stream(
+            [count_task(), count_task(), threaded_task]
+        )
+
+        self.assertEqual(
+            task_report(description="other task", results={"outcome_2": "success_2"}, partition=None), next(reports)
+        )
+        self.assertEqual(1, scheduler.submit.call_count)
+        pending.set_result(task_report(description="first"))
+        self.assertEqual([task_report(description="first"), task_report(description="second")], list(reports))
+
+    @patch.dict(os.environ, {"AWS_SCANNER_ATHENA_PIPELINED_TASKS": "1", "AWS_SCANNER_ATHENA_SHARED_TABLES": "false"})
+    def test_pipelined_tasks_without_shared_tables(self) -> None:
+        athena = FakeAthena()
+        factory = Mock(get_athena_scheduler=Mock(side_effect=lambda executor: athena_scheduler(athena, executor)))
+
+        reports = AwsParallelTaskRunner(factory).run([count_task(), count_task()])
+
+        self.assertEqual([task_report(results={"count": 1})] * 2, reports)
+        self.assertEqual(10, len(athena.queries))
+        factory.get_athena_client.assert_not_called()
+
+    @patch.dict(os.environ, {"AWS_SCANNER_ATHENA_PIPELINED_TASKS": "0"})
+    def test_pipelining_can_be_disabled(self) -> None:
+        factory = Mock()
+        task = count_task()
+        task.run = Mock(return_value=task_report())
+
+        self.assertEqual([task_report()], AwsParallelTaskRunner(factory).run([task]))
+        task.run.assert_called_once_with(factory.get_athena_client.return_value)
+        factory.get_athena_scheduler.assert_not_called()
@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from unittest.mock import Mock, patch
+
+from src.aws_process_pool_task_runner import AwsProcessPoolTaskRunner, run_shard
+from src.aws_scanner_payload import from_payload, to_payload
+from src.clients.composite.aws_s3_kms_client import AwsS3KmsClient
+from src.data.aws_scanner_exceptions import AwsScannerException
+from src.tasks.aws_task import AwsTask
+
+from tests.test_types_generator import account, task_report
+
+
+class PicklableFactory:
+    def get_s3_kms_client(self, _: Any) -> None:
+        return None
+
+
+class S3Task(AwsTask):
+    def _run_task(self, client: AwsS3KmsClient) -> Dict[Any, Any]:
+        if self._description == "boom":
+            raise AwsScannerException("oops")
+        return {"task": self._description}
+
+
+def s3_task(description: str, account_id: str) -> S3Task:
+    return S3Task(description, account(account_id, f"account {account_id}"))
+
+
+def test_tasks_are_sharded_by_account() -> None:
+    tasks = [
+        s3_task(f"{acc}-{i}", acc) for acc, count in [("1", 3), ("2", 1), ("3", 2), ("4", 2)] for i in range(count)
+    ]
+    shards = AwsProcessPoolTaskRunner(Mock(), processes=2, log_level="ERROR")._shard(tasks)
+    assert [[t.account.identifier for t in shard] for shard in shards] == [["1", "1", "1", "2"], ["3", "3", "4", "4"]]
+
+
+def test_no_more_shards_than_accounts() -> None:
+    tasks = [s3_task("a", "1"), s3_task("b", "1")]
+    assert 1 == len(AwsProcessPoolTaskRunner(Mock(), processes=8, log_level="ERROR")._shard(tasks))
+
+
+def test_run_shard() -> None:
+    reports = from_payload(run_shard(to_payload((PicklableFactory(), [s3_task("a", "1"), s3_task("boom", "1")]))))
+    assert reports == [task_report(account("1", "account 1"), "a", None, {"task": "a"})]
+
+
+def test_stream_tasks_merges_shard_reports() -> None:
+    runner = AwsProcessPoolTaskRunner(PicklableFactory(), processes=2, log_level="ERROR")  # type: ignore
+    tasks = [s3_task("a", "1"), s3_task("b", "2"), s3_task("c", "2")]
+    with patch.object(runner, "_executor", side_effect=lambda workers: ThreadPoolExecutor(workers)):
+        reports = runner.run(tasks)
+    assert sorted(report.description for report in reports) == ["a", "b", "c"]
+
+
+def test_failing_shard_is_logged() -> None:
+    runner = AwsProcessPoolTaskRunner(PicklableFactory(), processes=2, log_level="ERROR")  # type: ignore
+    tasks = [s3_task("a", "1"), s3_task("b", "2")]
+    with patch.object(runner, "_executor", side_effect=lambda workers: ThreadPoolExecutor(workers)):
+        with patch("src.aws_process_pool_task_runner.run_shard", side_effect=[to_payload([]), RuntimeError("dead")]):
+            with patch.object(runner._logger, "error") as error:
+                assert [] == list(runner.stream(tasks))
+    error.assert_called_once_with("shard of 1 tasks failed with: 'RuntimeError: dead'")
+
+
+def test_shards_run_in_spawned_processes() -> None:
+    runner = AwsProcessPoolTaskRunner(PicklableFactory(), processes=2, log_level="ERROR")  # type: ignore
+    with patch("src.aws_process_pool_task_runner.ProcessPoolExecutor") as executor:
+        runner._executor(2)
+    assert executor.call_args.kwargs["max_workers"] == 2
+    assert executor.call_args.kwargs["mp_context"].get_start_method() == "spawn"
+    assert executor.call_args.kwargs["initargs"] == ("ERROR",)
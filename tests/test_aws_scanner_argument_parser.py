@@ -163,6 +163,62 @@ def test_parse_cli_args_for_audit_s3_task() -> None:
         assert args.log_level == "ERROR"
         assert args.disable_account_lookup is False
         assert args.parent == "prod"
+        assert args.processes == 1
+        assert args.resume is None
+        assert args.plan == 0
+        assert args.shard is None
+
+
+def test_parse_cli_args_with_processes() -> None:
+    with patch("sys.argv", ". audit_s3 -t 446468 -pr 8".split()):
+        short_args = AwsScannerArgumentParser().parse_cli_args()
+
+    with patch("sys.argv", ". audit_s3 --token 446468 --processes 8".split()):
+        long_args = AwsScannerArgumentParser().parse_cli_args()
+
+    assert short_args.processes == long_args.processes == 8
+
+
+def test_parse_cli_args_with_resume() -> None:
+    with patch("sys.argv", ". audit_s3 -t 446468 -rs 0a1b2c".split()):
+        short_args = AwsScannerArgumentParser().parse_cli_args()
+
+    with patch("sys.argv", ". audit_s3 --token 446468 --resume 0a1b2c".split()):
+        long_args = AwsScannerArgumentParser().parse_cli_args()
+
+    assert short_args.resume == long_args.resume == "0a1b2c"
+
+
+def test_parse_cli_args_with_shards() -> None:
+    with patch("sys.argv", ". audit_s3 -t 446468 -pl 4".split()):
+        short_plan = AwsScannerArgumentParser().parse_cli_args()
+
+    with patch("sys.argv", ". audit_s3 --token 446468 --plan 4".split()):
+        long_plan = AwsScannerArgumentParser().parse_cli_args()
+
+    with patch("sys.argv", ". audit_s3 -t 446468 -a 1,2 -sh 0a1b2c".split()):
+        short_shard = AwsScannerArgumentParser().parse_cli_args()
+
+    with patch("sys.argv", ". audit_s3 --token 446468 --accounts 1,2 --shard 0a1b2c".split()):
+        long_shard = AwsScannerArgumentParser().parse_cli_args()
+
+    assert short_plan.plan == long_plan.plan == 4
+    assert short_shard.shard == long_shard.shard == "0a1b2c"
+    assert short_shard.accounts == long_shard.accounts == ["1", "2"]
+
+
+def test_parse_cli_args_for_merge_task() -> None:
+    with patch("sys.argv", ". merge -t 446468 -sh 0a1b2c -mt audit_s3 -v info".split()):
+        short_args = AwsScannerArgumentParser().parse_cli_args()
+
+    with patch("sys.argv", ". merge --token 446468 --shard 0a1b2c --merged_task audit_s3 --verbosity info".split()):
+        long_args = AwsScannerArgumentParser().parse_cli_args()
+
+    for args in [short_args, long_args]:
+        assert args.task == "merge"
+        assert args.shard == "0a1b2c"
+        assert args.merged_task == "audit_s3"
+        assert args.log_level == "INFO"
 
 
 def test_parse_cli_args_for_audit_vpc_flow_logs_task() -> None:
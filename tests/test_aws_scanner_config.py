@@ -1,4 +1,5 @@
-from unittest.mock import mock_open, patch
+import pickle
+from unittest.mock import call, mock_open, patch
 
 
 import pytest
@@ -10,6 +11,7 @@ import os
 from src.aws_scanner_config import AwsScannerConfig
 from src.clients.aws_s3_client import AwsS3Client
 from src.data.aws_organizations_types import Account
+from src.data.aws_s3_types import S3Object
 
 
 def test_init_config_from_file() -> None:
@@ -27,8 +29,13 @@ def test_init_config_from_file() -> None:
     assert 90 == config.cloudtrail_logs_retention_days()
     assert "cloudtrail_role" == config.cloudtrail_role()
     assert 0 == config.athena_query_results_polling_delay_seconds()
+    assert 10 == config.athena_query_results_polling_max_delay_seconds()
     assert 1200 == config.athena_query_timeout_seconds()
-    assert 0 == config.athena_query_throttling_seconds()
+    assert 20 == config.athena_query_rate_per_second()
+    assert 80 == config.athena_query_burst()
+    assert 20 == config.athena_max_running_queries()
+    assert 100 == config.athena_pipelined_tasks()
+    assert config.athena_shared_tables()
     assert "ec2_role" == config.ec2_role()
     assert "route53_role" == config.route53_role()
     assert "ACTIVE" == config.ec2_flow_log_status()
@@ -60,10 +67,12 @@ def test_init_config_from_file() -> None:
     assert "orgs_role" == config.organization_role()
     assert config.organization_include_root_accounts()
     assert "Parent OU" == config.organization_parent()
+    assert 300 == config.organization_accounts_ttl_seconds()
     assert "stdout" == config.reports_output()
     assert Account("333222333222", "reports") == config.reports_account()
     assert "s3_reports_role" == config.reports_role()
     assert "scanner-reports-bucket", config.reports_bucket()
+    assert "" == config.reports_checkpoints()
     assert "s3_role" == config.s3_role()
     assert 3600 == config.session_duration_seconds()
     assert "ssm_role" == config.ssm_role()
@@ -87,8 +96,13 @@ def test_init_config_from_file() -> None:
         "AWS_SCANNER_ATHENA_FLOW_LOGS_BUCKET": "a-flow-logs-bucket",
         "AWS_SCANNER_ATHENA_QUERY_RESULTS_BUCKET": "a-query-results-bucket",
         "AWS_SCANNER_ATHENA_QUERY_RESULTS_POLLING_DELAY_SECONDS": "2",
+        "AWS_SCANNER_ATHENA_QUERY_RESULTS_POLLING_MAX_DELAY_SECONDS": "16",
         "AWS_SCANNER_ATHENA_QUERY_TIMEOUT_SECONDS": "900",
-        "AWS_SCANNER_ATHENA_QUERY_THROTTLING_SECONDS": "3",
+        "AWS_SCANNER_ATHENA_QUERY_RATE_PER_SECOND": "3",
+        "AWS_SCANNER_ATHENA_QUERY_BURST": "6",
+        "AWS_SCANNER_ATHENA_MAX_RUNNING_QUERIES": "9",
+        "AWS_SCANNER_ATHENA_PIPELINED_TASKS": "12",
+        "AWS_SCANNER_ATHENA_SHARED_TABLES": "false",
         "AWS_SCANNER_ATHENA_ROLE": "the_athena_role",
         "AWS_SCANNER_CLOUDTRAIL_ACCOUNT": "464878555331",
         "AWS_SCANNER_CLOUDTRAIL_EVENT_KEY_ID": "9874565",
@@ -127,10 +141,12 @@ def test_init_config_from_file() -> None:
         "AWS_SCANNER_ORGANIZATION_ROLE": "the_orgs_role",
         "AWS_SCANNER_ORGANIZATION_INCLUDE_ROOT_ACCOUNTS": "false",
         "AWS_SCANNER_ORGANIZATION_PARENT": "The Parent OU",
+        "AWS_SCANNER_ORGANIZATION_ACCOUNTS_TTL_SECONDS": "60",
         "AWS_SCANNER_REPORTS_OUTPUT": "s3",
         "AWS_SCANNER_REPORTS_ACCOUNT": "565656565656",
         "AWS_SCANNER_REPORTS_ROLE": "the_s3_report_role",
         "AWS_SCANNER_REPORTS_BUCKET": "a-scanner-reports-bucket",
+        "AWS_SCANNER_REPORTS_CHECKPOINTS": "s3://a-checkpoints-bucket/scanner",
         "AWS_SCANNER_S3_ROLE": "the_s3_role",
         "AWS_SCANNER_SESSION_DURATION_SECONDS": "120",
         "AWS_SCANNER_SSM_ROLE": "the_ssm_role",
@@ -147,8 +163,13 @@ def test_init_config_from_env_vars() -> None:
     assert "a-flow-logs-bucket" == config.athena_flow_logs_bucket()
     assert "a-query-results-bucket" == config.athena_query_results_bucket()
     assert 2 == config.athena_query_results_polling_delay_seconds()
+    assert 16 == config.athena_query_results_polling_max_delay_seconds()
     assert 900 == config.athena_query_timeout_seconds()
-    assert 3 == config.athena_query_throttling_seconds()
+    assert 3 == config.athena_query_rate_per_second()
+    assert 6 == config.athena_query_burst()
+    assert 9 == config.athena_max_running_queries()
+    assert 12 == config.athena_pipelined_tasks()
+    assert not config.athena_shared_tables()
     assert "the_athena_role" == config.athena_role()
     assert Account("464878555331", "cloudtrail") == config.cloudtrail_account()
     assert "9874565" == config.cloudtrail_event_key_id()
@@ -175,10 +196,12 @@ def test_init_config_from_env_vars() -> None:
     assert "the_orgs_role" == config.organization_role()
     assert not config.organization_include_root_accounts()
     assert "The Parent OU" == config.organization_parent()
+    assert 60 == config.organization_accounts_ttl_seconds()
     assert "s3" == config.reports_output()
     assert Account("565656565656", "reports") == config.reports_account()
     assert "the_s3_report_role" == config.reports_role()
     assert "a-scanner-reports-bucket" == config.reports_bucket()
+    assert "s3://a-checkpoints-bucket/scanner" == config.reports_checkpoints()
     assert "the_s3_role" == config.s3_role()
     assert 120 == config.session_duration_seconds()
     assert "the_ssm_role" == config.ssm_role()
@@ -232,10 +255,175 @@ def test_invalid_type_for_int_config_item() -> None:
 
 @patch.dict(os.environ, {"AWS_SCANNER_CONFIG_BUCKET": "conf-buck"})
 def test_load_config_from_s3() -> None:
-    conf = "[iam]\nrole = TheIamRole"
+    conf = S3Object(content="[iam]\nrole = TheIamRole", etag='"v1"')
     with patch.object(
         AwsS3Client,
-        "get_object",
+        "get_object_if_none_match",
         side_effect=lambda b, k: conf if b == "conf-buck" and k == "aws_scanner_config.ini" else None,
     ):
         assert AwsScannerConfig().iam_role() == "TheIamRole"
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_CONFIG_BUCKET": "conf-buck"})
+def test_config_is_loaded_once_per_process() -> None:
+    with patch.object(
+        AwsS3Client, "get_object_if_none_match", return_value=S3Object("[iam]\nrole = TheIamRole")
+    ) as get_object:
+        assert [AwsScannerConfig().iam_role() for _ in range(3)] == ["TheIamRole"] * 3
+    get_object.assert_called_once()
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_CONFIG_BUCKET": "conf-buck"})
+def test_reload_config() -> None:
+    with patch.object(
+        AwsS3Client,
+        "get_object_if_none_match",
+        side_effect=[S3Object("[iam]\nrole = OldRole"), S3Object("[iam]\nrole = NewRole")],
+    ):
+        assert AwsScannerConfig().iam_role() == "OldRole"
+        AwsScannerConfig.reload()
+        assert AwsScannerConfig().iam_role() == "NewRole"
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_CONFIG_BUCKET": "conf-buck"})
+def test_revalidate_config_when_changed() -> None:
+    with patch("src.aws_scanner_config.monotonic", side_effect=[0, 60, 60]), patch.object(
+        AwsS3Client,
+        "get_object_if_none_match",
+        side_effect=[S3Object("[iam]\nrole = OldRole", '"v1"'), S3Object("[iam]\nrole = NewRole", '"v2"')],
+    ) as get_object:
+        assert AwsScannerConfig().iam_role() == "OldRole"
+        AwsScannerConfig.revalidate()
+        assert AwsScannerConfig().iam_role() == "NewRole"
+    assert get_object.call_args_list == [
+        call("conf-buck", "aws_scanner_config.ini"),
+        call("conf-buck", "aws_scanner_config.ini", '"v1"'),
+    ]
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_CONFIG_BUCKET": "conf-buck"})
+def test_revalidate_config_when_not_modified() -> None:
+    with patch("src.aws_scanner_config.monotonic", side_effect=[0, 60, 60]), patch.object(
+        AwsS3Client, "get_object_if_none_match", side_effect=[S3Object("[iam]\nrole = OldRole", '"v1"'), None]
+    ) as get_object:
+        config = AwsScannerConfig()
+        AwsScannerConfig.revalidate()
+        assert AwsScannerConfig().iam_role() == "OldRole"
+        assert AwsScannerConfig()._config is config._config
+    assert get_object.call_count == 2
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_CONFIG_BUCKET": "conf-buck", "AWS_SCANNER_CONFIG_REVALIDATION_SECONDS": "30"})
+def test_revalidate_config_at_most_once_per_interval() -> None:
+    with patch("src.aws_scanner_config.monotonic", side_effect=[0, 29, 30, 30, 59]), patch.object(
+        AwsS3Client, "get_object_if_none_match", side_effect=[S3Object("[iam]\nrole = OldRole", '"v1"'), None]
+    ) as get_object:
+        AwsScannerConfig()
+        AwsScannerConfig.revalidate()
+        AwsScannerConfig.revalidate()
+        AwsScannerConfig.revalidate()
+    assert get_object.call_count == 2
+
+
+def test_revalidate_config_without_bucket_is_noop() -> None:
+    with patch.object(AwsS3Client, "get_object_if_none_match") as get_object:
+        AwsScannerConfig()
+        AwsScannerConfig.revalidate()
+    get_object.assert_not_called()
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_CONFIG_BUCKET": "conf-buck"})
+def test_revalidate_config_before_first_load_is_noop() -> None:
+    with patch.object(AwsS3Client, "get_object_if_none_match") as get_object:
+        AwsScannerConfig.revalidate()
+    get_object.assert_not_called()
+
+
+def test_config_snapshot_is_immutable() -> None:
+    with pytest.raises(TypeError):
+        AwsScannerConfig()._config["iam"]["role"] = "another_role"  # type: ignore
+
+
+def test_derived_config_values_are_precomputed() -> None:
+    config = AwsScannerConfig()
+    assert config.iam_password_policy() is AwsScannerConfig().iam_password_policy()
+    assert config.logs_vpc_flow_log_group_config() is AwsScannerConfig().logs_vpc_flow_log_group_config()
+    assert (
+        config.logs_vpc_log_group_delivery_role_policy_document()
+        is AwsScannerConfig().logs_vpc_log_group_delivery_role_policy_document()
+    )
+
+
+def test_environment_overrides_apply_to_derived_config_values() -> None:
+    assert AwsScannerConfig().logs_vpc_flow_log_group_config().logs_group_retention_policy_days == 14
+    with patch.dict(os.environ, {"AWS_SCANNER_LOGS_VPC_LOG_GROUP_RETENTION_POLICY_DAYS": "21"}):
+        assert AwsScannerConfig().logs_vpc_flow_log_group_config().logs_group_retention_policy_days == 21
+
+
+def test_optional_config_defaults() -> None:
+    assert AwsScannerConfig()._get_int_config("organization", "not_in_config_file", "42") == 42
+
+
+def test_config_is_current_until_reloaded() -> None:
+    config = AwsScannerConfig()
+    assert config.is_current()
+    AwsScannerConfig.reload()
+    assert not config.is_current()
+
+
+def test_concurrency_limits() -> None:
+    assert {"organizations": 1, "iam": 4} == AwsScannerConfig().concurrency_limits()
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_CONCURRENCY_IAM": "0"})
+def test_invalid_concurrency_limit() -> None:
+    with pytest.raises(SystemExit, match="limit must be at least 1"):
+        AwsScannerConfig().concurrency_limits()
+
+
+def test_config_is_picklable() -> None:
+    assert "iam_role" == pickle.loads(pickle.dumps(AwsScannerConfig())).iam_role()
+
+
+def test_tasks_runner_config() -> None:
+    config = AwsScannerConfig()
+    assert config.tasks_durations_file().endswith("aws_scanner_task_durations.json")
+    assert "threads" == config.tasks_runner()
+    assert 4 == config.tasks_account_concurrency()
+    assert 10 == config.tasks_service_concurrency()
+    assert 25 == config.tasks_sub_task_size()
+    assert 4 == config.tasks_sub_task_executors()
+    assert 120 == config.tasks_continuation_margin_seconds()
+    assert 0 == config.tasks_timeout_seconds()
+    assert 0 == config.tasks_run_timeout_seconds()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "AWS_SCANNER_TASKS_RUNNER": "async",
+        "AWS_SCANNER_TASKS_ACCOUNT_CONCURRENCY": "2",
+        "AWS_SCANNER_TASKS_SERVICE_CONCURRENCY": "50",
+        "AWS_SCANNER_TASKS_SUB_TASK_SIZE": "5",
+        "AWS_SCANNER_TASKS_SUB_TASK_EXECUTORS": "2",
+        "AWS_SCANNER_TASKS_CONTINUATION_MARGIN_SECONDS": "60",
+        "AWS_SCANNER_TASKS_TIMEOUT_SECONDS": "120",
+        "AWS_SCANNER_TASKS_RUN_TIMEOUT_SECONDS": "840",
+    },
+)
+def test_tasks_runner_config_from_environment() -> None:
+    config = AwsScannerConfig()
+    assert "async" == config.tasks_runner()
+    assert 2 == config.tasks_account_concurrency()
+    assert 50 == config.tasks_service_concurrency()
+    assert 5 == config.tasks_sub_task_size()
+    assert 2 == config.tasks_sub_task_executors()
+    assert 60 == config.tasks_continuation_margin_seconds()
+    assert 120 == config.tasks_timeout_seconds()
+    assert 840 == config.tasks_run_timeout_seconds()
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_TASKS_RUNNER": "fibers"})
+def test_unsupported_tasks_runner() -> None:
+    with pytest.raises(SystemExit):
+        AwsScannerConfig().tasks_runner()
@@ -0,0 +1,98 @@
+import os
+
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, Mock, patch
+
+from src.aws_scanner_lambda import CONTINUATION_TOKEN, SHARDS, from_continuation_token, handle, to_continuation_token
+from src.tasks.aws_task import AwsTask
+from src.clients.aws_s3_client import AwsS3Client
+from src.data.aws_scanner_exceptions import TaskDeadlineException
+
+from tests.test_types_generator import account
+
+
+class FakeContext:
+    def __init__(self, remaining_millis: int):
+        self._remaining_millis = remaining_millis
+
+    def get_remaining_time_in_millis(self) -> int:
+        return self._remaining_millis
+
+
+class FakeS3Task(AwsTask):
+    def _run_task(self, client: AwsS3Client) -> Dict[Any, Any]:
+        return {"bucket": self._description}
+
+
+def fake_tasks() -> List[AwsTask]:
+    return [FakeS3Task(f"task {i}", account(str(i), f"account {i}")) for i in range(3)]
+
+
+def test_continuation_token_round_trip() -> None:
+    token = to_continuation_token({"task": "audit_s3", "accounts": "1,2"}, "run-1")
+    assert {"task": "audit_s3", "accounts": "1,2", "resume": "run-1"} == from_continuation_token(token)
+
+
+@patch("src.aws_scanner_lambda.AwsScannerConfig")
+@patch("src.aws_scanner_lambda.monotonic", return_value=1000)
+def test_finished_run_returns_no_continuation(_: Mock, config: Mock) -> None:
+    with patch("src.aws_scanner_lambda.AwsScannerMain", return_value=Mock(unfinished_run=None, shards=None)) as main:
+        assert handle({"task": "audit_s3"}, FakeContext(900_000), Mock()) is None
+    config.revalidate.assert_called_once()
+    args, warm_state, finish_by = main.call_args.args
+    assert "audit_s3" == args.task
+    assert 1900 == finish_by
+
+
+@patch("src.aws_scanner_lambda.AwsScannerConfig")
+def test_continued_run_resumes_from_token(_: Mock) -> None:
+    token = to_continuation_token({"task": "audit_s3"}, "run-1")
+    with patch("src.aws_scanner_lambda.AwsScannerMain", return_value=Mock(unfinished_run="run-1", shards=None)) as main:
+        response = handle({CONTINUATION_TOKEN: token}, FakeContext(900_000), Mock())
+    assert "run-1" == main.call_args.args[0].resume
+    assert {CONTINUATION_TOKEN: token} == response
+
+
+@patch("src.aws_scanner_lambda.AwsScannerConfig")
+def test_plan_returns_the_shard_descriptors(_: Mock) -> None:
+    shards = [{"accounts": "1,2", "shard": "run-1"}, {"accounts": "3", "shard": "run-1"}]
+    with patch("src.aws_scanner_lambda.AwsScannerMain", return_value=Mock(unfinished_run=None, shards=shards)):
+        assert {SHARDS: shards} == handle({"task": "audit_s3", "plan": 2}, FakeContext(900_000), Mock())
+
+
+def test_late_run_is_continued_by_next_invocation(tmp_path: Path) -> None:
+    output = Mock(write=Mock(side_effect=lambda task, reports: written.append(list(reports))))
+    written: List[Any] = []
+    with patch.dict(os.environ, {"AWS_SCANNER_REPORTS_CHECKPOINTS": str(tmp_path)}):
+        with patch("src.aws_scanner_main.AwsClientFactory"), patch(
+            "src.aws_scanner_main.AwsTaskDurations", return_value=None
+        ):
+            with patch("src.aws_scanner_main.AwsTaskBuilder", side_effect=lambda *_: Mock(build_tasks=fake_tasks)):
+                with patch("src.aws_scanner_main.AwsScannerOutput", return_value=output):
+                    with patch("src.aws_scanner_lambda.AwsScannerConfig"):
+                        response = handle({"task": "audit_s3"}, FakeContext(60_000), MagicMock())
+                        assert response and [] == written[0]
+                        assert handle(response, FakeContext(900_000), MagicMock()) is None
+    assert ["task 0", "task 1", "task 2"] == sorted(report.results["bucket"] for report in written[1])
+
+
+class TimedOutS3Task(AwsTask):
+    def _run_task(self, client: AwsS3Client) -> Dict[Any, Any]:
+        raise TaskDeadlineException("deadline exceeded")
+
+
+def test_timed_out_tasks_are_not_continued(tmp_path: Path) -> None:
+    output = Mock(write=Mock(side_effect=lambda task, reports: written.append(list(reports))))
+    written: List[Any] = []
+    env = {"AWS_SCANNER_REPORTS_CHECKPOINTS": str(tmp_path), "AWS_SCANNER_TASKS_TIMEOUT_SECONDS": "60"}
+    tasks = [TimedOutS3Task("slow task", account())]
+    with patch.dict(os.environ, env):
+        with patch("src.aws_scanner_main.AwsClientFactory"), patch(
+            "src.aws_scanner_main.AwsTaskDurations", return_value=None
+        ):
+            with patch("src.aws_scanner_main.AwsTaskBuilder", side_effect=lambda *_: Mock(build_tasks=lambda: tasks)):
+                with patch("src.aws_scanner_main.AwsScannerOutput", return_value=output):
+                    with patch("src.aws_scanner_lambda.AwsScannerConfig"):
+                        assert handle({"task": "audit_s3"}, FakeContext(900_000), MagicMock()) is None
+    assert [True] == [report.incomplete for report in written[0]]
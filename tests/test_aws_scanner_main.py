@@ -1,18 +1,48 @@
+import json
+import os
+
+from contextlib import redirect_stdout
+from io import StringIO
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
+from src.aws_async_task_runner import AwsAsyncTaskRunner
+from src.aws_parallel_task_runner import AwsParallelTaskRunner
+from src.aws_process_pool_task_runner import AwsProcessPoolTaskRunner
 from src.aws_scanner_main import AwsScannerMain
+from src.aws_task_checkpoints import LocalCheckpointStore, S3CheckpointStore
+from src.clients.aws_s3_client import AwsS3Client
 from src.data.aws_scanner_exceptions import ClientFactoryException
+from src.tasks.aws_task import AwsTask
 
-from tests.test_types_generator import aws_scanner_arguments, aws_task, task_report
+from tests.test_types_generator import account, aws_scanner_arguments, aws_task, task_report
 
 
-mock_factory = Mock()
+mock_factory = Mock(unused_clients=Mock(return_value={"iam client for a": 2, "s3 client for b": 1}))
 tasks = [aws_task(description="task_1"), aws_task(description="task_2")]
 mock_task_builder = Mock(build_tasks=Mock(return_value=tasks))
 reports = [task_report(description="report_1"), task_report(description="report_2")]
-mock_task_runner = Mock(run=Mock(return_value=reports))
+mock_task_runner = Mock(stream=Mock(return_value=iter(reports)))
 mock_output = Mock()
+mock_durations = Mock()
+
+
+class FakeS3Task(AwsTask):
+    def _run_task(self, client: AwsS3Client) -> Dict[Any, Any]:
+        return {"buckets": [f"bucket of {self._account.identifier}"]}
+
+
+def fake_task_builder(_: Any, args: Any, __: Any) -> Mock:
+    accounts: List[str] = args.accounts or ["1", "2", "3", "4", "5"]
+    return Mock(build_tasks=Mock(return_value=[FakeS3Task("fake", account(acc, f"account {acc}")) for acc in accounts]))
+
+
+def run_main(args: Any) -> str:
+    with redirect_stdout(StringIO()) as stdout:
+        AwsScannerMain(args)
+    return stdout.getvalue()
 
 
 class TestMain(TestCase):
@@ -20,16 +50,41 @@ class TestMain(TestCase):
     @patch("src.aws_scanner_main.AwsTaskBuilder", return_value=mock_task_builder)
     @patch("src.aws_scanner_main.AwsParallelTaskRunner", return_value=mock_task_runner)
     @patch("src.aws_scanner_main.AwsScannerOutput", return_value=mock_output)
-    def test_main(self, output: Mock, task_runner: Mock, task_builder: Mock, factory: Mock) -> None:
+    @patch("src.aws_scanner_main.AwsTaskDurations", return_value=mock_durations)
+    def test_main(self, _: Mock, output: Mock, task_runner: Mock, task_builder: Mock, factory: Mock) -> None:
         args = aws_scanner_arguments(task="service_usage", services=["ssm"], year=2020, month=10, region="us")
-        AwsScannerMain(args)
+        with self.assertLogs("AwsScannerMain", level="DEBUG") as logs:
+            AwsScannerMain(args)
+        self.assertIn("INFO:AwsScannerMain:3 clients were never used", logs.output)
+        self.assertIn(
+            "DEBUG:AwsScannerMain:clients that were never used: {'iam client for a': 2, 's3 client for b': 1}",
+            logs.output,
+        )
         factory.assert_called_once_with(mfa="123456", username="bob")
-        task_builder.assert_called_once_with(mock_factory, args)
+        task_builder.assert_called_once_with(mock_factory, args, None)
         mock_task_builder.build_tasks.assert_called_once()
-        task_runner.assert_called_once_with(mock_factory)
-        mock_task_runner.run.assert_called_once_with(tasks)
+        task_runner.assert_called_once_with(mock_factory, mock_durations, None)
+        mock_task_runner.stream.assert_called_once_with(tasks)
         output.assert_called_once_with(mock_factory)
-        mock_output.write.assert_called_once_with("service_usage", reports)
+        mock_output.write.assert_called_once()
+        self.assertEqual("service_usage", mock_output.write.call_args.args[0])
+        self.assertEqual(reports, list(mock_output.write.call_args.args[1]))
+
+    @patch("src.aws_scanner_main.AwsClientFactory")
+    @patch("src.aws_scanner_main.AwsTaskBuilder", return_value=mock_task_builder)
+    @patch("src.aws_scanner_main.AwsParallelTaskRunner", return_value=mock_task_runner)
+    @patch("src.aws_scanner_main.AwsScannerOutput", return_value=mock_output)
+    @patch("src.aws_scanner_main.AwsTaskDurations", return_value=mock_durations)
+    def test_main_with_warm_state(
+        self, _: Mock, __: Mock, task_runner: Mock, task_builder: Mock, factory: Mock
+    ) -> None:
+        warm_state = Mock(factory=Mock(return_value=mock_factory))
+        args = aws_scanner_arguments(task="audit_s3")
+        AwsScannerMain(args, warm_state)
+        factory.assert_not_called()
+        warm_state.factory.assert_called_once_with(mfa="123456", username="bob")
+        task_builder.assert_called_once_with(mock_factory, args, warm_state)
+        task_runner.assert_called_once_with(mock_factory, mock_durations, None)
 
     @patch("src.aws_scanner_main.AwsClientFactory", side_effect=ClientFactoryException)
     def test_main_failure(self, _: Mock) -> None:
@@ -38,3 +93,171 @@ class TestMain(TestCase):
                 AwsScannerMain(aws_scanner_arguments(task="drop"))
         self.assertEqual(1, se.exception.code, f"exit code should be 1 but got {se.exception.code}")
         self.assertIn("ClientFactoryException", error_log.output[0])
+
+    def test_task_runner_selection(self) -> None:
+        self.assertIsInstance(AwsScannerMain._task_runner(Mock(), aws_scanner_arguments()), AwsParallelTaskRunner)
+        runner = AwsScannerMain._task_runner(Mock(), aws_scanner_arguments(processes=4))
+        self.assertIsInstance(runner, AwsProcessPoolTaskRunner)
+        with patch.dict(os.environ, {"AWS_SCANNER_TASKS_RUNNER": "async"}):
+            self.assertIsInstance(AwsScannerMain._task_runner(Mock(), aws_scanner_arguments()), AwsAsyncTaskRunner)
+
+    def test_runs_are_not_checkpointed_by_default(self) -> None:
+        self.assertIsNone(AwsScannerMain.__new__(AwsScannerMain)._checkpoints(Mock(), aws_scanner_arguments()))
+
+    def test_resume_requires_checkpoints(self) -> None:
+        with self.assertRaises(SystemExit):
+            with self.assertLogs("AwsScannerMain", level="ERROR") as error_log:
+                with patch("src.aws_scanner_main.AwsClientFactory"):
+                    with patch("src.aws_scanner_main.AwsTaskBuilder"):
+                        AwsScannerMain(aws_scanner_arguments(resume="abc"))
+        self.assertIn(
+            "resuming, planning or sharding a run requires reports checkpoints to be configured", error_log.output[0]
+        )
+
+    @patch.dict(os.environ, {"AWS_SCANNER_REPORTS_CHECKPOINTS": "/var/checkpoints"})
+    def test_checkpoints_in_local_directory(self) -> None:
+        main = AwsScannerMain.__new__(AwsScannerMain)
+        with patch("src.aws_scanner_main.new_run_id", return_value="new-run"):
+            checkpoints = main._checkpoints(Mock(), aws_scanner_arguments())
+        assert checkpoints
+        self.assertEqual("new-run", checkpoints.run_id)
+        self.assertIsInstance(checkpoints._store, LocalCheckpointStore)
+        self.assertEqual("checkpoints of run 'new-run' in /var/checkpoints", str(checkpoints))
+
+    @patch.dict(os.environ, {"AWS_SCANNER_REPORTS_CHECKPOINTS": "s3://checkpoints-bucket/scanner/runs"})
+    def test_checkpoints_in_s3_are_resumed(self) -> None:
+        factory = Mock()
+        checkpoints = AwsScannerMain.__new__(AwsScannerMain)._checkpoints(factory, aws_scanner_arguments(resume="abc"))
+        assert checkpoints
+        self.assertEqual("abc", checkpoints.run_id)
+        self.assertIsInstance(checkpoints._store, S3CheckpointStore)
+        self.assertEqual("s3://checkpoints-bucket/scanner/runs", str(checkpoints._store))
+        factory.get_s3_client.assert_called_once_with(account("333222333222", "reports"), "s3_reports_role")
+
+    def test_checkpoints_are_handed_to_task_runners(self) -> None:
+        checkpoints = Mock()
+        for args in [aws_scanner_arguments(), aws_scanner_arguments(processes=4)]:
+            self.assertEqual(checkpoints, AwsScannerMain._task_runner(Mock(), args, checkpoints)._checkpoints)
+
+    @patch("src.aws_scanner_main.AwsClientFactory")
+    @patch("src.aws_scanner_main.AwsTaskBuilder")
+    @patch("src.aws_scanner_main.AwsScannerOutput")
+    def test_late_run_without_checkpoints_cannot_be_continued(self, _: Mock, __: Mock, ___: Mock) -> None:
+        runner = Mock(unscheduled=3, interrupted=0)
+        with patch.object(AwsScannerMain, "_task_runner", return_value=runner):
+            with self.assertLogs("AwsScannerMain", level="WARNING") as warning_log:
+                main = AwsScannerMain(aws_scanner_arguments(), finish_by=100)
+        runner.finish_by.assert_not_called()
+        self.assertIsNone(main.unfinished_run)
+        self.assertIn("this run cannot be continued", warning_log.output[0])
+
+    @patch.dict(os.environ, {"AWS_SCANNER_REPORTS_CHECKPOINTS": "/var/checkpoints"})
+    @patch("src.aws_scanner_main.AwsClientFactory")
+    @patch("src.aws_scanner_main.AwsTaskBuilder")
+    @patch("src.aws_scanner_main.AwsScannerOutput")
+    def test_late_run_with_checkpoints_is_unfinished(self, _: Mock, __: Mock, ___: Mock) -> None:
+        runner = Mock(unscheduled=3, interrupted=0)
+        with patch.object(AwsScannerMain, "_task_runner", return_value=runner):
+            with self.assertLogs("AwsScannerMain", level="WARNING") as warning_log:
+                main = AwsScannerMain(aws_scanner_arguments(resume="run-1"), finish_by=100)
+        runner.finish_by.assert_called_once_with(100)
+        self.assertEqual("run-1", main.unfinished_run)
+        self.assertIn(
+            "3 tasks were not started in time and 0 were interrupted, checkpoints of run 'run-1'", warning_log.output[0]
+        )
+
+    @patch.dict(os.environ, {"AWS_SCANNER_REPORTS_CHECKPOINTS": "/var/checkpoints"})
+    @patch("src.aws_scanner_main.AwsClientFactory")
+    @patch("src.aws_scanner_main.AwsTaskBuilder")
+    @patch("src.aws_scanner_main.AwsScannerOutput")
+    def test_run_with_interrupted_tasks_is_unfinished(self, output: Mock, _: Mock, __: Mock) -> None:
+        output.return_value.write.side_effect = lambda _, reports: list(reports)
+        streamed = [task_report(), task_report(description="late", incomplete=True)]
+        runner = Mock(unscheduled=0, interrupted=1, stream=Mock(return_value=iter(streamed)))
+        with patch.object(AwsScannerMain, "_task_runner", return_value=runner):
+            with self.assertLogs("AwsScannerMain", level="WARNING") as warning_log:
+                main = AwsScannerMain(aws_scanner_arguments(resume="run-1"), finish_by=100)
+        self.assertEqual("run-1", main.unfinished_run)
+        self.assertIn("0 tasks were not started in time and 1 were interrupted", warning_log.output[0])
+
+    @patch.dict(os.environ, {"AWS_SCANNER_REPORTS_CHECKPOINTS": "/var/checkpoints"})
+    @patch("src.aws_scanner_main.AwsClientFactory")
+    @patch("src.aws_scanner_main.AwsTaskBuilder")
+    @patch("src.aws_scanner_main.AwsScannerOutput")
+    def test_run_with_timed_out_tasks_is_finished(self, output: Mock, _: Mock, __: Mock) -> None:
+        output.return_value.write.side_effect = lambda _, reports: list(reports)
+        streamed = [task_report(description="slow", incomplete=True)]
+        runner = Mock(unscheduled=0, interrupted=0, stream=Mock(return_value=iter(streamed)))
+        with patch.object(AwsScannerMain, "_task_runner", return_value=runner):
+            main = AwsScannerMain(aws_scanner_arguments(resume="run-1"), finish_by=100)
+        self.assertIsNone(main.unfinished_run)
+
+    @patch("src.aws_scanner_main.AwsClientFactory")
+    @patch("src.aws_scanner_main.AwsTaskDurations", return_value=None)
+    @patch("src.aws_scanner_main.AwsTaskBuilder", side_effect=fake_task_builder)
+    def test_sharded_run_is_merged_into_the_same_report(self, _: Mock, __: Mock, ___: Mock) -> None:
+        with TemporaryDirectory() as checkpoints, patch.dict(
+            os.environ, {"AWS_SCANNER_REPORTS_CHECKPOINTS": checkpoints}
+        ):
+            shards = json.loads(run_main(aws_scanner_arguments(task="audit_s3", accounts=[], plan=2)))
+            self.assertEqual(2, len(shards))
+            for shard in shards:
+                args = aws_scanner_arguments(
+                    task="audit_s3", accounts=shard["accounts"].split(","), shard=shard["shard"]
+                )
+                self.assertEqual("", run_main(args))
+            merged = run_main(aws_scanner_arguments(task="merge", shard=shards[0]["shard"], merged_task="audit_s3"))
+            unsharded = run_main(aws_scanner_arguments(task="audit_s3", accounts=[]))
+        self.assertEqual(5, len(json.loads(merged)))
+        self.assertEqual(sorted(json.loads(unsharded), key=str), sorted(json.loads(merged), key=str))
+
+    @patch("src.aws_scanner_main.AwsClientFactory")
+    @patch("src.aws_scanner_main.AwsTaskDurations", return_value=None)
+    @patch("src.aws_scanner_main.AwsTaskBuilder", side_effect=fake_task_builder)
+    def test_merge_of_an_unfinished_sharded_run_fails(self, _: Mock, __: Mock, ___: Mock) -> None:
+        with TemporaryDirectory() as checkpoints, patch.dict(
+            os.environ, {"AWS_SCANNER_REPORTS_CHECKPOINTS": checkpoints}
+        ):
+            shards = json.loads(run_main(aws_scanner_arguments(task="audit_s3", accounts=[], plan=2)))
+            run_main(
+                aws_scanner_arguments(
+                    task="audit_s3", accounts=shards[0]["accounts"].split(","), shard=shards[0]["shard"]
+                )
+            )
+            with self.assertRaises(SystemExit), self.assertLogs("AwsScannerMain", level="ERROR") as error_log:
+                run_main(aws_scanner_arguments(task="merge", shard=shards[0]["shard"], merged_task="audit_s3"))
+        self.assertIn("IncompleteShardedRunException", error_log.output[0])
+        self.assertIn(f"shard 2 (accounts {shards[1]['accounts']})", error_log.output[0])
+
+    @patch("src.aws_scanner_main.AwsClientFactory")
+    @patch("src.aws_scanner_main.AwsTaskBuilder", side_effect=fake_task_builder)
+    def test_plan_exposes_the_shard_descriptors(self, _: Mock, __: Mock) -> None:
+        with TemporaryDirectory() as checkpoints, patch.dict(
+            os.environ, {"AWS_SCANNER_REPORTS_CHECKPOINTS": checkpoints}
+        ):
+            with redirect_stdout(StringIO()) as stdout:
+                main = AwsScannerMain(aws_scanner_arguments(task="audit_s3", accounts=[], plan=2))
+        self.assertEqual(json.loads(stdout.getvalue()), main.shards)
+        self.assertEqual(2, len(main.shards or []))
+        self.assertIsNone(main.unfinished_run)
+
+    def test_plan_without_checkpoints(self) -> None:
+        with self.assertRaises(SystemExit):
+            with self.assertLogs("AwsScannerMain", level="ERROR") as error_log:
+                with patch("src.aws_scanner_main.AwsClientFactory"), patch("src.aws_scanner_main.AwsTaskBuilder"):
+                    AwsScannerMain(aws_scanner_arguments(task="audit_s3", plan=2))
+        self.assertIn("resuming, planning or sharding a run requires reports checkpoints", error_log.output[0])
+
+    @patch("src.aws_scanner_main.AwsClientFactory")
+    @patch("src.aws_scanner_main.AwsScannerOutput")
+    def test_merge_writes_the_merged_task_report(self, output: Mock, _: Mock) -> None:
+        with patch.object(AwsScannerMain, "_checkpoints", return_value=Mock(merged_reports=Mock(return_value=reports))):
+            AwsScannerMain(aws_scanner_arguments(task="merge", shard="run-1", merged_task="audit_iam"))
+        output.return_value.write.assert_called_once_with("audit_iam", reports)
+
+    def test_merge_without_checkpoints(self) -> None:
+        with self.assertRaises(SystemExit):
+            with self.assertLogs("AwsScannerMain", level="ERROR") as error_log:
+                with patch("src.aws_scanner_main.AwsClientFactory"):
+                    AwsScannerMain(aws_scanner_arguments(task="merge", shard="run-1", merged_task="audit_iam"))
+        self.assertIn("requires reports checkpoints to be configured", error_log.output[0])
@@ -3,9 +3,10 @@ from unittest.mock import Mock, patch
 import os
 
 from src.aws_scanner_output import AwsScannerOutput
+from src.clients.aws_s3_client import AwsS3Client
 
 from tests.test_types_generator import account, partition, task_report
-from typing import Any
+from typing import Any, Iterator
 
 
 EXPECTED_JSON_REPORT = (
@@ -21,6 +22,24 @@ def test_stdout_json_output(capsys: Any) -> None:
     assert EXPECTED_JSON_REPORT in captured.out
 
 
+@patch.dict(os.environ, {"AWS_SCANNER_REPORTS_OUTPUT": "stdout", "AWS_SCANNER_REPORTS_FORMAT": "csv"})
+def test_stdout_csv_output(capsys: Any) -> None:
+    AwsScannerOutput(Mock()).write("some_task", iter([task_report(results={})]))
+    assert "account_id,account_name\n\n" == capsys.readouterr().out
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_REPORTS_OUTPUT": "stdout"})
+def test_stdout_output_is_written_as_reports_come(capsys: Any) -> None:
+    def reports() -> Iterator[Any]:
+        yield task_report(description="first")
+        assert '[{"account"' in capsys.readouterr().out
+        yield task_report(description="second")
+
+    AwsScannerOutput(Mock()).write("some_task", reports())
+    out = capsys.readouterr().out
+    assert out.startswith(', {"account"') and '"second"' in out and out.endswith('"results": {"key": "val"}}]\n')
+
+
 @patch.dict(
     os.environ,
     {
@@ -31,15 +50,13 @@ def test_stdout_json_output(capsys: Any) -> None:
     },
 )
 def test_s3_output() -> None:
-    mock_s3 = Mock()
+    mock_s3 = Mock(put_object=Mock(return_value={"VersionId": "v1"}))
     factory = Mock(
         get_s3_client=Mock(
-            side_effect=lambda acc, role: mock_s3
+            side_effect=lambda acc, role: AwsS3Client(mock_s3)
             if acc == account("reports_account", "reports") and role == "reports_role"
             else None
         )
     )
-    AwsScannerOutput(factory).write("some_task", [task_report(partition=partition())])
-    mock_s3.put_object.assert_called_once_with(
-        bucket="reports_bucket", object_name="some_task.json", object_content=EXPECTED_JSON_REPORT
-    )
+    AwsScannerOutput(factory).write("some_task", iter([task_report(partition=partition())]))
+    mock_s3.put_object.assert_called_once_with(Bucket="reports_bucket", Key="some_task.json", Body=EXPECTED_JSON_REPORT)
@@ -0,0 +1,7 @@
+from src.aws_scanner_payload import from_payload, to_payload
+
+from tests.test_types_generator import task_report
+
+
+def test_payload_round_trip() -> None:
+    assert task_report() == from_payload(to_payload(task_report()))
@@ -0,0 +1,25 @@
+from src.aws_scanner_shards import plan_shards, shard_by_account
+
+from tests.test_types_generator import account, s3_task
+
+
+def test_tasks_are_sharded_by_account_largest_first() -> None:
+    tasks = [
+        s3_task(account=account(acc), description=f"{i}") for acc, n in [("1", 3), ("2", 1), ("3", 2)] for i in range(n)
+    ]
+    shards = shard_by_account(tasks, 2)
+    assert [["1", "1", "1"], ["3", "3", "2"]] == [[t.account.identifier for t in shard] for shard in shards]
+
+
+def test_shards_are_planned_as_account_lists() -> None:
+    tasks = [
+        s3_task(account=account(acc), description=f"{i}") for acc, n in [("1", 3), ("2", 1), ("3", 2)] for i in range(n)
+    ]
+    assert [{"accounts": "1", "shard": "run-1"}, {"accounts": "3,2", "shard": "run-1"}] == plan_shards(
+        shard_by_account(tasks, 2), "run-1"
+    )
+    assert [{"accounts": "1,2,3", "shard": "run-1"}] == [
+        dict(shard, accounts=",".join(sorted(shard["accounts"].split(","))))
+        for shard in plan_shards(shard_by_account(tasks, 1), "run-1")
+    ]
+    assert [] == plan_shards(shard_by_account([], 3), "run-1")
@@ -0,0 +1,68 @@
+import os
+
+from unittest.mock import Mock, patch
+
+from src.aws_scanner_config import AwsScannerConfig
+from src.aws_scanner_warm_state import AwsScannerWarmState
+
+from tests.test_types_generator import account
+
+
+@patch("src.aws_scanner_warm_state.AwsClientFactory")
+def test_factory_is_reused_while_valid(factory: Mock) -> None:
+    warm_state = AwsScannerWarmState()
+    with patch("src.aws_scanner_warm_state.monotonic", side_effect=[0, 3299]):
+        assert warm_state.factory("123", "bob") is warm_state.factory("123", "bob")
+    factory.assert_called_once_with(mfa="123", username="bob")
+    factory.return_value.forget_lazy_clients.assert_called_once()
+
+
+@patch("src.aws_scanner_warm_state.AwsClientFactory", side_effect=lambda **_: Mock())
+def test_factory_is_rebuilt_when_session_expires(_: Mock) -> None:
+    warm_state = AwsScannerWarmState()
+    with patch("src.aws_scanner_warm_state.monotonic", side_effect=[0, 3300, 3300]):
+        assert warm_state.factory("123", "bob") is not warm_state.factory("123", "bob")
+
+
+@patch("src.aws_scanner_warm_state.AwsClientFactory", side_effect=lambda **_: Mock())
+def test_factory_is_rebuilt_for_another_user(_: Mock) -> None:
+    warm_state = AwsScannerWarmState()
+    assert warm_state.factory("123", "bob") is not warm_state.factory("456", "bob")
+
+
+@patch("src.aws_scanner_warm_state.AwsClientFactory", side_effect=lambda **_: Mock())
+def test_factory_is_rebuilt_when_config_changes(_: Mock) -> None:
+    warm_state = AwsScannerWarmState()
+    factory = warm_state.factory("123", "bob")
+    AwsScannerConfig.reload()
+    assert warm_state.factory("123", "bob") is not factory
+
+
+def test_target_accounts_are_reused_until_ttl() -> None:
+    warm_state = AwsScannerWarmState()
+    provider = Mock(side_effect=[[account("1")], [account("2")]])
+    with patch("src.aws_scanner_warm_state.monotonic", side_effect=[0, 299, 300, 300]):
+        assert [account("1")] == warm_state.target_accounts("key", provider)
+        assert [account("1")] == warm_state.target_accounts("key", provider)
+        assert [account("2")] == warm_state.target_accounts("key", provider)
+    assert provider.call_count == 2
+
+
+@patch.dict(os.environ, {"AWS_SCANNER_ORGANIZATION_ACCOUNTS_TTL_SECONDS": "0"})
+def test_target_accounts_are_not_reused_with_zero_ttl() -> None:
+    warm_state = AwsScannerWarmState()
+    provider = Mock(side_effect=[[account("1")], [account("2")]])
+    with patch("src.aws_scanner_warm_state.monotonic", return_value=10):
+        warm_state.target_accounts("key", provider)
+        assert [account("2")] == warm_state.target_accounts("key", provider)
+
+
+@patch("src.aws_scanner_warm_state.AwsClientFactory", side_effect=lambda **_: Mock())
+def test_target_accounts_are_dropped_with_factory(_: Mock) -> None:
+    warm_state = AwsScannerWarmState()
+    provider = Mock(return_value=[account("1")])
+    warm_state.factory("123", "bob")
+    warm_state.target_accounts("key", provider)
+    warm_state.factory("456", "bob")
+    warm_state.target_accounts("key", provider)
+    assert provider.call_count == 2
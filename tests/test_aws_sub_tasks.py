@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import current_thread
+from typing import Any, List
+from unittest.mock import Mock
+
+import pytest
+
+from src.aws_sub_tasks import map_in_chunks, sub_task_executor
+from src.clients.aws_deadline import check_deadline, current_deadline, deadline
+from src.data.aws_scanner_exceptions import TaskDeadlineException
+
+
+def thread_name(_: Any) -> str:
+    return current_thread().name
+
+
+def test_map_without_executor_runs_serially() -> None:
+    assert [2, 4, 6] == map_in_chunks(lambda i: i * 2, [1, 2, 3])
+    assert [thread_name(None)] * 3 == map_in_chunks(thread_name, [1, 2, 3])
+
+
+def test_map_within_a_single_chunk_runs_serially() -> None:
+    executor = Mock()
+    with sub_task_executor(executor, 3):
+        assert [2, 4, 6] == map_in_chunks(lambda i: i * 2, [1, 2, 3])
+    executor.submit.assert_not_called()
+
+
+def test_map_with_chunking_disabled_runs_serially() -> None:
+    executor = Mock()
+    with sub_task_executor(executor, 0):
+        assert [2, 4, 6] == map_in_chunks(lambda i: i * 2, [1, 2, 3])
+    executor.submit.assert_not_called()
+
+
+def test_map_in_chunks_on_executor_keeps_order() -> None:
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        with sub_task_executor(executor, 2):
+            assert list(range(0, 20, 2)) == map_in_chunks(lambda i: i * 2, list(range(10)))
+            assert thread_name(None) not in map_in_chunks(thread_name, list(range(10)))
+
+
+def test_sub_tasks_run_with_the_deadline_of_their_task() -> None:
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with sub_task_executor(executor, 1), deadline(42):
+            assert [42, 42] == map_in_chunks(lambda _: current_deadline(), [1, 2])
+
+
+def test_sub_task_failure_is_raised_and_remaining_sub_tasks_are_cancelled() -> None:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with sub_task_executor(executor, 1), deadline(0):
+            with pytest.raises(TaskDeadlineException):
+                map_in_chunks(lambda _: check_deadline(), [1, 2, 3])
+
+
+def test_results_collected_before_a_failure_are_kept() -> None:
+    results: List[Any] = []
+    with deadline(0), pytest.raises(TaskDeadlineException):
+        map_in_chunks(lambda i: i if i < 3 else check_deadline(), [1, 2, 3, 4], results)
+    assert [1, 2] == results
+
+
+def test_chunks_completed_before_a_failure_are_kept() -> None:
+    results: List[Any] = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with sub_task_executor(executor, 2), deadline(0):
+            with pytest.raises(TaskDeadlineException):
+                map_in_chunks(lambda i: i if i < 3 else check_deadline(), [1, 2, 3, 4], results)
+    assert [1, 2] == results
+
+
+def test_sub_task_executor_is_restored() -> None:
+    executor = Mock()
+    with sub_task_executor(executor, 1):
+        with sub_task_executor(None, 0):
+            assert [1, 2] == map_in_chunks(lambda i: i, [1, 2])
+        executor.submit.assert_not_called()
+    assert [1, 2] == map_in_chunks(lambda i: i, [1, 2])
@@ -6,6 +6,7 @@ from unittest.mock import Mock
 from typing import Any, Dict, Sequence
 
 from src.aws_scanner_argument_parser import AwsScannerCommands as Cmd, AwsScannerArguments
+from src.aws_scanner_warm_state import AwsScannerWarmState
 from src.aws_task_builder import AwsTaskBuilder
 from src.data.aws_scanner_exceptions import UnsupportedTaskException
 from src.tasks.aws_athena_cleaner_task import AwsAthenaCleanerTask
@@ -51,6 +52,22 @@ class TestAwsTaskBuilder(TestCase):
         with raises(SystemExit, match="account lookup is disabled and no target accounts were provided"):
             AwsTaskBuilder(Mock(), args(accounts=[], disable_account_lookup=True))._get_target_accounts()
 
+    def test_target_accounts_are_reused_from_warm_state(self) -> None:
+        orgs = Mock(get_target_accounts=Mock(return_value=[acct3, acct4]))
+        factory = Mock(get_organizations_client=Mock(return_value=orgs))
+        warm_state = AwsScannerWarmState()
+        for _ in range(2):
+            builder = AwsTaskBuilder(factory, args(accounts=[], parent="Some OU"), warm_state)
+            assert [acct3, acct4] == builder._get_target_accounts()
+        orgs.get_target_accounts.assert_called_once_with("Some OU")
+
+    def test_warm_target_accounts_are_keyed_by_requested_accounts(self) -> None:
+        orgs = Mock(find_account_by_ids=Mock(side_effect=lambda ids: [account(i) for i in ids]))
+        factory = Mock(get_organizations_client=Mock(return_value=orgs))
+        warm_state = AwsScannerWarmState()
+        assert [account("1")] == AwsTaskBuilder(factory, args(accounts=["1"]), warm_state)._get_target_accounts()
+        assert [account("2")] == AwsTaskBuilder(factory, args(accounts=["2"]), warm_state)._get_target_accounts()
+
     def test_principal_by_ip_finder_tasks(self) -> None:
         self.assert_tasks_equal(
             [
@@ -63,10 +80,10 @@ class TestAwsTaskBuilder(TestCase):
     def test_service_usage_scanner_tasks(self) -> None:
         self.assert_tasks_equal(
             [
-                AwsServiceUsageScannerTask(acct1, partition(), "s3"),
-                AwsServiceUsageScannerTask(acct1, partition(), "ssm"),
-                AwsServiceUsageScannerTask(acct2, partition(), "s3"),
-                AwsServiceUsageScannerTask(acct2, partition(), "ssm"),
+                AwsServiceUsageScannerTask(acct1, partition(), "s3", ["s3", "ssm"]),
+                AwsServiceUsageScannerTask(acct1, partition(), "ssm", ["s3", "ssm"]),
+                AwsServiceUsageScannerTask(acct2, partition(), "s3", ["s3", "ssm"]),
+                AwsServiceUsageScannerTask(acct2, partition(), "ssm", ["s3", "ssm"]),
             ],
             task_builder(args(task=Cmd.service_usage, services=["s3", "ssm"])).build_tasks(),
         )
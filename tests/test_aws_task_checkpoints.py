@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+
+from botocore.exceptions import ClientError
+
+from src.data.aws_scanner_exceptions import IncompleteShardedRunException
+from src.aws_task_checkpoints import (
+    AwsTaskCheckpoints,
+    CheckpointStore,
+    LocalCheckpointStore,
+    S3CheckpointStore,
+    new_run_id,
+)
+
+from tests.test_types_generator import account, aws_task, bucket, bucket_encryption, task_report
+
+
+def test_new_run_ids_are_unique() -> None:
+    assert 32 == len(new_run_id())
+    assert new_run_id() != new_run_id()
+
+
+def test_checkpoint_store_is_abstract() -> None:
+    with pytest.raises(NotImplementedError):
+        CheckpointStore().keys("run")
+    with pytest.raises(NotImplementedError):
+        CheckpointStore().get("run", "key")
+    with pytest.raises(NotImplementedError):
+        CheckpointStore().put("run", "key", "content")
+
+
+def test_local_checkpoint_store(tmp_path: Path) -> None:
+    store = LocalCheckpointStore(str(tmp_path))
+    assert set() == store.keys("run-1")
+    store.put("run-1", "key-1", "content 1")
+    store.put("run-1", "key-2", "content 2")
+    store.put("run-2", "key-1", "other content")
+    open(os.path.join(tmp_path, "run-1", "key-3.tmp"), "w").close()
+    assert {"key-1", "key-2"} == store.keys("run-1")
+    assert "content 2" == store.get("run-1", "key-2")
+    assert "other content" == store.get("run-2", "key-1")
+    assert str(tmp_path) == str(store)
+
+
+def test_s3_checkpoint_store() -> None:
+    s3 = Mock(list_object_keys=Mock(return_value=["scanner/run-1/key-1", "scanner/run-1/key-2"]))
+    store = S3CheckpointStore(s3, "bucket", "/scanner/")
+    assert {"key-1", "key-2"} == store.keys("run-1")
+    s3.list_object_keys.assert_called_once_with("bucket", "scanner/run-1/")
+    s3.get_object.return_value = "content"
+    assert "content" == store.get("run-1", "key-1")
+    s3.get_object.assert_called_once_with("bucket", "scanner/run-1/key-1")
+    store.put("run-1", "key-3", "content 3")
+    s3.put_object.assert_called_once_with("bucket", "scanner/run-1/key-3", "content 3")
+    assert "s3://bucket/scanner" == str(store)
+
+
+def test_s3_checkpoint_store_without_prefix() -> None:
+    s3 = Mock()
+    S3CheckpointStore(s3, "bucket", "").put("run-1", "key-1", "content")
+    s3.put_object.assert_called_once_with("bucket", "run-1/key-1", "content")
+
+
+def test_reports_are_checkpointed_and_restored(tmp_path: Path) -> None:
+    done, pending = aws_task(description="done"), aws_task(description="pending")
+    report = task_report(description="done", partition=None)
+    checkpoints = AwsTaskCheckpoints(LocalCheckpointStore(str(tmp_path)), "run-1")
+    checkpoints.save(report)
+    assert ([report], [pending]) == checkpoints.restore([done, pending])
+    assert ([], [done, pending]) == AwsTaskCheckpoints(LocalCheckpointStore(str(tmp_path)), "run-2").restore(
+        [done, pending]
+    )
+    assert "run-1" == checkpoints.run_id
+
+
+def test_incomplete_reports_are_not_checkpointed() -> None:
+    store = Mock()
+    AwsTaskCheckpoints(store, "run-1").save(task_report(incomplete=True))
+    store.put.assert_not_called()
+
+
+def test_checkpoint_failure_is_logged(caplog: Any) -> None:
+    store = Mock(put=Mock(side_effect=OSError("disk full")))
+    with caplog.at_level(logging.WARNING):
+        AwsTaskCheckpoints(store, "run-1").save(task_report(description="a task", account=account("1", "one")))
+    assert "unable to checkpoint report of 'a task' for one (1): disk full" in caplog.text
+
+
+def test_checkpointed_reports_are_json() -> None:
+    store = Mock()
+    report = task_report()
+    AwsTaskCheckpoints(store, "run-1").save(report)
+    store.put.assert_called_once()
+    run_id, key, content = store.put.call_args.args
+    assert ("run-1", report.key) == (run_id, key)
+    assert "src.data.aws_task_report.AwsTaskReport" == json.loads(content)["__type__"]
+
+
+def test_typed_results_are_restored(tmp_path: Path) -> None:
+    report = task_report(
+        results={"buckets": [bucket("b", encryption=bucket_encryption(enabled=True))], "at": datetime(2021, 1, 2)}
+    )
+    checkpoints = AwsTaskCheckpoints(LocalCheckpointStore(str(tmp_path)), "run-1")
+    checkpoints.save(report)
+    assert ([report], []) == checkpoints.restore([Mock(report_key=report.key)])
+
+
+def test_checkpoint_failure_on_s3_is_logged(caplog: Any) -> None:
+    store = Mock(put=Mock(side_effect=ClientError({"Error": {"Code": "AccessDenied"}}, "PutObject")))
+    with caplog.at_level(logging.WARNING):
+        AwsTaskCheckpoints(store, "run-1").save(task_report(description="a task"))
+    assert "unable to checkpoint report of 'a task'" in caplog.text
+
+
+def test_reports_with_unknown_types_are_not_checkpointed(caplog: Any) -> None:
+    store = Mock()
+    with caplog.at_level(logging.WARNING):
+        AwsTaskCheckpoints(store, "run-1").save(task_report(results={"client": Mock()}))
+    store.put.assert_not_called()
+    assert "cannot be serialised" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "not json",
+        '{"__type__": "os.system", "__fields__": {}}',
+        '{"__type__": "src.data.aws_organizations_types.Account", "__fields__": {"identifier": "1", "name": "a"}}',
+    ],
+)
+def test_unreadable_checkpoints_are_ignored(content: str, caplog: Any) -> None:
+    task = aws_task()
+    store = Mock(keys=Mock(return_value={task.report_key}), get=Mock(return_value=content))
+    checkpoints = AwsTaskCheckpoints(store, "run-1")
+    with caplog.at_level(logging.WARNING):
+        assert ([], [task]) == checkpoints.restore([task])
+    assert f"checkpoint '{task.report_key}' of run 'run-1'" in caplog.text
+
+
+def test_planned_reports_are_merged_in_account_order(tmp_path: Path) -> None:
+    tasks = [
+        aws_task(account=account(acc, acc), description=desc) for acc, desc in [("2", "b"), ("1", "b"), ("2", "a")]
+    ]
+    reports = [task_report(account=t.account, description=t._description, partition=None) for t in tasks]
+    checkpoints = AwsTaskCheckpoints(LocalCheckpointStore(str(tmp_path)), "run-1")
+    checkpoints.save_plan([[tasks[0], tasks[2]], [tasks[1]]])
+    for report in reports:
+        checkpoints.save(report)
+    checkpoints.save(task_report(description="not planned", partition=None))
+    assert [reports[1], reports[2], reports[0]] == checkpoints.merged_reports()
+
+
+def test_merge_lists_missing_shards_and_tasks(tmp_path: Path) -> None:
+    tasks = [
+        aws_task(account=account(acc, acc), description=desc) for acc, desc in [("1", "a"), ("2", "a"), ("2", "b")]
+    ]
+    checkpoints = AwsTaskCheckpoints(LocalCheckpointStore(str(tmp_path)), "run-1")
+    checkpoints.save_plan([[tasks[0]], [tasks[1], tasks[2]]])
+    checkpoints.save(task_report(account=tasks[0].account, description="a", partition=None))
+    checkpoints.save(task_report(account=tasks[1].account, description="a", partition=None))
+    with pytest.raises(IncompleteShardedRunException) as ex:
+        checkpoints.merged_reports()
+    assert "run 'run-1' has no report for shard 2 (accounts 2): task 'b' for '2 (2)'" == str(ex.value)
+
+
+def test_merge_without_plan(tmp_path: Path) -> None:
+    with pytest.raises(IncompleteShardedRunException, match="run 'run-1' has no readable shard plan"):
+        AwsTaskCheckpoints(LocalCheckpointStore(str(tmp_path)), "run-1").merged_reports()
@@ -0,0 +1,56 @@
+import json
+import logging
+
+from pathlib import Path
+from typing import Any
+
+from src.aws_task_durations import AwsTaskDurations
+
+from tests.test_types_generator import account, athena_task, s3_task
+
+
+def test_durations_are_saved_and_loaded(tmp_path: Path) -> None:
+    path = str(tmp_path / "durations.json")
+    durations = AwsTaskDurations(path)
+    durations.record(s3_task(account=account("1")), 12.34567)
+    durations.save()
+    assert {"AwsS3Task": {"1:s3_task": 12.346}} == json.loads(Path(path).read_text())
+    assert 12.346 == AwsTaskDurations(path).expected(s3_task(account=account("1")))
+    assert AwsTaskDurations(path).expected(s3_task(account=account("2"))) is None
+
+
+def test_tasks_are_ordered_longest_first(tmp_path: Path) -> None:
+    path = tmp_path / "durations.json"
+    path.write_text(json.dumps({"AwsS3Task": {"1:1": 5, "2:2": 300, "3:3": 1, "4:4": 20}}))
+    tasks = [s3_task(account=account(acc), description=acc) for acc in ["1", "2", "3", "4", "new"]]
+    ordered = AwsTaskDurations(str(path)).order(tasks)
+    assert ["2", "4", "new", "1", "3"] == [task.account.identifier for task in ordered]
+
+
+def test_durations_of_tasks_of_the_same_type_are_kept_apart(tmp_path: Path) -> None:
+    durations = AwsTaskDurations(str(tmp_path / "durations.json"))
+    durations.record(s3_task(description="ssm"), 60)
+    durations.record(s3_task(description="s3"), 2)
+    assert 60 == durations.expected(s3_task(description="ssm"))
+    assert 2 == durations.expected(s3_task(description="s3"))
+    assert durations.expected(s3_task(description="ec2")) is None
+
+
+def test_task_order_is_kept_without_history(tmp_path: Path) -> None:
+    tasks = [s3_task(account=account(acc)) for acc in ["1", "2", "3"]] + [athena_task(account=account("4"))]
+    assert tasks == AwsTaskDurations(str(tmp_path / "nothing.json")).order(tasks)
+
+
+def test_unreadable_durations_are_ignored(tmp_path: Path, caplog: Any) -> None:
+    path = tmp_path / "durations.json"
+    path.write_text("not json")
+    with caplog.at_level(logging.WARNING):
+        assert AwsTaskDurations(str(path)).expected(s3_task()) is None
+    assert "ignoring unreadable task durations" in caplog.text
+
+
+def test_failure_to_save_is_logged(tmp_path: Path, caplog: Any) -> None:
+    durations = AwsTaskDurations(str(tmp_path / "missing_dir" / "durations.json"))
+    with caplog.at_level(logging.WARNING):
+        durations.save()
+    assert "unable to save task durations" in caplog.text
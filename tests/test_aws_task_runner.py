@@ -1,10 +1,17 @@
+import os
+
+from inspect import signature
+from threading import current_thread
 from typing import Any, Dict
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
-from src.aws_task_runner import AwsTaskRunner
+from src.aws_task_runner import CLIENT_PROVIDERS, AwsTaskRunner, register_client_provider
+from src.clients.aws_s3_client import AwsS3Client
 from src.clients.aws_client_factory import AwsClientFactory
-from src.data.aws_scanner_exceptions import UnsupportedClientException
+from src.aws_sub_tasks import map_in_chunks
+from src.clients.aws_deadline import check_deadline
+from src.data.aws_scanner_exceptions import TaskDeadlineException, UnsupportedClientException
 from src.tasks.aws_task import AwsTask
 
 from tests.test_types_generator import (
@@ -24,6 +31,10 @@ from tests.test_types_generator import (
 )
 
 
+def current_thread_name(_: Any) -> str:
+    return current_thread().name
+
+
 class TestAwsTaskRunner(TestCase):
     def test_run(self) -> None:
         tasks = [athena_task(description="task_34"), athena_task(description="task_23")]
@@ -147,3 +158,182 @@ class TestAwsTaskRunner(TestCase):
 
         with self.assertRaisesRegex(UnsupportedClientException, "requires a client argument"):
             AwsTaskRunner(Mock())._run_task(ClientlessTask("clientless", account()))
+
+    def test_task_client_type_is_resolved_once_per_task_class(self) -> None:
+        class ResolvedOnceTask(AwsTask):
+            def _run_task(self, client: AwsS3Client) -> Dict[Any, Any]:
+                return dict()
+
+        client_factory = Mock(get_s3_client=Mock(return_value=Mock()))
+        with patch("src.aws_task_runner.signature", wraps=signature) as sig:
+            for i in range(3):
+                AwsTaskRunner(client_factory)._run_task(ResolvedOnceTask(f"task_{i}", account()))
+        sig.assert_called_once_with(ResolvedOnceTask._run_task)
+        self.assertEqual(3, client_factory.get_s3_client.call_count)
+
+    def test_register_client_provider(self) -> None:
+        class CustomClient:
+            pass
+
+        class CustomClientTask(AwsTask):
+            def _run_task(self, client: CustomClient) -> Dict[Any, Any]:
+                return {"client": client}
+
+        client = CustomClient()
+        with patch.dict(CLIENT_PROVIDERS):
+            register_client_provider(CustomClient, lambda factory, task: client)
+            report = AwsTaskRunner(Mock())._run_task(CustomClientTask("custom", account()))
+        self.assertEqual({"client": client}, report.results)
+
+    def test_stream(self) -> None:
+        tasks = [athena_task(description="task_34")]
+        report = [task_report(description="task_34")]
+        task_runner = AwsTaskRunner(Mock())
+        with patch.object(task_runner, "_run_tasks", Mock(return_value=report)) as mock_run_tasks:
+            self.assertEqual(report, list(task_runner.stream(iter(tasks))))
+        mock_run_tasks.assert_called_once_with(tasks)
+
+    def test_durations_are_recorded_used_for_ordering_and_saved(self) -> None:
+        task = athena_task(description="slow")
+        task.run = Mock(return_value=task_report())  # type: ignore
+        durations = Mock(order=Mock(side_effect=lambda tasks: list(reversed(tasks))))
+        task_runner = AwsTaskRunner(Mock(), durations)
+        with patch.object(task_runner, "_run_tasks", Mock(side_effect=lambda ts: [task_runner._run_task(ts[0])])):
+            with patch("src.aws_task_runner.monotonic", side_effect=[10, 13.5]):
+                self.assertEqual([task_report()], list(task_runner.stream([athena_task(), task])))
+        durations.record.assert_called_once_with(task, 3.5)
+        durations.save.assert_called_once()
+
+    def test_durations_are_saved_after_run(self) -> None:
+        durations = Mock(order=Mock(side_effect=lambda tasks: tasks))
+        task_runner = AwsTaskRunner(Mock(), durations)
+        with patch.object(task_runner, "_run_tasks", Mock(return_value=[])):
+            self.assertEqual([], task_runner.run([athena_task()]))
+        durations.save.assert_called_once()
+
+    def test_no_deadline_by_default(self) -> None:
+        task_runner = AwsTaskRunner(Mock())
+        with task_runner._running():
+            self.assertIsNone(task_runner._task_deadline(100))
+
+    @patch.dict("os.environ", {"AWS_SCANNER_TASKS_TIMEOUT_SECONDS": "30"})
+    def test_task_deadline(self) -> None:
+        task_runner = AwsTaskRunner(Mock())
+        with task_runner._running():
+            self.assertEqual(130, task_runner._task_deadline(100))
+
+    @patch.dict(
+        "os.environ", {"AWS_SCANNER_TASKS_TIMEOUT_SECONDS": "30", "AWS_SCANNER_TASKS_RUN_TIMEOUT_SECONDS": "60"}
+    )
+    def test_task_deadline_is_capped_by_run_deadline(self) -> None:
+        task_runner = AwsTaskRunner(Mock())
+        with patch("src.aws_task_runner.monotonic", return_value=50):
+            with task_runner._running():
+                self.assertEqual(110, task_runner._run_deadline)
+                self.assertEqual(100, task_runner._task_deadline(70))
+                self.assertEqual(110, task_runner._task_deadline(90))
+
+    @patch.dict("os.environ", {"AWS_SCANNER_TASKS_RUN_TIMEOUT_SECONDS": "60"})
+    def test_tasks_past_run_deadline_report_incomplete(self) -> None:
+        task = s3_task()
+        task._run_task = Mock(side_effect=lambda _: check_deadline())  # type: ignore
+        task_runner = AwsTaskRunner(Mock())
+        with patch("src.aws_task_runner.monotonic", side_effect=[0, 0, 0, 61, 61]):
+            with task_runner._running():
+                self.assertEqual({}, task_runner._run_task(task).results)
+                with patch("src.clients.aws_deadline.monotonic", return_value=61):
+                    report = task_runner._run_task(task)
+        self.assertTrue(report.incomplete)
+        self.assertEqual({}, report.results)
+
+    def test_client_construction_past_deadline_reports_incomplete(self) -> None:
+        task = s3_task()
+        with patch.object(AwsTaskRunner, "_dispatch", side_effect=TaskDeadlineException("late")):
+            report = AwsTaskRunner(Mock())._run_task(task)
+        self.assertEqual(
+            task_report(
+                account=task.account, description=task._description, partition=None, results={}, incomplete=True
+            ),
+            report,
+        )
+
+    def test_sub_task_executor_is_available_to_tasks_during_a_run(self) -> None:
+        task = s3_task()
+        items = list(range(30))
+        task._run_task = lambda _: {"items": map_in_chunks(current_thread_name, items)}  # type: ignore
+        task_runner = AwsTaskRunner(Mock())
+        with task_runner._running():
+            results = task_runner._run_task(task).results["items"]
+            self.assertIsNotNone(task_runner._sub_task_executor)
+        self.assertIsNone(task_runner._sub_task_executor)
+        self.assertEqual(30, len(results))
+        self.assertNotIn(current_thread().name, results)
+
+    @patch.dict(os.environ, {"AWS_SCANNER_TASKS_SUB_TASK_EXECUTORS": "0"})
+    def test_sub_tasks_run_in_turn_without_sub_task_executors(self) -> None:
+        task = s3_task()
+        task._run_task = lambda _: {"items": map_in_chunks(current_thread_name, list(range(30)))}  # type: ignore
+        task_runner = AwsTaskRunner(Mock())
+        with task_runner._running():
+            results = task_runner._run_task(task).results["items"]
+            self.assertIsNone(task_runner._sub_task_executor)
+        self.assertEqual([current_thread().name] * 30, results)
+
+    def test_checkpointed_reports_are_restored_and_new_reports_checkpointed(self) -> None:
+        restored, pending = task_report(description="restored"), s3_task()
+        checkpoints = Mock(restore=Mock(return_value=([restored], [pending])))
+        tasks = [athena_task(), pending]
+        task_runner = AwsTaskRunner(Mock(), checkpoints=checkpoints)
+        with patch.object(task_runner, "_run_tasks", Mock(return_value=[task_report()])) as run_tasks:
+            self.assertEqual([restored, task_report()], task_runner.run(tasks))
+        checkpoints.restore.assert_called_once_with(tasks)
+        run_tasks.assert_called_once_with([pending])
+        checkpoints.save.assert_called_once_with(task_report())
+
+    @patch.dict("os.environ", {"AWS_SCANNER_TASKS_RUN_TIMEOUT_SECONDS": "1000"})
+    def test_finish_by_stops_scheduling_and_bounds_running_tasks(self) -> None:
+        task_runner = AwsTaskRunner(Mock())
+        task_runner.finish_by(500)
+        with patch("src.aws_task_runner.monotonic", side_effect=[0, 379, 380, 381]):
+            with task_runner._running():
+                self.assertEqual(380, task_runner._scheduling_deadline)
+                self.assertEqual(440, task_runner._run_deadline)
+                scheduled = task_runner._scheduled(["on time", "late", "too late"])  # type: ignore
+                self.assertEqual(["on time"], list(scheduled))
+        self.assertEqual(2, task_runner.unscheduled)
+
+    @patch.dict("os.environ", {"AWS_SCANNER_TASKS_CONTINUATION_MARGIN_SECONDS": "120"})
+    def test_only_tasks_stopped_by_the_continuation_deadline_are_interrupted(self) -> None:
+        clock = [1000.0]
+
+        def run_until(at: float) -> Any:
+            def run_task(_: Any) -> Dict[Any, Any]:
+                clock[0] = at
+                raise TaskDeadlineException("deadline exceeded")
+
+            return run_task
+
+        timed_out, interrupted = s3_task(description="timed out"), s3_task(description="interrupted")
+        timed_out._run_task, interrupted._run_task = run_until(1010), run_until(1150)  # type: ignore
+        task_runner = AwsTaskRunner(Mock())
+        task_runner.finish_by(1200)
+        with patch("src.aws_task_runner.monotonic", side_effect=lambda: clock[0]), patch.object(
+            task_runner, "_run_tasks", side_effect=lambda tasks: [task_runner._run_task(t) for t in tasks]
+        ):
+            reports = task_runner.run([timed_out])
+            self.assertEqual(0, task_runner.interrupted)
+            reports = task_runner.run([interrupted])
+        self.assertTrue(reports[0].incomplete)
+        self.assertEqual(1, task_runner.interrupted)
+
+    def test_late_tasks_are_not_run(self) -> None:
+        task = s3_task()
+        task.run = Mock()  # type: ignore
+        task_runner = AwsTaskRunner(Mock())
+        task_runner.finish_by(0)
+        with patch.object(
+            task_runner, "_run_tasks", side_effect=lambda tasks: [task_runner._run_task(t) for t in tasks]
+        ):
+            self.assertEqual([], task_runner.run([task]))
+        task.run.assert_not_called()
+        self.assertEqual(1, task_runner.unscheduled)
@@ -1,4 +1,4 @@
-from src.csv_serializer import to_csv
+from src.csv_serializer import to_csv, to_csv_chunks
 
 from tests.test_types_generator import account, instance, task_report
 
@@ -37,3 +37,12 @@ expected_csv = """account_id,account_name,instance_id,instance_component,instanc
 
 def test_to_csv() -> None:
     assert to_csv(reports) == expected_csv
+
+
+def test_to_csv_chunks() -> None:
+    assert "".join(to_csv_chunks(iter(reports))) == expected_csv
+    assert len(list(to_csv_chunks(iter(reports)))) == 3
+
+
+def test_to_csv_chunks_without_reports() -> None:
+    assert "".join(to_csv_chunks(iter([]))) == to_csv([])
@@ -4,7 +4,7 @@ from unittest import TestCase
 from dataclasses import dataclass
 from typing import Callable, Optional
 
-from src.json_serializer import to_json
+from src.json_serializer import from_typed_json, to_json, to_json_chunks, to_typed_json, type_name
 
 
 class TestJsonSerializer(TestCase):
@@ -28,3 +28,18 @@ class TestJsonSerializer(TestCase):
     class TestDatetimeObject:
         name: str = "Andy"
         born: datetime.datetime = datetime.datetime(2021, 11, 1, 15, 30, 10)
+
+    def test_serialize_in_chunks(self) -> None:
+        for objs in [[], [TestJsonSerializer.TestObject()], [TestJsonSerializer.TestObject()] * 3]:
+            self.assertEqual(to_json(objs), "".join(to_json_chunks(iter(objs))))
+
+    def test_typed_json_round_trip(self) -> None:
+        types = {type_name(TestJsonSerializer.TestDatetimeObject): TestJsonSerializer.TestDatetimeObject}
+        obj = {"people": [TestJsonSerializer.TestDatetimeObject()], "count": 1}
+        self.assertEqual(obj, from_typed_json(to_typed_json(obj, types), types))
+
+    def test_typed_json_only_handles_known_types(self) -> None:
+        with self.assertRaisesRegex(TypeError, "TestObject cannot be serialised"):
+            to_typed_json(TestJsonSerializer.TestObject(), {})
+        with self.assertRaisesRegex(ValueError, "builtins.object cannot be deserialised"):
+            from_typed_json('{"__type__": "builtins.object", "__fields__": {}}', {})
@@ -151,8 +151,9 @@ def task_report(
     description: str = "task",
     partition: Optional[AwsAthenaDataPartition] = partition(),
     results: Dict[Any, Any] = {"key": "val"},
+    incomplete: Optional[bool] = None,
 ) -> AwsTaskReport:
-    return AwsTaskReport(account, description, partition, results)
+    return AwsTaskReport(account, description, partition, results, incomplete)
 
 
 def secure_string_parameter(name: str) -> Parameter:
@@ -326,6 +327,11 @@ def aws_scanner_arguments(
     parent: str = "Parent OU",
     day: Optional[int] = None,
     skip_tags: bool = False,
+    processes: int = 1,
+    resume: Optional[str] = None,
+    plan: int = 0,
+    shard: Optional[str] = None,
+    merged_task: Optional[str] = None,
 ) -> AwsScannerArguments:
     return AwsScannerArguments(
         username=username,
@@ -345,6 +351,11 @@ def aws_scanner_arguments(
         parent=parent,
         day=day,
         skip_tags=skip_tags,
+        processes=processes,
+        resume=resume,
+        plan=plan,
+        shard=shard,
+        merged_task=merged_task,
     )
 
 